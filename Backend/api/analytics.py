@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import List, Optional
+from core.security import CurrentUser, get_current_user, get_read_db
+from core.config import ANALYTICS_MAX_DAYS, ANALYTICS_MAX_PERIODS
+from crud.async_analytics_crud import get_trend_history
+
+router = APIRouter()
+
+# pandas period frequency, period label format and the default range in days, per group_by.
+GROUPINGS = {
+    "day": ("D", "%Y-%m-%d", 30),
+    "week": ("W-SUN", "%Y-%m-%d", 7 * 12),
+    "month": ("M", "%Y-%m", 365),
+    "year": ("Y", "%Y", 365 * 5),
+}
+DAYS_PER_PERIOD = {"day": 1, "week": 7, "month": 28, "year": 365}
+MAX_WINDOW = 52
+MAX_FORECAST = 24
+
+def parse_trend_params(start: str, end: str, group_by: str, window: int, forecast: int):
+    """Validate the /analytics/trend query parameters.
+
+    Returns (params, errors). start and end are inclusive YYYY-MM-DD dates;
+    end defaults to today and start to a span that suits group_by.
+    """
+    params = {}
+    errors = {}
+    if group_by not in GROUPINGS:
+        errors["group_by"] = f"group_by must be one of: {', '.join(GROUPINGS)}"
+    if not 1 <= window <= MAX_WINDOW:
+        errors["window"] = f"Window must be between 1 and {MAX_WINDOW}"
+    if not 0 <= forecast <= MAX_FORECAST:
+        errors["forecast"] = f"Forecast must be between 0 and {MAX_FORECAST}"
+
+    try:
+        params["end"] = datetime.strptime(end, "%Y-%m-%d") if end else datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    except ValueError:
+        errors["end"] = "Date must be in YYYY-MM-DD format"
+    try:
+        if start:
+            params["start"] = datetime.strptime(start, "%Y-%m-%d")
+        elif "end" in params and group_by in GROUPINGS:
+            params["start"] = params["end"] - timedelta(days=GROUPINGS[group_by][2] - 1)
+    except ValueError:
+        errors["start"] = "Date must be in YYYY-MM-DD format"
+
+    if not errors:
+        days = (params["end"] - params["start"]).days + 1
+        if days < 1:
+            errors["end"] = "End date must be on or after the start date"
+        elif days > ANALYTICS_MAX_DAYS:
+            errors["start"] = f"The range can cover at most {ANALYTICS_MAX_DAYS} days"
+        elif days / DAYS_PER_PERIOD[group_by] > ANALYTICS_MAX_PERIODS:
+            errors["group_by"] = f"The range would have more than {ANALYTICS_MAX_PERIODS} periods; use a coarser group_by"
+    return params, errors
+
+@router.get("/analytics/trend")
+async def get_trend(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    group_by: str = "month",
+    category: List[str] = Query(default=[]),
+    source: List[str] = Query(default=[]),
+    window: int = 3,
+    forecast: int = 3,
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Income and expense in BASE_CURRENCY per day/week/month/year over [start, end].
+
+    Each period has a running balance and `window`-period moving averages;
+    `forecast` periods are extrapolated linearly.
+    """
+    try:
+        params, errors = parse_trend_params(start, end, group_by, window, forecast)
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+
+        opening_balance, days = await get_trend_history(
+            db, user.id, params["start"], params["end"] + timedelta(days=1), category or None, source or None)
+        # numpy and pandas take a few hundred ms to import, so they load with the first trend, not with the app.
+        from api.trend import build_trend
+        trend = await run_in_threadpool(build_trend, days, opening_balance, params["start"], params["end"], group_by, window, forecast)
+        return ORJSONResponse(status_code=200, content={"status": "success", "data": trend})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error building trend: {str(e)}"})
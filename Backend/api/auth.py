@@ -1,43 +1,24 @@
 from fastapi import APIRouter, Depends, BackgroundTasks
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import re
-import smtplib
 import random
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from jose import jwt
-from database import get_db
-from models import User
-from core.security import verify_password, get_password_hash, create_access_token, create_reset_token, validate_email, validate_mobile, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from core.config import SMTP_SERVER, SMTP_PORT, EMAIL_USER, EMAIL_PASSWORD
-from crud.user_crud import create_user, get_user_by_email, get_user_by_email_or_mobile, update_user_reset_token, update_user_password
+from database import get_async_db
+from core.security import hash_password_async, verify_and_update_password_async, create_access_token, create_reset_token, validate_email, validate_mobile, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from core.rate_limit import limit_by_ip, limit_account, SIGNIN_RATE, OTP_RATE, EMAIL_RATE
+from crud.async_user_crud import create_user, get_user_by_email, get_user_by_email_or_mobile, update_user_reset_token, update_user_password, update_user_password_hash
 
-router = APIRouter()
+# One per-IP bucket covers every auth route, so rotating endpoints doesn't help;
+# handlers add a per-account bucket once they know the email.
+router = APIRouter(dependencies=[Depends(limit_by_ip("auth"))])
 
 def generate_otp() -> str:
     return str(random.randint(100000, 999999))
 
-def send_email_bg(to_email: str, subject: str, body: str):
-    msg = MIMEMultipart()
-    msg['From'] = EMAIL_USER
-    msg['To'] = to_email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-
-    try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.sendmail(EMAIL_USER, to_email, msg.as_string())
-        server.quit()
-        print(f"[INFO] Email sent to {to_email}")
-    except Exception as e:
-        print(f"[ERROR] Failed to send email: {str(e)}")
-
 @router.post("/signup")
-async def signup(user_data: dict, db: Session = Depends(get_db), background_tasks: BackgroundTasks = None):
+async def signup(user_data: dict, db: AsyncSession = Depends(get_async_db), background_tasks: BackgroundTasks = None):
     try:
         fullname = user_data.get("fullname", "").strip()
         email = user_data.get("email", "").strip().lower()
@@ -66,7 +47,7 @@ async def signup(user_data: dict, db: Session = Depends(get_db), background_task
         elif not re.search(r"[A-Za-z]", password) or not re.search(r"\d", password):
             errors["password"] = "Password must contain at least 1 letter and 1 number"
 
-        existing_user = get_user_by_email_or_mobile(db, email, mobilenumber)
+        existing_user = await get_user_by_email_or_mobile(db, email, mobilenumber)
 
         if existing_user:
             if existing_user.email == email:
@@ -77,94 +58,105 @@ async def signup(user_data: dict, db: Session = Depends(get_db), background_task
         if errors:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
 
-        hashed_password = get_password_hash(password)
-        new_user = create_user(db, fullname, email, gender, mobilenumber, hashed_password)
+        # Release the pooled connection while bcrypt runs.
+        await db.close()
+        hashed_password = await hash_password_async(password)
+        new_user = await create_user(db, fullname, email, gender, mobilenumber, hashed_password)
 
         return JSONResponse(status_code=201, content={"status": "success", "message": "User registered successfully", "user_id": new_user.id})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Registration failed: {str(e)}"})
 
 @router.post("/signin")
-async def signin(credentials: dict, db: Session = Depends(get_db)):
+async def signin(credentials: dict, db: AsyncSession = Depends(get_async_db)):
     try:
         email = credentials.get("email", "").strip().lower()
         password = credentials.get("password", "")
         if not email or not password:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Email and password are required"})
+        limited = limit_account("signin", email, SIGNIN_RATE)
+        if limited:
+            return limited
 
-        user = get_user_by_email(db, email)
-        if not user or not verify_password(password, user.password):
+        user = await get_user_by_email(db, email)
+        if not user:
+            return JSONResponse(status_code=401, content={"status": "error", "message": "Invalid email or password"})
+        # Release the pooled connection while bcrypt runs.
+        await db.close()
+        verified, new_hash = await verify_and_update_password_async(password, user.password)
+        if not verified:
             return JSONResponse(status_code=401, content={"status": "error", "message": "Invalid email or password"})
+        if new_hash:
+            await update_user_password_hash(db, user.id, new_hash)
 
-        access_token = create_access_token(data={"sub": user.email}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+        access_token = create_access_token(data={"sub": user.email, "uid": user.id}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
         return JSONResponse(status_code=200, content={"status": "success", "message": "Login successful", "access_token": access_token, "user": {"id": user.id, "fullname": user.fullname, "email": user.email, "gender": user.gender}})
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Login failed: {str(e)}"})
 
 @router.post("/forgot-password")
-async def forgot_password(request: dict, db: Session = Depends(get_db), background_tasks: BackgroundTasks = None):
+async def forgot_password(request: dict, db: AsyncSession = Depends(get_async_db)):
     try:
         email = request.get("email", "").strip().lower()
         if not email or not validate_email(email):
             return JSONResponse(status_code=400, content={"status": "error", "message": "Valid email is required"})
+        limited = limit_account("email", email, EMAIL_RATE)
+        if limited:
+            return limited
 
-        user = get_user_by_email(db, email)
+        user = await get_user_by_email(db, email)
         if not user:
             return JSONResponse(status_code=404, content={"status": "error", "message": "User not found"})
 
         reset_token = create_reset_token(data={"sub": user.email})
-        update_user_reset_token(db, user, reset_token, datetime.utcnow() + timedelta(hours=1))
-
-        if background_tasks:
-            background_tasks.add_task(
-                send_email_bg,
-                user.email,
-                "Password Reset Request",
-                f"Click to reset password: http://localhost:5173/reset-password?token={reset_token}"
-            )
+        await update_user_reset_token(db, user, reset_token, datetime.utcnow() + timedelta(hours=1), email=(
+            "Password Reset Request",
+            f"Click to reset password: http://localhost:5173/reset-password?token={reset_token}",
+        ))
 
         return JSONResponse(status_code=200, content={"status": "success", "message": "Password reset link sent!"})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error: {str(e)}"})
 
 @router.post("/send-otp")
-async def send_otp(request: dict, db: Session = Depends(get_db), background_tasks: BackgroundTasks = None):
+async def send_otp(request: dict, db: AsyncSession = Depends(get_async_db)):
     try:
         email = request.get("email", "").strip().lower()
         if not email or not validate_email(email):
             return JSONResponse(status_code=400, content={"status": "error", "message": "Valid email is required"})
+        limited = limit_account("email", email, EMAIL_RATE)
+        if limited:
+            return limited
 
-        user = get_user_by_email(db, email)
+        user = await get_user_by_email(db, email)
         if not user:
             return JSONResponse(status_code=404, content={"status": "error", "message": "User not found"})
 
         otp = generate_otp()
-        update_user_reset_token(db, user, otp, datetime.utcnow() + timedelta(minutes=10))
-
-        if background_tasks:
-            background_tasks.add_task(
-                send_email_bg,
-                user.email,
-                "OTP for Password Reset",
-                f"Your OTP is {otp}"
-            )
+        await update_user_reset_token(db, user, otp, datetime.utcnow() + timedelta(minutes=10), email=(
+            "OTP for Password Reset",
+            f"Your OTP is {otp}",
+        ))
 
         return JSONResponse(status_code=200, content={"status": "success", "message": "OTP sent to your email"})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error: {str(e)}"})
 
 @router.post("/verify-otp")
-async def verify_otp(request: dict, db: Session = Depends(get_db)):
+async def verify_otp(request: dict, db: AsyncSession = Depends(get_async_db)):
     try:
         email = request.get("email", "").strip().lower()
         otp = request.get("otp", "").strip()
         if not email or not otp:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Email and OTP are required"})
+        limited = limit_account("otp", email, OTP_RATE)
+        if limited:
+            return limited
 
-        user = get_user_by_email(db, email)
+        user = await get_user_by_email(db, email)
         if not user:
             return JSONResponse(status_code=404, content={"status": "error", "message": "User not found"})
         if not user.reset_token or user.reset_token != otp:
@@ -173,14 +165,14 @@ async def verify_otp(request: dict, db: Session = Depends(get_db)):
             return JSONResponse(status_code=401, content={"status": "error", "message": "OTP expired"})
 
         reset_token = create_reset_token(data={"sub": user.email}, expires_delta=timedelta(hours=1))
-        update_user_reset_token(db, user, reset_token, datetime.utcnow() + timedelta(hours=1))
+        await update_user_reset_token(db, user, reset_token, datetime.utcnow() + timedelta(hours=1))
         return JSONResponse(status_code=200, content={"status": "success", "message": "OTP verified", "reset_token": reset_token})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error: {str(e)}"})
 
 @router.post("/reset-password-with-otp")
-async def reset_password_with_otp(request: dict, db: Session = Depends(get_db)):
+async def reset_password_with_otp(request: dict, db: AsyncSession = Depends(get_async_db)):
     try:
         reset_token = request.get("reset_token")
         new_password = request.get("new_password")
@@ -189,12 +181,15 @@ async def reset_password_with_otp(request: dict, db: Session = Depends(get_db)):
 
         payload = jwt.decode(reset_token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        user = get_user_by_email(db, email)
+        # Hash before touching the database so no pooled connection is held
+        # while bcrypt runs.
+        hashed_password = await hash_password_async(new_password)
+        user = await get_user_by_email(db, email)
         if not user:
             return JSONResponse(status_code=404, content={"status": "error", "message": "User not found"})
 
-        update_user_password(db, user, get_password_hash(new_password))
+        await update_user_password(db, user, hashed_password)
         return JSONResponse(status_code=200, content={"status": "success", "message": "Password reset successfully"})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error: {str(e)}"})
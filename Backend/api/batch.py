@@ -0,0 +1,65 @@
+from core.config import BATCH_MAX_OPERATIONS
+
+BATCH_OPERATIONS = ("create", "update", "delete")
+
+def _record_id(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        record_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return record_id if record_id > 0 else None
+
+def parse_batch(batch_data: dict, validate, validate_changes):
+    """Validate {"operations": [{"op", "id", "data"}, ...]}.
+
+    Returns (creates, updates, deletes, results, errors), with one result per
+    operation; nothing should be written when errors is non-empty.
+    """
+    operations = batch_data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return [], [], [], [], {"operations": "operations must be a non-empty list"}
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return [], [], [], [], {"operations": f"At most {BATCH_MAX_OPERATIONS} operations per batch"}
+
+    creates, updates, deletes, results = [], [], [], []
+    seen_ids = set()
+    failed = False
+    for index, operation in enumerate(operations):
+        operation = operation if isinstance(operation, dict) else {}
+        op = operation.get("op")
+        result = {"index": index, "op": op}
+        results.append(result)
+        errors = {}
+
+        if op not in BATCH_OPERATIONS:
+            errors["op"] = f"op must be one of: {', '.join(BATCH_OPERATIONS)}"
+        elif op == "create":
+            values, errors = validate(operation.get("data") or {})
+            if not errors:
+                creates.append((index, values))
+        else:
+            record_id = _record_id(operation.get("id"))
+            result["id"] = operation.get("id")
+            if record_id is None:
+                errors["id"] = "A positive integer id is required"
+            elif record_id in seen_ids:
+                errors["id"] = "Record appears more than once in the batch"
+            else:
+                seen_ids.add(record_id)
+                result["id"] = record_id
+                if op == "update":
+                    changes, errors = validate_changes(operation.get("data") or {})
+                    if not errors:
+                        updates.append((index, record_id, changes))
+                else:
+                    deletes.append((index, record_id))
+
+        if errors:
+            failed = True
+            result.update(status="error", errors=errors)
+        else:
+            result["status"] = "valid"
+
+    return creates, updates, deletes, results, {"operations": "One or more operations are invalid"} if failed else {}
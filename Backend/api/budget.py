@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from database import get_async_db
+from core.security import CurrentUser, get_current_user, get_read_db
+from core.config import BUDGET_ALERT_THRESHOLDS
+from api.validation import validate_budget, validate_budget_changes, validate_month
+from crud.budget_crud import current_month
+from crud.async_budget_crud import get_budgets as crud_get_budgets, get_budget_by_category as crud_get_budget_by_category, create_budget as crud_create_budget, update_budget as crud_update_budget, delete_budget as crud_delete_budget, get_budget_status as crud_get_budget_status, get_budget_alerts as crud_get_budget_alerts
+
+router = APIRouter()
+
+def _budget_data(budget) -> dict:
+    return {"id": budget.id, "category": budget.category, "amount": budget.amount}
+
+def _alert_data(alert) -> dict:
+    category, month, threshold, budget_amount, spent, created_at = alert
+    return {"category": category, "month": month, "threshold": threshold, "budget_amount": budget_amount,
+            "spent": spent, "created_at": created_at}
+
+def _budget_state(percent: float) -> str:
+    if percent >= 100:
+        return "over"
+    if BUDGET_ALERT_THRESHOLDS and percent >= BUDGET_ALERT_THRESHOLDS[0]:
+        return "warning"
+    return "ok"
+
+@router.get("/budgets")
+async def list_budgets(user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    try:
+        budgets = await crud_get_budgets(db, user.id)
+        return JSONResponse(status_code=200, content={"status": "success", "data": [_budget_data(budget) for budget in budgets]})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Server error: {str(e)}"})
+
+@router.post("/budgets")
+async def create_budget(budget_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        values, errors = validate_budget(budget_data)
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
+        if await crud_get_budget_by_category(db, user.id, values["category"]):
+            return JSONResponse(status_code=409, content={"status": "error", "message": "A budget for this category already exists", "errors": {"category": "Budget already exists"}})
+
+        budget = await crud_create_budget(db, user.id, values["category"], values["amount"])
+        return JSONResponse(status_code=201, content={"status": "success", "message": "Budget added successfully", "data": _budget_data(budget)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error adding budget: {str(e)}"})
+
+@router.get("/budgets/status")
+async def get_budget_status(month: Optional[str] = None, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    """Spending against each budget for a month (default: the current one), read from the rollup table."""
+    try:
+        errors = {}
+        month = validate_month(month, errors) if month else current_month()
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+
+        budgets = []
+        for budget_id, category, amount, spent in await crud_get_budget_status(db, user.id, month):
+            percent = spent / amount * 100 if amount else 0.0
+            budgets.append({
+                "id": budget_id, "category": category, "amount": amount, "spent": round(spent, 2),
+                "remaining": round(amount - spent, 2), "percent": round(percent, 1), "state": _budget_state(percent),
+            })
+        alerts = [_alert_data(alert) for alert in await crud_get_budget_alerts(db, user.id, month)]
+        return ORJSONResponse(status_code=200, content={"status": "success", "data": {"month": month, "budgets": budgets, "alerts": alerts}})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error fetching budget status: {str(e)}"})
+
+@router.get("/budgets/alerts")
+async def list_budget_alerts(month: Optional[str] = None, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    try:
+        errors = {}
+        month = validate_month(month, errors) if month else None
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+
+        alerts = await crud_get_budget_alerts(db, user.id, month)
+        return ORJSONResponse(status_code=200, content={"status": "success", "data": [_alert_data(alert) for alert in alerts]})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error fetching budget alerts: {str(e)}"})
+
+@router.put("/budgets/{budget_id}")
+async def update_budget(budget_id: int, budget_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        changes, errors = validate_budget_changes(budget_data)
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
+
+        budget = await crud_update_budget(db, budget_id, user.id, changes["amount"])
+        if not budget:
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Budget not found"})
+        return JSONResponse(status_code=200, content={"status": "success", "message": "Budget updated successfully", "data": _budget_data(budget)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error updating budget: {str(e)}"})
+
+@router.delete("/budgets/{budget_id}")
+async def delete_budget(budget_id: int, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        if not await crud_delete_budget(db, budget_id, user.id):
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Budget not found"})
+
+        return JSONResponse(status_code=200, content={"status": "success", "message": "Budget deleted successfully"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error deleting budget: {str(e)}"})
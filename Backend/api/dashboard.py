@@ -1,78 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from collections import defaultdict
-from database import get_db
-from models import User,Expense,Income
-from core.security import verify_token
+from core.security import CurrentUser, get_current_user, get_read_db
+from core.cache import cache, data_version
+from core.config import BASE_CURRENCY
+from schemas import DashboardResponse
+from crud.dashboard_crud import get_totals, get_recent_expenses, get_category_breakdown, get_monthly_trend, get_first_expense_month
 
 router = APIRouter()
 
-@router.get("/dashboard")
-async def get_dashboard_data(email: str = Depends(verify_token), db: Session = Depends(get_db)):
-    try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-    
-        expenses = db.query(Expense).filter(Expense.user_id == user.id).order_by(Expense.date.desc()).all()
-        incomes = db.query(Income).filter(Income.user_id == user.id).all()
-
-        total_spent = sum(exp.amount for exp in expenses)
-        total_income = sum(inc.amount for inc in incomes)
-        recent_expenses = [
-            {
-                "date": exp.date.strftime("%Y-%m-%d"),
-                "category": exp.category,
-                "amount": exp.amount,
-                "description": exp.description or ""
-            }
-            for exp in expenses[:5]
-        ]
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
 
-        category_breakdown = {}
-        for exp in expenses:
-            category_breakdown[exp.category] = category_breakdown.get(exp.category, 0) + exp.amount
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard_data(request: Request, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    try:
+        # The trend window moves with the calendar, so the current day is part
+        # of the cache key and ETag along with the user's data version.
+        version = f"{data_version(user.id)}-{datetime.utcnow():%Y%m%d}"
+        etag = f'W/"dashboard-{user.id}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
 
-        monthly_expenses = defaultdict(float)
-        monthly_incomes = defaultdict(float)
-        now = datetime.utcnow()
-        two_months_ago = now - timedelta(days=30)
+        cache_key = f"dashboard:{user.id}:{version}"
+        dashboard_data = cache.get(cache_key)
+        if dashboard_data is None:
+            dashboard_data = await db.run_sync(build_dashboard, user.id)
+            cache.set(cache_key, dashboard_data)
 
-        for exp in expenses:
-            if exp.date >= two_months_ago:
-                month_key = exp.date.strftime("%Y-%m")
-                monthly_expenses[month_key] += exp.amount
+        return ORJSONResponse(status_code=200, content={"status": "success", "data": dashboard_data}, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error fetching dashboard data: {str(e)}"})
 
-        for inc in incomes:
-            if inc.income_date >= two_months_ago:
-                month_key = inc.income_date.strftime("%Y-%m")
-                monthly_incomes[month_key] += inc.amount
+def build_dashboard(db: Session, user_id: int) -> dict:
+    total_spent, total_income, expense_count = get_totals(db, user_id)
+    recent_expenses = [
+        {
+            "date": date.strftime("%Y-%m-%d"),
+            "category": category,
+            "amount": amount,
+            "currency": currency,
+            "description": description or ""
+        }
+        for date, category, amount, description, currency in get_recent_expenses(db, user_id)
+    ]
 
-        all_months = set(monthly_expenses.keys()) | set(monthly_incomes.keys())
+    category_breakdown = get_category_breakdown(db, user_id)
 
-        monthly_trend = [
-            {
-                "month": month,
-                "income": monthly_incomes.get(month, 0),
-                "expense": monthly_expenses.get(month, 0)
-            }
-            for month in sorted(all_months)
-        ]
+    # The current and the previous calendar month; /analytics/trend covers any other range.
+    now = datetime.utcnow()
+    previous_month = (now.replace(day=1) - timedelta(days=1)).replace(day=1)
+    monthly_trend = get_monthly_trend(db, user_id, previous_month)
 
-        monthly_average = total_spent / 2 if expenses else 0
+    # Average over every month from the first expense up to the current one.
+    monthly_average = 0
+    first_month = get_first_expense_month(db, user_id) if expense_count else None
+    if first_month:
+        first_year, first_month_number = map(int, first_month.split("-"))
+        months = max(1, (now.year - first_year) * 12 + now.month - first_month_number + 1)
+        monthly_average = total_spent / months
 
-        dashboard_data = {
-            "total_spent": total_spent,
-            "total_income": total_income,
-            "recent_expenses": recent_expenses,
-            "category_breakdown": category_breakdown,
-            "monthly_trend": monthly_trend,
-            "monthly_average": monthly_average
-        }
-        return JSONResponse(status_code=200, content={"status": "success", "data": dashboard_data})
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error fetching dashboard data: {str(e)}"})
+    dashboard_data = {
+        "currency": BASE_CURRENCY,
+        "total_spent": total_spent,
+        "total_income": total_income,
+        "recent_expenses": recent_expenses,
+        "category_breakdown": category_breakdown,
+        "monthly_trend": monthly_trend,
+        "monthly_average": monthly_average
+    }
+    return dashboard_data
@@ -1,59 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
-from database import get_db
-from models import User,Expense
-from core.security import verify_token
-from crud.expense_crud import get_expenses as crud_get_expenses, create_expense as crud_create_expense, update_expense as crud_update_expense, delete_expense as crud_delete_expense
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from functools import partial
+from database import get_async_db
+from core.security import CurrentUser, get_current_user, get_read_db
+from schemas import ExpenseListResponse
+from api.filters import parse_list_params
+from api.validation import validate_expense, validate_expense_changes
+from api.batch import parse_batch
+from api.importing import IMPORT_FORMATS, detect_format, import_records
+from api.exporting import EXPORT_FORMATS, export_response
+from crud.pagination import InvalidCursor, DEFAULT_PAGE_SIZE
+from crud.async_fx_crud import get_currencies
+from crud.expense_crud import EXPENSE_SORT_FIELDS, get_expenses_export_statement
+from crud.async_expense_crud import get_expense as crud_get_expense, get_expenses as crud_get_expenses, get_expenses_page as crud_get_expenses_page, create_expense as crud_create_expense, update_expense as crud_update_expense, delete_expense as crud_delete_expense, import_expenses as crud_import_expenses, apply_expense_batch as crud_apply_expense_batch
 
 router = APIRouter()
 
-@router.get("/expense")
-async def get_expenses_safe(email: str = Depends(verify_token), db: Session = Depends(get_db)):
-   
+def _expense_data(expense) -> dict:
+    """An expense as the list endpoint shows it (ORJSONResponse renders the date)."""
+    return {"id": expense.id, "amount": expense.amount, "currency": expense.currency, "category": expense.category,
+            "description": expense.description or "", "date": expense.date.date() if expense.date else None}
+
+@router.get("/expense", response_model=ExpenseListResponse)
+async def get_expenses_safe(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    q: Optional[str] = None,
+    sort: str = "date",
+    order: str = "desc",
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     try:
-        
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-      
-        expense_records = crud_get_expenses(db, user.id)
-        expense_list = []
-
-        for exp in expense_records:
+        filters, errors = parse_list_params(EXPENSE_SORT_FIELDS, sort, order, limit, date_from, date_to, min_amount, max_amount)
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+        if category:
+            filters["category"] = category.strip()
+        if q:
+            filters["search"] = q.strip()
+
+        # Without limit/cursor the full (filtered) list is returned, as before.
+        paginated = limit is not None or cursor is not None
+        next_cursor = None
+        if paginated:
             try:
-                
-                amount = float(exp.amount) if exp.amount else 0.0
-
-               
-                category = exp.category or ""
-                description = exp.description or ""
-
-            
-                date_str = ""
-                if exp.date:
-                    try:
-                        if hasattr(exp.date, "strftime"):
-                            date_str = exp.date.strftime("%Y-%m-%d")
-                        else:
-                            date_str = str(exp.date)
-                    except Exception:
-                        date_str = str(exp.date)
-
-                expense_list.append({
-                    "id": exp.id,
-                    "amount": amount,
-                    "category": category,
-                    "description": description,
-                    "date": date_str
-                })
-            except Exception as inner_e:
-                print(f"Error processing expense {exp.id}: {inner_e}")
-                continue
-
-        return JSONResponse(status_code=200, content={"status": "success", "data": expense_list})
+                expense_records, next_cursor = await crud_get_expenses_page(db, user.id, limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor, sort=sort, order=order, **filters)
+            except InvalidCursor:
+                return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": {"cursor": "Invalid cursor"}})
+        else:
+            expense_records = await crud_get_expenses(db, user.id, sort=sort, order=order, **filters)
+        expense_list = [
+            {"id": expense_id, "amount": amount, "currency": currency, "category": category, "description": description or "", "date": date.date() if date else None}
+            for expense_id, date, category, amount, description, currency in expense_records
+        ]
+
+        content = {"status": "success", "data": expense_list}
+        if paginated:
+            content["next_cursor"] = next_cursor
+            content["has_more"] = next_cursor is not None
+        return ORJSONResponse(status_code=200, content=content)
 
     except HTTPException:
         raise
@@ -63,101 +76,140 @@ async def get_expenses_safe(email: str = Depends(verify_token), db: Session = De
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Server error: {str(e)}"})
 
 
+@router.get("/expense/export")
+async def export_expenses(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    category: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    q: Optional[str] = None,
+    sort: str = "date",
+    order: str = "desc",
+    user: CurrentUser = Depends(get_current_user)
+):
+    filters, errors = parse_list_params(EXPENSE_SORT_FIELDS, sort, order, None, date_from, date_to, min_amount, max_amount)
+    if fmt not in EXPORT_FORMATS:
+        errors["format"] = f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+    if errors:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+    if category:
+        filters["category"] = category.strip()
+    if q:
+        filters["search"] = q.strip()
+
+    build_statement = partial(get_expenses_export_statement, user_id=user.id, sort=sort, order=order, **filters)
+    return export_response(build_statement, ["id", "date", "category", "amount", "description", "currency"], fmt, "expenses",
+                           request.app.state.replicas.sessionmaker_for(user.id))
+
 @router.post("/expense")
-async def create_expense(expense_data: dict, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def create_expense(expense_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        amount = expense_data.get("amount")
-        category = expense_data.get("category", "").strip()
-        description = expense_data.get("description", "").strip()
-        date = expense_data.get("date")
-
-        errors = {}
-        if not amount or float(amount) <= 0:
-            errors["amount"] = "Amount must be > 0"
-        if not category:
-            errors["category"] = "Category is required"
-        if not date:
-            errors["date"] = "Date is required"
-
+        values, errors = validate_expense(expense_data, await get_currencies(db))
         if errors:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
 
-        new_expense = crud_create_expense(db, user.id, float(amount), category, description or None, datetime.strptime(date, "%Y-%m-%d"))
+        new_expense = await crud_create_expense(db, user.id, **values)
 
-        return JSONResponse(status_code=201, content={"status": "success", "message": "Expense added successfully", "data": {
-            "id": new_expense.id,
-            "amount": float(new_expense.amount) if new_expense.amount is not None else 0.0,
-            "category": new_expense.category,
-            "description": new_expense.description,
-            "date": new_expense.date.strftime("%Y-%m-%d") if new_expense.date and hasattr(new_expense.date, 'strftime') else ""
-        }})
+        return ORJSONResponse(status_code=201, content={"status": "success", "message": "Expense added successfully", "data": _expense_data(new_expense)})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error adding expense: {str(e)}"})
 
-@router.put("/expense/{expense_id}")
-async def update_expense(expense_id: int, expense_data: dict, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+@router.post("/expense/import")
+async def import_expenses(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        fmt = detect_format(file, fmt)
+        if fmt not in IMPORT_FORMATS:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": {"format": f"Format must be one of: {', '.join(IMPORT_FORMATS)}"}})
+
+        async def save_batch(rows):
+            return await crud_import_expenses(db, user.id, rows)
+
+        validate = partial(validate_expense, currencies=await get_currencies(db))
+        report = await import_records(file, fmt, validate, save_batch)
+        if report["parse_error"]:
+            return JSONResponse(status_code=400, content={"status": "error", "message": f"Could not parse upload after {report['imported']} imported rows: {report['parse_error']}", "data": report})
+        return JSONResponse(status_code=200, content={"status": "success", "message": f"Imported {report['imported']} expenses, {report['failed']} rows rejected", "data": report})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error importing expenses: {str(e)}"})
+
+@router.post("/expense/batch")
+async def batch_expenses(batch_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        currencies = await get_currencies(db)
+        creates, updates, deletes, results, errors = parse_batch(
+            batch_data, partial(validate_expense, currencies=currencies), partial(validate_expense_changes, currencies=currencies))
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Batch rejected; no changes were made", "errors": errors, "data": results})
+
+        created_ids, missing = await crud_apply_expense_batch(
+            db, user.id,
+            [values for _, values in creates],
+            [(record_id, changes) for _, record_id, changes in updates],
+            [record_id for _, record_id in deletes],
+        )
+        if missing:
+            missing = set(missing)
+            for result in results:
+                if result.get("id") in missing:
+                    result.update(status="error", errors={"id": "Expense not found"})
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Batch rejected; no changes were made", "errors": {"operations": "Expense not found"}, "data": results})
+
+        for (index, _), new_id in zip(creates, created_ids):
+            results[index]["id"] = new_id
+        for result in results:
+            result["status"] = {"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]
+        return JSONResponse(status_code=200, content={"status": "success", "message": f"Applied {len(results)} operations", "data": results})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error applying expense batch: {str(e)}"})
 
-        expense = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == user.id).first()
+@router.put("/expense/{expense_id}")
+async def update_expense(expense_id: int, expense_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        expense = await crud_get_expense(db, expense_id, user.id)
         if not expense:
             return JSONResponse(status_code=404, content={"status": "error", "message": "Expense not found"})
 
-        amount = expense_data.get("amount")
-        category = expense_data.get("category", "").strip()
-        description = expense_data.get("description", "").strip()
-        date = expense_data.get("date")
-
-        errors = {}
-        if not amount or float(amount) <= 0:
-            errors["amount"] = "Amount must be > 0"
-        if not category:
-            errors["category"] = "Category is required"
-        if not date:
-            errors["date"] = "Date is required"
-
+        values, errors = validate_expense(expense_data, await get_currencies(db))
         if errors:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
 
-        updated_expense = crud_update_expense(db, expense_id, user.id, float(amount), category, description or None, datetime.strptime(date, "%Y-%m-%d"))
+        updated_expense = await crud_update_expense(db, expense_id, user.id, **values)
         if not updated_expense:
             return JSONResponse(status_code=404, content={"status": "error", "message": "Expense not found"})
 
-        return JSONResponse(status_code=200, content={"status": "success", "message": "Expense updated successfully", "data": {
-            "id": updated_expense.id,
-            "amount": float(updated_expense.amount) if updated_expense.amount is not None else 0.0,
-            "category": updated_expense.category,
-            "description": updated_expense.description,
-            "date": updated_expense.date.strftime("%Y-%m-%d") if updated_expense.date and hasattr(updated_expense.date, 'strftime') else ""
-        }})
+        return ORJSONResponse(status_code=200, content={"status": "success", "message": "Expense updated successfully", "data": _expense_data(updated_expense)})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error updating expense: {str(e)}"})
 
 @router.delete("/expense/{expense_id}")
-async def delete_expense(expense_id: int, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_expense(expense_id: int, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        if not crud_delete_expense(db, expense_id, user.id):
+        if not await crud_delete_expense(db, expense_id, user.id):
             return JSONResponse(status_code=404, content={"status": "error", "message": "Expense not found"})
 
         return JSONResponse(status_code=200, content={"status": "success", "message": "Expense deleted successfully"})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error deleting expense: {str(e)}"})
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from fastapi.responses import StreamingResponse
+from database import AsyncSessionLocal
+from core.config import EXPORT_BATCH_SIZE
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _format_value(value):
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_format_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(fields, rows) -> bytes:
+    return "".join(
+        json.dumps({field: _format_value(value) for field, value in zip(fields, row)}) + "\n"
+        for row in rows
+    ).encode()
+
+async def stream_export(build_statement, fields, fmt: str, sessionmaker=AsyncSessionLocal):
+    """Yield the encoded rows of build_statement(session), one yield_per partition at a time.
+
+    The generator opens its own session (from `sessionmaker`, e.g. a read
+    replica's): it keeps running after the handler has returned, so it cannot
+    borrow the request-scoped one.
+    """
+    async with sessionmaker() as db:
+        statement = await db.run_sync(build_statement)
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            yield _encode_csv([fields])
+        async for rows in result.partitions():
+            yield _encode_csv(rows) if fmt == "csv" else _encode_ndjson(fields, rows)
+
+def export_response(build_statement, fields, fmt: str, filename: str, sessionmaker=AsyncSessionLocal) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(build_statement, fields, fmt, sessionmaker),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"', "Cache-Control": "no-store"},
+    )
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from crud.pagination import MAX_PAGE_SIZE
+
+def parse_list_params(sort_fields, sort: str, order: str, limit: int = None,
+                      date_from: str = None, date_to: str = None,
+                      min_amount: float = None, max_amount: float = None):
+    """Validate the shared list query parameters.
+
+    Returns (filters, errors). Dates are parsed as YYYY-MM-DD and date_to is
+    inclusive, so it is turned into an exclusive upper bound on the next day.
+    """
+    filters = {}
+    errors = {}
+
+    if sort not in sort_fields:
+        errors["sort"] = f"Sort must be one of: {', '.join(sort_fields)}"
+    if order not in ("asc", "desc"):
+        errors["order"] = "Order must be 'asc' or 'desc'"
+    if limit is not None and (limit < 1 or limit > MAX_PAGE_SIZE):
+        errors["limit"] = f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+
+    if date_from:
+        try:
+            filters["date_from"] = datetime.strptime(date_from, "%Y-%m-%d")
+        except ValueError:
+            errors["date_from"] = "Date must be in YYYY-MM-DD format"
+    if date_to:
+        try:
+            filters["date_to"] = datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            errors["date_to"] = "Date must be in YYYY-MM-DD format"
+
+    if min_amount is not None:
+        filters["min_amount"] = min_amount
+    if max_amount is not None:
+        filters["max_amount"] = max_amount
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        errors["max_amount"] = "Maximum amount must be >= minimum amount"
+
+    return filters, errors
@@ -0,0 +1,88 @@
+import csv
+import io
+import itertools
+import json
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from core.config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+
+IMPORT_FORMATS = ("csv", "ndjson")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+class ImportFormatError(ValueError):
+    pass
+
+def detect_format(upload: UploadFile, requested: str = None) -> str:
+    if requested:
+        return requested.strip().lower()
+    filename = (upload.filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or (upload.content_type or "") in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    return "csv"
+
+def iter_records(file, fmt: str):
+    """Yield (row_number, record) from a binary upload, one line at a time.
+
+    CSV headers are matched case-insensitively, and row numbers are the line
+    numbers a spreadsheet would show (the header is line 1).
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            if reader.fieldnames:
+                reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFormatError(str(e))
+    finally:
+        text.detach()
+
+def read_batch(records, validate, size: int):
+    """Pull up to `size` records and split them into valid rows and per-row errors."""
+    seen = 0
+    rows = []
+    errors = []
+    for row_number, record in itertools.islice(records, size):
+        seen += 1
+        if not isinstance(record, dict):
+            errors.append({"row": row_number, "errors": {"record": "Each line must be a JSON object"}})
+            continue
+        values, row_errors = validate(record)
+        if row_errors:
+            errors.append({"row": row_number, "errors": row_errors})
+        else:
+            rows.append(values)
+    return seen, rows, errors
+
+async def import_records(upload: UploadFile, fmt: str, validate, save_batch) -> dict:
+    """Stream an upload through `validate` and hand valid rows to `save_batch` in batches.
+
+    Parsing runs in the threadpool; each batch is committed by save_batch, so a
+    parse error part-way through keeps the batches imported before it. Only the
+    first IMPORT_MAX_ERRORS row errors are reported.
+    """
+    records = iter_records(upload.file, fmt)
+    report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False, "parse_error": None}
+    while True:
+        try:
+            seen, rows, errors = await run_in_threadpool(read_batch, records, validate, IMPORT_BATCH_SIZE)
+        except ImportFormatError as e:
+            report["parse_error"] = str(e)
+            break
+        if not seen:
+            break
+        report["imported"] += await save_batch(rows)
+        report["failed"] += len(errors)
+        report["errors"].extend(errors[:IMPORT_MAX_ERRORS - len(report["errors"])])
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
@@ -1,52 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
-from database import get_db
-from models import User,Income
-from core.security import verify_token
-from crud.income_crud import get_incomes as crud_get_incomes, create_income as crud_create_income, update_income as crud_update_income, delete_income as crud_delete_income
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from functools import partial
+from database import get_async_db
+from core.security import CurrentUser, get_current_user, get_read_db
+from schemas import IncomeListResponse
+from api.filters import parse_list_params
+from api.validation import validate_income, validate_income_changes
+from api.batch import parse_batch
+from api.importing import IMPORT_FORMATS, detect_format, import_records
+from api.exporting import EXPORT_FORMATS, export_response
+from crud.pagination import InvalidCursor, DEFAULT_PAGE_SIZE
+from crud.async_fx_crud import get_currencies
+from crud.income_crud import INCOME_SORT_FIELDS, get_incomes_export_statement
+from crud.async_income_crud import get_income as crud_get_income, get_incomes as crud_get_incomes, get_incomes_page as crud_get_incomes_page, create_income as crud_create_income, update_income as crud_update_income, delete_income as crud_delete_income, import_incomes as crud_import_incomes, apply_income_batch as crud_apply_income_batch
 
 router = APIRouter()
 
-@router.get("/income")
-async def get_incomes_safe(email: str = Depends(verify_token), db: Session = Depends(get_db)):
+def _income_data(income) -> dict:
+    """An income as the list endpoint shows it (ORJSONResponse renders the date)."""
+    return {"id": income.id, "source": income.source, "amount": income.amount, "currency": income.currency,
+            "description": income.description or "", "income_date": income.income_date.date() if income.income_date else None}
+
+@router.get("/income", response_model=IncomeListResponse)
+async def get_incomes_safe(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    q: Optional[str] = None,
+    sort: str = "income_date",
+    order: str = "desc",
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        incomes = crud_get_incomes(db, user.id)
-        income_list = []
-            
-        for inc in incomes:
+        filters, errors = parse_list_params(INCOME_SORT_FIELDS, sort, order, limit, date_from, date_to, min_amount, max_amount)
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+        if source:
+            filters["source"] = source.strip()
+        if q:
+            filters["search"] = q.strip()
+
+        # Without limit/cursor the full (filtered) list is returned, as before.
+        paginated = limit is not None or cursor is not None
+        next_cursor = None
+        if paginated:
             try:
-                    
-                    source = inc.source or ""
-                    amount = float(inc.amount)if inc.amount else 0.0
-                    description = inc.description or ""
-                    income_date_str = ""
-                    if inc.income_date:
-                        try:
-                            if hasattr(inc.income_date,"strftime"):
-                                income_date_str = inc.income_date.strftime("%Y-%m-%d")
-                            else:
-                                income_date_str = str(inc.income_date)
-                        except Exception:
-                            income_date_str = str(inc.income_date)
-                            
-                    income_list.append({
-                "id": inc.id,
-                "source": inc.source,
-                "amount": amount,
-                "description": description,
-                "income_date": income_date_str
-            })
-            except Exception as inner_e:
-                print(f"Error processing expense {inc.id}: {inner_e}")
-                continue
-
-        return JSONResponse(status_code=200, content={"status": "success", "data": income_list})
+                incomes, next_cursor = await crud_get_incomes_page(db, user.id, limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor, sort=sort, order=order, **filters)
+            except InvalidCursor:
+                return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": {"cursor": "Invalid cursor"}})
+        else:
+            incomes = await crud_get_incomes(db, user.id, sort=sort, order=order, **filters)
+        income_list = [
+            {"id": income_id, "source": source, "amount": amount, "currency": currency, "description": description or "", "income_date": income_date.date() if income_date else None}
+            for income_id, income_date, source, amount, description, currency in incomes
+        ]
+
+        content = {"status": "success", "data": income_list}
+        if paginated:
+            content["next_cursor"] = next_cursor
+            content["has_more"] = next_cursor is not None
+        return ORJSONResponse(status_code=200, content=content)
 
     except HTTPException:
         raise
@@ -55,101 +75,140 @@ async def get_incomes_safe(email: str = Depends(verify_token), db: Session = Dep
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Server error: {str(e)}"})
 
+@router.get("/income/export")
+async def export_incomes(
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    q: Optional[str] = None,
+    sort: str = "income_date",
+    order: str = "desc",
+    user: CurrentUser = Depends(get_current_user)
+):
+    filters, errors = parse_list_params(INCOME_SORT_FIELDS, sort, order, None, date_from, date_to, min_amount, max_amount)
+    if fmt not in EXPORT_FORMATS:
+        errors["format"] = f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+    if errors:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+    if source:
+        filters["source"] = source.strip()
+    if q:
+        filters["search"] = q.strip()
+
+    build_statement = partial(get_incomes_export_statement, user_id=user.id, sort=sort, order=order, **filters)
+    return export_response(build_statement, ["id", "income_date", "source", "amount", "description", "currency"], fmt, "incomes",
+                           request.app.state.replicas.sessionmaker_for(user.id))
+
 @router.post("/income")
-async def create_income(income_data: dict, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def create_income(income_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        source = income_data.get("source", "").strip()
-        amount = income_data.get("amount")
-        description = income_data.get("description", "").strip()
-        income_date = income_data.get("income_date")
-
-        errors = {}
-        if not source:
-            errors["source"] = "Source is required"
-        if not amount or float(amount) <= 0:
-            errors["amount"] = "Amount must be > 0"
-        if not income_date:
-            errors["income_date"] = "Date is required"
-
+        values, errors = validate_income(income_data, await get_currencies(db))
         if errors:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
 
-        new_income = crud_create_income(db, user.id, source, float(amount), description or None, datetime.strptime(income_date, "%Y-%m-%d"))
+        new_income = await crud_create_income(db, user.id, **values)
 
-        return JSONResponse(status_code=201, content={"status": "success", "message": "Income added successfully", "data": {
-            "id": new_income.id,
-            "source": new_income.source,
-            "amount": new_income.amount,
-            "description": new_income.description,
-            "income_date": new_income.income_date.strftime("%Y-%m-%d")
-        }})
+        return ORJSONResponse(status_code=201, content={"status": "success", "message": "Income added successfully", "data": _income_data(new_income)})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error adding income: {str(e)}"})
 
-@router.put("/income/{income_id}")
-async def update_income(income_id: int, income_data: dict, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+@router.post("/income/import")
+async def import_incomes(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        fmt = detect_format(file, fmt)
+        if fmt not in IMPORT_FORMATS:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": {"format": f"Format must be one of: {', '.join(IMPORT_FORMATS)}"}})
+
+        async def save_batch(rows):
+            return await crud_import_incomes(db, user.id, rows)
+
+        validate = partial(validate_income, currencies=await get_currencies(db))
+        report = await import_records(file, fmt, validate, save_batch)
+        if report["parse_error"]:
+            return JSONResponse(status_code=400, content={"status": "error", "message": f"Could not parse upload after {report['imported']} imported rows: {report['parse_error']}", "data": report})
+        return JSONResponse(status_code=200, content={"status": "success", "message": f"Imported {report['imported']} incomes, {report['failed']} rows rejected", "data": report})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error importing incomes: {str(e)}"})
+
+@router.post("/income/batch")
+async def batch_incomes(batch_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        currencies = await get_currencies(db)
+        creates, updates, deletes, results, errors = parse_batch(
+            batch_data, partial(validate_income, currencies=currencies), partial(validate_income_changes, currencies=currencies))
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Batch rejected; no changes were made", "errors": errors, "data": results})
+
+        created_ids, missing = await crud_apply_income_batch(
+            db, user.id,
+            [values for _, values in creates],
+            [(record_id, changes) for _, record_id, changes in updates],
+            [record_id for _, record_id in deletes],
+        )
+        if missing:
+            missing = set(missing)
+            for result in results:
+                if result.get("id") in missing:
+                    result.update(status="error", errors={"id": "Income not found"})
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Batch rejected; no changes were made", "errors": {"operations": "Income not found"}, "data": results})
+
+        for (index, _), new_id in zip(creates, created_ids):
+            results[index]["id"] = new_id
+        for result in results:
+            result["status"] = {"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]
+        return JSONResponse(status_code=200, content={"status": "success", "message": f"Applied {len(results)} operations", "data": results})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error applying income batch: {str(e)}"})
 
-        income = db.query(Income).filter(Income.id == income_id, Income.user_id == user.id).first()
+@router.put("/income/{income_id}")
+async def update_income(income_id: int, income_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        income = await crud_get_income(db, income_id, user.id)
         if not income:
             return JSONResponse(status_code=404, content={"status": "error", "message": "Income not found"})
 
-        source = income_data.get("source", "").strip()
-        amount = income_data.get("amount")
-        description = income_data.get("description", "").strip()
-        income_date = income_data.get("income_date")
-
-        errors = {}
-        if not source:
-            errors["source"] = "Source is required"
-        if not amount or float(amount) <= 0:
-            errors["amount"] = "Amount must be > 0"
-        if not income_date:
-            errors["income_date"] = "Date is required"
-
+        values, errors = validate_income(income_data, await get_currencies(db))
         if errors:
             return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
 
-        updated_income = crud_update_income(db, income_id, user.id, source, float(amount), description or None, datetime.strptime(income_date, "%Y-%m-%d"))
+        updated_income = await crud_update_income(db, income_id, user.id, **values)
         if not updated_income:
             return JSONResponse(status_code=404, content={"status": "error", "message": "Income not found"})
 
-        return JSONResponse(status_code=200, content={"status": "success", "message": "Income updated successfully", "data": {
-            "id": updated_income.id,
-            "source": updated_income.source,
-            "amount": updated_income.amount,
-            "description": updated_income.description,
-            "income_date": updated_income.income_date.strftime("%Y-%m-%d")
-        }})
+        return ORJSONResponse(status_code=200, content={"status": "success", "message": "Income updated successfully", "data": _income_data(updated_income)})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error updating income: {str(e)}"})
 
 @router.delete("/income/{income_id}")
-async def delete_income(income_id: int, email: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_income(income_id: int, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        if not crud_delete_income(db, income_id, user.id):
+        if not await crud_delete_income(db, income_id, user.id):
             return JSONResponse(status_code=404, content={"status": "error", "message": "Income not found"})
 
         return JSONResponse(status_code=200, content={"status": "success", "message": "Income deleted successfully"})
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(status_code=500, content={"status": "error", "message": f"Error deleting income: {str(e)}"})
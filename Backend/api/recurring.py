@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from core.security import CurrentUser, get_current_user, get_read_db
+from api.validation import validate_recurring_rule, validate_recurring_rule_changes
+from crud.async_fx_crud import get_currencies
+from crud.async_recurring_crud import get_recurring_rules as crud_get_recurring_rules, get_recurring_rule as crud_get_recurring_rule, create_recurring_rule as crud_create_recurring_rule, update_recurring_rule as crud_update_recurring_rule, delete_recurring_rule as crud_delete_recurring_rule
+
+router = APIRouter()
+
+def _date_str(value):
+    return value.strftime("%Y-%m-%d") if value else None
+
+def _rule_data(rule) -> dict:
+    return {
+        "id": rule.id,
+        "kind": rule.kind,
+        "amount": rule.amount,
+        "currency": rule.currency,
+        "category": rule.category,
+        "source": rule.source,
+        "description": rule.description,
+        "frequency": rule.frequency,
+        "interval": rule.interval,
+        "start_date": _date_str(rule.start_date),
+        "end_date": _date_str(rule.end_date),
+        "next_run_date": _date_str(rule.next_run_date),
+        "occurrence_count": rule.occurrence_count,
+        "active": rule.active,
+    }
+
+@router.get("/recurring")
+async def list_recurring_rules(user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    try:
+        rules = await crud_get_recurring_rules(db, user.id)
+        return JSONResponse(status_code=200, content={"status": "success", "data": [_rule_data(rule) for rule in rules]})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Server error: {str(e)}"})
+
+@router.post("/recurring")
+async def create_recurring_rule(rule_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        values, errors = validate_recurring_rule(rule_data, await get_currencies(db))
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
+
+        rule = await crud_create_recurring_rule(db, user.id, values)
+        return JSONResponse(status_code=201, content={"status": "success", "message": "Recurring rule added successfully", "data": _rule_data(rule)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error adding recurring rule: {str(e)}"})
+
+@router.put("/recurring/{rule_id}")
+async def update_recurring_rule(rule_id: int, rule_data: dict, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        rule = await crud_get_recurring_rule(db, rule_id, user.id)
+        if not rule:
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Recurring rule not found"})
+
+        changes, errors = validate_recurring_rule_changes(rule_data, rule, await get_currencies(db))
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Validation failed", "errors": errors})
+
+        rule = await crud_update_recurring_rule(db, rule_id, user.id, changes)
+        if not rule:
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Recurring rule not found"})
+        return JSONResponse(status_code=200, content={"status": "success", "message": "Recurring rule updated successfully", "data": _rule_data(rule)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error updating recurring rule: {str(e)}"})
+
+@router.delete("/recurring/{rule_id}")
+async def delete_recurring_rule(rule_id: int, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    try:
+        if not await crud_delete_recurring_rule(db, rule_id, user.id):
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Recurring rule not found"})
+
+        return JSONResponse(status_code=200, content={"status": "success", "message": "Recurring rule deleted successfully"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error deleting recurring rule: {str(e)}"})
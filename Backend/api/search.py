@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from core.security import CurrentUser, get_current_user, get_read_db
+from core.config import SEARCH_PAGE_SIZE
+from crud.pagination import InvalidCursor, MAX_PAGE_SIZE
+from crud.search_crud import search_records
+
+router = APIRouter()
+
+@router.get("/search")
+async def search(
+    q: str = "",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Full-text search over expense category/description and income source/description; the best of each kind alternate."""
+    try:
+        errors = {}
+        if not q.strip():
+            errors["q"] = "Search query is required"
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            errors["limit"] = f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+        if errors:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": errors})
+
+        try:
+            rows, next_cursor = await db.run_sync(search_records, user.id, q, limit or SEARCH_PAGE_SIZE, cursor)
+        except InvalidCursor:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid query parameters", "errors": {"cursor": "Invalid cursor"}})
+
+        results = [
+            {
+                "type": kind, "id": record_id, "date": date.date() if date else None, "amount": amount, "currency": currency,
+                "category" if kind == "expense" else "source": label, "description": description or "",
+                "score": round(score, 4),
+            }
+            for kind, record_id, date, label, amount, currency, description, score in rows
+        ]
+        return ORJSONResponse(status_code=200, content={"status": "success", "data": results, "next_cursor": next_cursor, "has_more": next_cursor is not None})
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Error searching: {str(e)}"})
@@ -0,0 +1,90 @@
+# The numeric side of GET /analytics/trend, kept out of api.analytics so that
+# numpy and pandas are imported by the first trend request rather than at startup.
+import numpy as np
+import pandas as pd
+from core.config import BASE_CURRENCY
+from api.analytics import GROUPINGS
+
+# The forecast line is fitted to at most this many of the latest complete periods.
+FORECAST_LOOKBACK = 12
+
+def _values(values, digits: int = 2):
+    """Round a float array to a JSON-ready list, with NaN as None."""
+    rounded = np.round(values, digits).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+def _moving_average(values, window: int):
+    """Trailing mean over `window` values; NaN until a full window is available."""
+    average = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        average[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return average
+
+def _linear_forecast(values, horizon: int):
+    """Extend a straight-line fit of `values` by `horizon` steps, never below zero."""
+    if len(values) < 2:
+        return np.full(horizon, values[0] if len(values) else 0.0)
+    slope, intercept = np.polyfit(np.arange(len(values), dtype=float), values, 1)
+    return np.clip(intercept + slope * np.arange(len(values), len(values) + horizon), 0, None)
+
+def build_trend(days, opening_balance: float, start, end, group_by: str, window: int, forecast: int) -> dict:
+    """Resample daily [[day, expense, income], ...] rows into periods, with a running balance,
+    trailing moving averages and a linear forecast."""
+    freq, label_format, _ = GROUPINGS[group_by]
+    calendar = pd.date_range(start, end, freq="D")
+    daily = {"expense": np.zeros(len(calendar)), "income": np.zeros(len(calendar))}
+    if days:
+        day_labels, expenses, incomes = zip(*days)
+        positions = (pd.DatetimeIndex(day_labels) - calendar[0]).days.to_numpy()
+        daily["expense"][positions] = expenses
+        daily["income"][positions] = incomes
+
+    # Periods are consecutive, so the factorized codes are already in order.
+    codes, periods = pd.factorize(calendar.to_period(freq))
+    totals = {name: np.bincount(codes, weights=values, minlength=len(periods)) for name, values in daily.items()}
+    net = totals["income"] - totals["expense"]
+
+    period_starts = periods.start_time
+    # The first and last periods may only be partly inside the range.
+    first_days = period_starts.where(period_starts >= calendar[0], calendar[0])
+    period_ends = periods.end_time.normalize()
+    last_days = period_ends.where(period_ends <= calendar[-1], calendar[-1])
+
+    columns = {
+        "period": period_starts.strftime(label_format).tolist(),
+        "start": first_days.strftime("%Y-%m-%d").tolist(),
+        "end": last_days.strftime("%Y-%m-%d").tolist(),
+        "income": _values(totals["income"]),
+        "expense": _values(totals["expense"]),
+        "net": _values(net),
+        "balance": _values(opening_balance + np.cumsum(net)),
+        "expense_moving_average": _values(_moving_average(totals["expense"], window)),
+        "income_moving_average": _values(_moving_average(totals["income"], window)),
+    }
+    data = [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    projected = []
+    complete = np.flatnonzero(np.asarray(period_starts >= calendar[0]) & np.asarray(period_ends <= calendar[-1]))[-FORECAST_LOOKBACK:]
+    if forecast and len(complete):
+        future = pd.period_range(periods[-1] + 1, periods=forecast, freq=freq)
+        projected_columns = {
+            "period": future.start_time.strftime(label_format).tolist(),
+            "income": _values(_linear_forecast(totals["income"][complete], forecast)),
+            "expense": _values(_linear_forecast(totals["expense"][complete], forecast)),
+        }
+        projected = [dict(zip(projected_columns, row)) for row in zip(*projected_columns.values())]
+
+    return {
+        "group_by": group_by,
+        "currency": BASE_CURRENCY,
+        "start": calendar[0].strftime("%Y-%m-%d"),
+        "end": calendar[-1].strftime("%Y-%m-%d"),
+        "opening_balance": round(opening_balance, 2),
+        "total_income": round(float(totals["income"].sum()), 2),
+        "total_expense": round(float(totals["expense"].sum()), 2),
+        "average_expense": round(float(totals["expense"].mean()), 2),
+        "periods": data,
+        "forecast": projected,
+    }
@@ -0,0 +1,190 @@
+import math
+from datetime import datetime
+from crud.recurring_crud import RECURRING_KINDS, FREQUENCIES
+from crud.fx_crud import CURRENCY_PATTERN, CENT_CURRENCIES
+from core.config import BASE_CURRENCY
+
+# Amounts are stored as whole hundredths in a BIGINT; this keeps them well inside it.
+MAX_AMOUNT = 10 ** 13
+
+def _text(data: dict, field: str) -> str:
+    value = data.get(field)
+    return str(value).strip() if value is not None else ""
+
+def _amount(data: dict, errors: dict):
+    try:
+        amount = float(data.get("amount") or 0)
+    except (TypeError, ValueError):
+        amount = 0
+    if not math.isfinite(amount) or amount <= 0:
+        errors["amount"] = "Amount must be > 0"
+        return None
+    if amount >= MAX_AMOUNT:
+        errors["amount"] = f"Amount must be less than {MAX_AMOUNT}"
+        return None
+    return amount
+
+def _currency(data: dict, errors: dict, currencies=None):
+    """ISO 4217 code, BASE_CURRENCY when omitted; currencies (if given) are the ones with a rate loaded."""
+    currency = _text(data, "currency").upper() or BASE_CURRENCY
+    if not CURRENCY_PATTERN.fullmatch(currency):
+        errors["currency"] = "Currency must be a 3-letter code"
+        return None
+    if currency not in CENT_CURRENCIES:
+        errors["currency"] = f"{currency} is not supported: amounts are kept to the cent"
+        return None
+    if currencies is not None and currency not in currencies:
+        errors["currency"] = f"No exchange rate for {currency}"
+        return None
+    return currency
+
+def _date(data: dict, field: str, errors: dict):
+    value = _text(data, field)
+    if not value:
+        errors[field] = "Date is required"
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        errors[field] = "Date must be in YYYY-MM-DD format"
+        return None
+
+def validate_expense(data: dict, currencies=None):
+    """Validate an expense payload (JSON body, CSV row or NDJSON record).
+
+    Returns (values, errors); values holds the keyword arguments for
+    create_expense/update_expense and is only meaningful when errors is empty.
+    currencies is the set from get_currencies; None skips the rate check.
+    """
+    errors = {}
+    amount = _amount(data, errors)
+    category = _text(data, "category")
+    if not category:
+        errors["category"] = "Category is required"
+    date = _date(data, "date", errors)
+    currency = _currency(data, errors, currencies)
+    return {"amount": amount, "category": category, "description": _text(data, "description") or None, "date": date,
+            "currency": currency}, errors
+
+def validate_income(data: dict, currencies=None):
+    """Validate an income payload; see validate_expense."""
+    errors = {}
+    source = _text(data, "source")
+    if not source:
+        errors["source"] = "Source is required"
+    amount = _amount(data, errors)
+    income_date = _date(data, "income_date", errors)
+    currency = _currency(data, errors, currencies)
+    return {"source": source, "amount": amount, "description": _text(data, "description") or None, "income_date": income_date,
+            "currency": currency}, errors
+
+def _changes_only(data: dict, values: dict, errors: dict, fields):
+    present = [field for field in fields if field in data]
+    if not present:
+        return {}, {"data": f"At least one of {', '.join(fields)} is required"}
+    return {field: values[field] for field in present}, {field: errors[field] for field in present if field in errors}
+
+def validate_expense_changes(data: dict, currencies=None):
+    """Validate a partial expense update; only the fields present in `data` are checked and returned."""
+    values, errors = validate_expense(data, currencies)
+    return _changes_only(data, values, errors, ("amount", "category", "description", "date", "currency"))
+
+def validate_income_changes(data: dict, currencies=None):
+    """Validate a partial income update; see validate_expense_changes."""
+    values, errors = validate_income(data, currencies)
+    return _changes_only(data, values, errors, ("source", "amount", "description", "income_date", "currency"))
+
+def _optional_date(data: dict, field: str, errors: dict):
+    if not _text(data, field):
+        return None
+    value = _date(data, field, errors)
+    return value.date() if value else None
+
+def _recurring_label(data: dict, kind: str, errors: dict):
+    field = "category" if kind == "expense" else "source"
+    label = _text(data, field)
+    if not label:
+        errors[field] = f"{field.capitalize()} is required"
+    return {"category": label, "source": None} if kind == "expense" else {"category": None, "source": label}
+
+def validate_recurring_rule(data: dict, currencies=None):
+    """Validate a recurring rule payload; see validate_expense.
+
+    kind is "expense" (with a category) or "income" (with a source), and the
+    rule repeats every `interval` days/weeks/months/years from start_date.
+    """
+    errors = {}
+    kind = _text(data, "kind")
+    if kind not in RECURRING_KINDS:
+        errors["kind"] = f"Kind must be one of: {', '.join(RECURRING_KINDS)}"
+    amount = _amount(data, errors)
+    currency = _currency(data, errors, currencies)
+    label = _recurring_label(data, kind, errors) if kind in RECURRING_KINDS else {}
+    frequency = _text(data, "frequency")
+    if frequency not in FREQUENCIES:
+        errors["frequency"] = f"Frequency must be one of: {', '.join(FREQUENCIES)}"
+    interval = data.get("interval", 1)
+    if isinstance(interval, bool) or not isinstance(interval, int) or not 1 <= interval <= 366:
+        errors["interval"] = "Interval must be a whole number between 1 and 366"
+    start_date = _date(data, "start_date", errors)
+    start_date = start_date.date() if start_date else None
+    end_date = _optional_date(data, "end_date", errors)
+    if start_date and end_date and end_date < start_date:
+        errors["end_date"] = "End date must not be before the start date"
+    return {
+        "kind": kind, "amount": amount, "currency": currency, **label, "description": _text(data, "description") or None,
+        "frequency": frequency, "interval": interval, "start_date": start_date, "end_date": end_date,
+    }, errors
+
+def validate_recurring_rule_changes(data: dict, rule, currencies=None):
+    """Validate a partial update of `rule`.
+
+    Only amount, currency, category/source, description, end_date and active
+    can change; a different schedule is a new rule.
+    """
+    label_field = "category" if rule.kind == "expense" else "source"
+    fields = ("amount", "currency", label_field, "description", "end_date", "active")
+    present = [field for field in fields if field in data]
+    if not present:
+        return {}, {"data": f"At least one of {', '.join(fields)} is required"}
+    errors, changes = {}, {}
+    if "amount" in data:
+        changes["amount"] = _amount(data, errors)
+    if "currency" in data:
+        changes["currency"] = _currency(data, errors, currencies)
+    if label_field in data:
+        changes[label_field] = _recurring_label(data, rule.kind, errors)[label_field]
+    if "description" in data:
+        changes["description"] = _text(data, "description") or None
+    if "end_date" in data:
+        changes["end_date"] = _optional_date(data, "end_date", errors)
+        if changes["end_date"] and changes["end_date"] < rule.start_date:
+            errors["end_date"] = "End date must not be before the start date"
+    if "active" in data:
+        if not isinstance(data["active"], bool):
+            errors["active"] = "Active must be true or false"
+        changes["active"] = data["active"]
+    return changes, errors
+
+def validate_budget(data: dict):
+    """Validate a budget payload (category and monthly amount); see validate_expense."""
+    errors = {}
+    category = _text(data, "category")
+    if not category:
+        errors["category"] = "Category is required"
+    elif len(category) > 50:
+        errors["category"] = "Category must be at most 50 characters"
+    amount = _amount(data, errors)
+    return {"category": category, "amount": amount}, errors
+
+def validate_budget_changes(data: dict):
+    """Validate a budget update; only the amount can change."""
+    values, errors = validate_budget(data)
+    return _changes_only(data, values, errors, ("amount",))
+
+def validate_month(value: str, errors: dict, field: str = "month"):
+    try:
+        return datetime.strptime(value, "%Y-%m").strftime("%Y-%m")
+    except ValueError:
+        errors[field] = "Month must be in YYYY-MM format"
+        return None
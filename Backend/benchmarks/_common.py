@@ -0,0 +1,145 @@
+"""Shared setup for the benchmark scripts.
+
+Run benchmarks from the Backend directory, e.g.::
+
+    python -m benchmarks.bench_dashboard --rows 100000
+
+Unless DATABASE_URL is already set, a throwaway SQLite file in the temp
+directory is used so nothing touches a real database.
+"""
+import os
+import json
+import random
+import statistics
+import tempfile
+import time
+import zlib
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+BENCH_DB_PATH = os.path.join(tempfile.gettempdir(), "expense_tracker_bench.db")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("SMTP_SERVER", "localhost")
+os.environ.setdefault("SMTP_PORT", "1025")
+os.environ.setdefault("EMAIL_USER", "bench@example.com")
+os.environ.setdefault("EMAIL_PASSWORD", "bench")
+os.environ.setdefault("SMTP_STARTTLS", "False")
+# Benchmarks hammer the auth routes from one client; bench_rate_limit turns it back on.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+from sqlalchemy import insert
+from database import engine, SessionLocal, Base
+from models import User, Expense, Income
+from crud.rollup_crud import rebuild_rollups
+
+CATEGORIES = ["Food", "Rent", "Transport", "Shopping", "Bills", "Health", "Travel", "Entertainment"]
+SOURCES = ["Salary", "Freelance", "Interest", "Gift", "Refund"]
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_user(db, email: str = "bench@example.com", password_hash: str = "x") -> int:
+    mobile = f"{zlib.crc32(email.encode()):010d}"
+    user = User(fullname="Bench User", email=email, gender="other", mobilenumber=mobile, password=password_hash)
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def seed_rows(db, user_id: int, expenses: int, incomes: int, days: int = 730, batch_size: int = 10000, seed: int = 42,
+              currencies=None):
+    """Bulk insert synthetic history spread over the last `days` days.
+
+    Rows are in BASE_CURRENCY unless `currencies` is given; each row then picks one at random.
+
+    Rows bypass the CRUD layer, so the user's rollups are rebuilt afterwards.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    def batches(total, make_row):
+        for start in range(0, total, batch_size):
+            yield [make_row() for _ in range(min(batch_size, total - start))]
+
+    def expense_row():
+        return {
+            "user_id": user_id,
+            "amount": round(rng.uniform(1, 500), 2),
+            "category": rng.choice(CATEGORIES),
+            "description": f"expense {rng.randint(1, 10**6)}",
+            "date": now - timedelta(days=rng.random() * days),
+            **({"currency": rng.choice(currencies)} if currencies else {}),
+        }
+
+    def income_row():
+        return {
+            "user_id": user_id,
+            "source": rng.choice(SOURCES),
+            "amount": round(rng.uniform(100, 5000), 2),
+            "description": f"income {rng.randint(1, 10**6)}",
+            "income_date": now - timedelta(days=rng.random() * days),
+            **({"currency": rng.choice(currencies)} if currencies else {}),
+        }
+
+    for rows in batches(expenses, expense_row):
+        db.execute(insert(Expense), rows)
+    for rows in batches(incomes, income_row):
+        db.execute(insert(Income), rows)
+    rebuild_rollups(db, user_id)
+    db.commit()
+
+
+def auth_headers(email: str = "bench@example.com", user_id: int = None) -> dict:
+    from core.security import create_access_token
+    data = {"sub": email}
+    if user_id is not None:
+        data["uid"] = user_id
+    return {"Authorization": f"Bearer {create_access_token(data=data)}"}
+
+
+@asynccontextmanager
+async def asgi_client(app=None):
+    """httpx client that drives `app` (main.app by default) in-process, without a network socket."""
+    import httpx
+    from database import async_engine
+    if app is None:
+        from main import app
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            yield client
+    finally:
+        await async_engine.dispose()
+
+
+def measure(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+def report(name: str, results: dict):
+    print(json.dumps({"benchmark": name, "results": results}, indent=2, default=str))
+
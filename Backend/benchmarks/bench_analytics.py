@@ -0,0 +1,136 @@
+"""GET /analytics/trend over multi-year histories.
+
+For each history size, every group_by is timed over the whole history:
+* cold: the closed-month cache is empty, so the daily SQL aggregate runs
+* warm: closed months come from the cache; only the current month is queried
+* orm_loop: the same monthly series built by loading ORM objects and summing
+  them in Python, for comparison
+
+It then checks that a write dated in the current month keeps the closed-month
+cache warm, that a backdated write invalidates it, and that the totals and
+the final balance agree with plain SQL sums.
+
+    python -m benchmarks.bench_analytics --rows 100000 500000 --years 5
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+from core.cache import cache
+from models import Expense, Income
+
+GROUPINGS = ("day", "week", "month", "year")
+
+
+def orm_monthly(user_id: int, start):
+    db = SessionLocal()
+    try:
+        months = defaultdict(lambda: [0.0, 0.0])
+        for expense in db.query(Expense).filter(Expense.user_id == user_id, Expense.date >= start):
+            months[expense.date.strftime("%Y-%m")][0] += expense.amount
+        for income in db.query(Income).filter(Income.user_id == user_id, Income.income_date >= start):
+            months[income.income_date.strftime("%Y-%m")][1] += income.amount
+        return [(month, *months[month]) for month in sorted(months)]
+    finally:
+        db.close()
+
+
+def sql_totals(user_id: int):
+    db = SessionLocal()
+    try:
+        spent = db.execute(select(func.sum(Expense.amount)).where(Expense.user_id == user_id)).scalar() or 0
+        earned = db.execute(select(func.sum(Income.amount)).where(Income.user_id == user_id)).scalar() or 0
+        return float(spent), float(earned)
+    finally:
+        db.close()
+
+
+async def timed_get(client, path, headers, repeat, before_each=None):
+    samples = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return summarize(samples), response.json()["data"]
+
+
+async def measure(rows: int, years: int, repeat: int):
+    days = 365 * years
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=rows, incomes=rows // 10, days=days)
+    finally:
+        db.close()
+    cache.clear()
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days)
+    results = {"rows": rows, "years": years}
+    headers = auth_headers(user_id=user_id)
+    async with asgi_client() as client:
+        base = f"/analytics/trend?start={start:%Y-%m-%d}&end={today:%Y-%m-%d}"
+        await client.get(base, headers=headers)  # warm imports and pools
+        for group_by in GROUPINGS:
+            path = f"{base}&group_by={group_by}&window=7"
+            cold, data = await timed_get(client, path, headers, repeat, before_each=cache.clear)
+            warm, _ = await timed_get(client, path, headers, repeat)
+            results[group_by] = {"periods": len(data["periods"]), "cold": cold, "warm": warm,
+                                 "warm_speedup_p50": cold["p50_ms"] / warm["p50_ms"]}
+
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            orm_monthly(user_id, start)
+            samples.append(time.perf_counter() - started)
+        results["orm_loop_month"] = summarize(samples)
+        results["month_vs_orm_loop_cold_p50"] = results["orm_loop_month"]["p50_ms"] / results["month"]["cold"]["p50_ms"]
+
+        path = f"{base}&group_by=month"
+        before = (await client.get(path, headers=headers)).json()["data"]
+        spent, earned = sql_totals(user_id)
+        results["totals_match"] = (abs(before["total_expense"] - round(spent, 2)) < 0.05
+                                   and abs(before["total_income"] - round(earned, 2)) < 0.05)
+        results["final_balance_matches"] = abs(before["periods"][-1]["balance"] - round(earned - spent, 2)) < 0.05
+
+        # A write in the current month leaves the closed-month cache entry in place.
+        hits = cache.stats()["hits"]
+        response = await client.post("/expense", headers=headers, json={"amount": 10, "category": "Food", "date": f"{today:%Y-%m-%d}"})
+        response.raise_for_status()
+        current, _ = await timed_get(client, path, headers, 1)
+        results["after_current_month_write"] = {"ms": current["p50_ms"], "closed_cache_hit": cache.stats()["hits"] > hits}
+
+        # A backdated write shows up in the closed months straight away.
+        backdated = (today.replace(day=1) - timedelta(days=40)).strftime("%Y-%m")
+        response = await client.post("/expense", headers=headers, json={"amount": 1000, "category": "Food", "date": f"{backdated}-05"})
+        response.raise_for_status()
+        after = (await client.get(path, headers=headers)).json()["data"]
+        month_before = next(p for p in before["periods"] if p["period"] == backdated)
+        month_after = next(p for p in after["periods"] if p["period"] == backdated)
+        results["backdated_write_visible"] = abs(month_after["expense"] - month_before["expense"] - 1000) < 0.01
+    return results
+
+
+async def run(args):
+    report("analytics", [await measure(rows, args.years, args.repeat) for rows in args.rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
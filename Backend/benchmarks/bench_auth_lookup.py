@@ -0,0 +1,76 @@
+"""Statements and latency per authenticated request, with and without the auth caches.
+
+Each mode sends GET /expense?limit=50 and counts the SQL statements issued:
+
+* email_lookup: a token without `uid` and empty caches on every request
+  (the old verify_token + get_user_by_email shape)
+* uid_cold: a token with `uid` and empty caches on every request
+* uid_warm: a token with `uid` and warm caches
+
+    python -m benchmarks.bench_auth_lookup --requests 500
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+from core.cache import token_cache, user_cache
+from database import async_engine
+
+
+def clear_auth_caches():
+    token_cache.clear()
+    user_cache.clear()
+
+
+async def run_requests(client, headers, count: int, before_each=None):
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    latencies = []
+    try:
+        for _ in range(count):
+            if before_each:
+                before_each()
+            start = time.perf_counter()
+            response = await client.get("/expense?limit=50", headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    return dict(summarize(latencies), statements_per_request=statements[0] / count)
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+
+    results = {"rows": args.rows}
+    async with asgi_client() as client:
+        results["email_lookup"] = await run_requests(client, auth_headers(), args.requests, before_each=clear_auth_caches)
+        uid_headers = auth_headers(user_id=user_id)
+        results["uid_cold"] = await run_requests(client, uid_headers, args.requests, before_each=clear_auth_caches)
+        results["uid_warm"] = await run_requests(client, uid_headers, args.requests)
+    results["user_cache"] = user_cache.stats()
+    report("auth_lookup", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
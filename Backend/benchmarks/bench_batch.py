@@ -0,0 +1,93 @@
+"""Recategorize and delete N expenses one request at a time vs one POST /expense/batch.
+
+    python -m benchmarks.bench_batch --ops 200
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, report
+from crud.rollup_crud import check_rollups
+from models import Expense
+
+
+def pick_expenses(user_id: int, count: int, offset: int):
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(Expense.id, Expense.amount, Expense.date)
+            .where(Expense.user_id == user_id).order_by(Expense.id).offset(offset).limit(count)
+        ).all()
+    finally:
+        db.close()
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=0)
+    finally:
+        db.close()
+
+    headers = auth_headers(user_id=user_id)
+    results = {"ops": args.ops}
+    async with asgi_client() as client:
+        async def one_by_one(rows):
+            for row in rows:
+                response = await client.put(f"/expense/{row.id}", headers=headers, json={
+                    "amount": row.amount, "category": "Recategorized", "date": row.date.strftime("%Y-%m-%d"),
+                })
+                response.raise_for_status()
+            for row in rows:
+                (await client.delete(f"/expense/{row.id}", headers=headers)).raise_for_status()
+
+        async def batched(rows):
+            update = [{"op": "update", "id": row.id, "data": {"category": "Recategorized"}} for row in rows]
+            response = await client.post("/expense/batch", headers=headers, json={"operations": update})
+            response.raise_for_status()
+            delete = [{"op": "delete", "id": row.id} for row in rows]
+            response = await client.post("/expense/batch", headers=headers, json={"operations": delete})
+            response.raise_for_status()
+
+        single_seconds = await timed(one_by_one(pick_expenses(user_id, args.ops, 0)))
+        batch_seconds = await timed(batched(pick_expenses(user_id, args.ops, 0)))
+        results["single_requests_seconds"] = single_seconds
+        results["batch_seconds"] = batch_seconds
+        results["speedup"] = single_seconds / batch_seconds
+
+        # A missing id rejects the whole batch without writing anything.
+        rows = pick_expenses(user_id, 2, 0)
+        response = await client.post("/expense/batch", headers=headers, json={"operations": [
+            {"op": "update", "id": rows[0].id, "data": {"category": "Should not apply"}},
+            {"op": "delete", "id": 10 ** 9},
+        ]})
+        results["missing_id_status"] = response.status_code
+        results["missing_id_left_row_unchanged"] = pick_expenses(user_id, 1, 0)[0] == rows[0]
+
+    db = SessionLocal()
+    try:
+        results["rollup_mismatches"] = len(check_rollups(db, user_id))
+    finally:
+        db.close()
+    report("batch", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=10_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
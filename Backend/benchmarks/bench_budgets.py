@@ -0,0 +1,124 @@
+"""Cost of budget evaluation as the month's history grows.
+
+For each size, seeds that many expenses into the current month, then measures:
+
+* write: POST /expense latency and statements, without budgets and with one
+  budget per category (the alert check reads the rollup row, not the month)
+* status: GET /budgets/status, which joins budgets to the rollup rows
+* rescan: the same status computed by summing the month's expenses (what
+  the endpoint would cost without the rollups)
+
+    python -m benchmarks.bench_budgets --rows 10000 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy import event, select, func, insert
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, auth_headers, asgi_client, summarize, report, CATEGORIES
+from crud.rollup_crud import rebuild_rollups
+from database import async_engine
+from models import Expense, Budget, BudgetAlert
+
+
+def seed_month(user_id: int, rows: int):
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        for start in range(0, rows, 10_000):
+            db.execute(insert(Expense), [
+                {"user_id": user_id, "amount": 1.0, "category": CATEGORIES[i % len(CATEGORIES)],
+                 "description": "bench", "date": now.replace(day=1, hour=12)}
+                for i in range(start, min(rows, start + 10_000))
+            ])
+        rebuild_rollups(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+def rescan_status(user_id: int):
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(Budget.category, Budget.amount, func.coalesce(func.sum(Expense.amount), 0))
+            .outerjoin(Expense, (Expense.user_id == Budget.user_id) & (Expense.category == Budget.category) & (Expense.date >= month_start))
+            .where(Budget.user_id == user_id).group_by(Budget.category, Budget.amount)
+        ).all()
+    finally:
+        db.close()
+
+
+async def timed_requests(client, method: str, path: str, headers: dict, count: int, body=None):
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    samples = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.request(method, path, headers=headers, json=body)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    return dict(summarize(samples), statements_per_request=statements[0] / count)
+
+
+async def measure(rows: int, requests: int) -> dict:
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+    finally:
+        db.close()
+    seed_month(user_id, rows)
+    headers = auth_headers(user_id=user_id)
+    expense = {"amount": 1.0, "category": CATEGORIES[0], "date": datetime.utcnow().strftime("%Y-%m-%d")}
+
+    result = {}
+    async with asgi_client() as client:
+        await client.get("/budgets/status", headers=headers)  # warm up
+        result["write_without_budgets"] = await timed_requests(client, "POST", "/expense", headers, requests, expense)
+        # Budgets just above the current spending, so the writes below cross thresholds.
+        for category in CATEGORIES:
+            response = await client.post("/budgets", headers=headers, json={"category": category, "amount": rows / len(CATEGORIES) + requests})
+            response.raise_for_status()
+        result["write_with_budgets"] = await timed_requests(client, "POST", "/expense", headers, requests, expense)
+        result["status"] = await timed_requests(client, "GET", "/budgets/status", headers, requests)
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        rescan_status(user_id)
+        samples.append(time.perf_counter() - start)
+    result["rescan"] = summarize(samples)
+
+    db = SessionLocal()
+    try:
+        result["alerts_recorded"] = db.execute(select(func.count()).select_from(BudgetAlert)).scalar()
+    finally:
+        db.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    async def run():
+        return {str(rows): await measure(rows, args.requests) for rows in args.rows}
+
+    report("budgets", asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    main()
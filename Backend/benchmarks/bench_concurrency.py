@@ -0,0 +1,116 @@
+"""Throughput of a blocking (sync Session) handler vs the AsyncSession handler under concurrency.
+
+SQLite answers in microseconds, which hides the cost of blocking the event
+loop on database I/O. To stand in for a network round-trip to MySQL, every
+statement sleeps --latency-ms inside the thread that executes it: the event
+loop thread for the sync engine, aiosqlite's worker thread for the async one.
+
+    python -m benchmarks.bench_concurrency --concurrency 1 10 100 200 --latency-ms 2
+"""
+import argparse
+import asyncio
+import sqlite3
+import time
+
+from fastapi import Depends
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks._common import BENCH_DB_PATH, SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+from core.security import verify_token
+from crud.expense_crud import get_expenses_page
+from database import get_async_db
+from main import app
+from models import User
+
+
+class SimulatedLatencyConnection(sqlite3.Connection):
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.latency:
+            self.set_trace_callback(lambda statement: time.sleep(self.latency))
+
+
+def install_latency_engines(pool_size: int):
+    url = f"sqlite:///{BENCH_DB_PATH}"
+    connect_args = {"factory": SimulatedLatencyConnection, "check_same_thread": False}
+    sync_engine = create_engine(url, connect_args=connect_args, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), connect_args=connect_args, pool_size=pool_size, max_overflow=0)
+    BlockingSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def latency_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    @app.get("/bench/blocking-expense")
+    async def blocking_expense(email: str = Depends(verify_token)):
+        # The pre-async handler shape: sync Session calls inside `async def`.
+        db = BlockingSession()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            rows, _ = get_expenses_page(db, user.id, limit=50)
+            return {"status": "success", "count": len(rows)}
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_async_db] = latency_async_db
+    return sync_engine, async_engine
+
+
+async def drive(client, path: str, headers: dict, concurrency: int, requests_per_client: int):
+    latencies = []
+
+    async def worker():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return dict(summarize(latencies), requests_per_second=len(latencies) / elapsed)
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+
+    SimulatedLatencyConnection.latency = args.latency_ms / 1000
+    sync_engine, async_engine = install_latency_engines(max(args.concurrency))
+    headers = auth_headers(user_id=user_id)
+    results = {"latency_ms": args.latency_ms, "rows": args.rows}
+    try:
+        async with asgi_client() as client:
+            for concurrency in args.concurrency:
+                results[str(concurrency)] = {
+                    "blocking_sync_session": await drive(client, "/bench/blocking-expense", headers, concurrency, args.requests),
+                    "async_session": await drive(client, "/expense?limit=50", headers, concurrency, args.requests),
+                }
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+    report("concurrency", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 200])
+    parser.add_argument("--requests", type=int, default=5, help="requests per concurrent client")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated per-statement round-trip")
+    parser.add_argument("--rows", type=int, default=10_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Cost of converting mixed-currency totals, and exactness of stored amounts.
+
+For each history size two users are seeded with the same number of rows:
+one entirely in BASE_CURRENCY, one spread over BASE_CURRENCY and three
+foreign currencies. For both it times
+* dashboard: totals, category breakdown and monthly trend from the rollups
+* daily_totals: the per-day aggregate /analytics/trend is built from
+and, for the mixed user, python_per_row: loading every (amount, currency)
+row and converting it in Python, the approach the SQL join replaces.
+
+It then checks that the converted SQL total matches a Decimal reference
+computed row by row, and that 100,000 amounts of 0.10 sum to exactly
+10000.00 (a FLOAT column drifts).
+
+    python -m benchmarks.bench_currency --rows 10000 100000 --repeat 10
+"""
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, measure, summarize, report
+from core.config import BASE_CURRENCY
+from crud.dashboard_crud import get_totals, get_category_breakdown, get_monthly_trend
+from crud.analytics_crud import get_daily_totals
+from crud.fx_crud import load_rates
+from models import Expense
+
+RATES = {"USD": 83.25, "EUR": 90.10, "GBP": 105.40}
+CURRENCIES = [BASE_CURRENCY, *RATES]
+
+
+def dashboard(db, user_id: int):
+    since = datetime.utcnow() - timedelta(days=30)
+    return get_totals(db, user_id), get_category_breakdown(db, user_id), get_monthly_trend(db, user_id, since)
+
+
+def daily_totals(db, user_id: int):
+    return get_daily_totals(db, user_id, datetime.utcnow() - timedelta(days=800), datetime.utcnow())
+
+
+def python_per_row(db, user_id: int):
+    rates = {BASE_CURRENCY: 1.0, **RATES}
+    rows = db.execute(select(Expense.amount, Expense.currency).where(Expense.user_id == user_id))
+    return round(sum(amount * rates[currency] for amount, currency in rows), 2)
+
+
+def decimal_reference(db, user_id: int):
+    rates = {BASE_CURRENCY: Decimal(1), **{currency: Decimal(str(rate)) for currency, rate in RATES.items()}}
+    rows = db.execute(select(Expense.amount, Expense.currency).where(Expense.user_id == user_id))
+    return float(sum(Decimal(str(amount)) * rates[currency] for amount, currency in rows).quantize(Decimal("0.01")))
+
+
+def exact_sum_check(db, rows: int = 100_000):
+    user_id = seed_user(db, email="exact@example.com")
+    now = datetime.utcnow()
+    db.execute(insert(Expense), [{"user_id": user_id, "amount": 0.10, "category": "Food", "date": now} for _ in range(rows)])
+    db.commit()
+    total = db.execute(select(func.sum(Expense.amount)).where(Expense.user_id == user_id)).scalar()
+    return {"rows": rows, "sql_sum": total, "float_sum": sum(0.10 for _ in range(rows)), "exact": total == rows / 10}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="expense rows per user (incomes are rows / 10)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.rows:
+        reset_schema()
+        db = SessionLocal()
+        try:
+            load_rates(db, RATES)
+            single = seed_user(db, email="single@example.com")
+            seed_rows(db, single, expenses=rows, incomes=rows // 10)
+            mixed = seed_user(db, email="mixed@example.com")
+            seed_rows(db, mixed, expenses=rows, incomes=rows // 10, currencies=CURRENCIES)
+
+            size_results = {}
+            for name, fn in (("dashboard", dashboard), ("daily_totals", daily_totals)):
+                for label, user_id in (("single_currency", single), ("mixed_currency", mixed)):
+                    size_results[f"{name}_{label}"] = summarize(measure(lambda: fn(db, user_id), args.repeat))
+            size_results["python_per_row_mixed_currency"] = summarize(measure(lambda: python_per_row(db, mixed), args.repeat))
+
+            converted_total = get_totals(db, mixed)[0]
+            reference = decimal_reference(db, mixed)
+            size_results["converted_total"] = {"sql": converted_total, "decimal_reference": reference,
+                                               "within_a_cent": round(abs(converted_total - reference), 2) <= 0.01}
+            results[str(rows)] = size_results
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        results["exact_sum"] = exact_sum_check(db)
+    finally:
+        db.close()
+    report("currency", results)
+
+
+if __name__ == "__main__":
+    main()
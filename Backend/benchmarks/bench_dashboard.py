@@ -0,0 +1,112 @@
+"""Compare the dashboard computation strategies as history grows.
+
+* legacy_python_loops: load every ORM row and aggregate in Python
+* sql_scan: GROUP BY over the expense/income tables
+* rollups: read the monthly rollup tables (the current implementation)
+
+    python -m benchmarks.bench_dashboard --rows 10000 100000 --repeat 10
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, literal, union_all, case, extract
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, measure, summarize, report
+from models import Expense, Income
+from crud.dashboard_crud import get_totals, get_recent_expenses, get_category_breakdown, get_monthly_trend
+
+
+def legacy_dashboard(db, user_id: int):
+    """The original implementation: load every ORM row and aggregate in Python."""
+    expenses = db.query(Expense).filter(Expense.user_id == user_id).order_by(Expense.date.desc()).all()
+    incomes = db.query(Income).filter(Income.user_id == user_id).all()
+
+    total_spent = sum(exp.amount for exp in expenses)
+    total_income = sum(inc.amount for inc in incomes)
+    recent = [(exp.date.strftime("%Y-%m-%d"), exp.category, exp.amount) for exp in expenses[:5]]
+
+    category_breakdown = {}
+    for exp in expenses:
+        category_breakdown[exp.category] = category_breakdown.get(exp.category, 0) + exp.amount
+
+    monthly_expenses = defaultdict(float)
+    monthly_incomes = defaultdict(float)
+    since = datetime.utcnow() - timedelta(days=30)
+    for exp in expenses:
+        if exp.date >= since:
+            monthly_expenses[exp.date.strftime("%Y-%m")] += exp.amount
+    for inc in incomes:
+        if inc.income_date >= since:
+            monthly_incomes[inc.income_date.strftime("%Y-%m")] += inc.amount
+    return total_spent, total_income, recent, category_breakdown, monthly_expenses, monthly_incomes
+
+
+def sql_scan_dashboard(db, user_id: int):
+    """Aggregate over the base tables with GROUP BY."""
+    since = datetime.utcnow() - timedelta(days=30)
+    totals = db.execute(select(
+        select(func.sum(Expense.amount)).where(Expense.user_id == user_id).scalar_subquery(),
+        select(func.sum(Income.amount)).where(Income.user_id == user_id).scalar_subquery(),
+    )).one()
+    categories = db.execute(
+        select(Expense.category, func.sum(Expense.amount)).where(Expense.user_id == user_id).group_by(Expense.category)
+    ).all()
+    movements = union_all(
+        select(extract("year", Expense.date).label("y"), extract("month", Expense.date).label("m"),
+               literal("expense").label("kind"), Expense.amount.label("amount"))
+        .where(Expense.user_id == user_id, Expense.date >= since),
+        select(extract("year", Income.income_date).label("y"), extract("month", Income.income_date).label("m"),
+               literal("income").label("kind"), Income.amount.label("amount"))
+        .where(Income.user_id == user_id, Income.income_date >= since),
+    ).subquery()
+    trend = db.execute(
+        select(movements.c.y, movements.c.m,
+               func.sum(case((movements.c.kind == "income", movements.c.amount), else_=0)),
+               func.sum(case((movements.c.kind == "expense", movements.c.amount), else_=0)))
+        .group_by(movements.c.y, movements.c.m)
+    ).all()
+    return totals, get_recent_expenses(db, user_id), categories, trend
+
+
+def rollup_dashboard(db, user_id: int):
+    since = datetime.utcnow() - timedelta(days=30)
+    return (
+        get_totals(db, user_id),
+        get_recent_expenses(db, user_id),
+        get_category_breakdown(db, user_id),
+        get_monthly_trend(db, user_id, since),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="expense rows to seed (incomes are rows / 10)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.rows:
+        reset_schema()
+        db = SessionLocal()
+        try:
+            user_id = seed_user(db)
+            seed_rows(db, user_id, expenses=rows, incomes=rows // 10)
+
+            size_results = {}
+            for name, fn in (("legacy_python_loops", legacy_dashboard), ("sql_scan", sql_scan_dashboard), ("rollups", rollup_dashboard)):
+                def run():
+                    fn(db, user_id)
+                    db.expunge_all()
+
+                run()
+                size_results[name] = summarize(measure(run, args.repeat))
+            results[str(rows)] = size_results
+        finally:
+            db.close()
+
+    report("dashboard", results)
+
+
+if __name__ == "__main__":
+    main()
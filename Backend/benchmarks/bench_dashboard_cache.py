@@ -0,0 +1,58 @@
+"""Request rate of GET /dashboard with a cold cache, a warm cache and ETag revalidation.
+
+    python -m benchmarks.bench_dashboard_cache --rows 100000 --requests 500
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, report
+from core.cache import cache, invalidate_user
+
+
+async def run_requests(client, headers, count: int, before_each=None, etag_header: bool = False):
+    statuses = {}
+    etag = None
+    start = time.perf_counter()
+    for _ in range(count):
+        if before_each:
+            before_each()
+        request_headers = dict(headers)
+        if etag_header and etag:
+            request_headers["If-None-Match"] = etag
+        response = await client.get("/dashboard", headers=request_headers)
+        etag = response.headers.get("etag", etag)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - start
+    return {"requests": count, "seconds": elapsed, "requests_per_second": count / elapsed, "statuses": statuses}
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+
+    headers = auth_headers(user_id=user_id)
+    results = {"rows": args.rows}
+    async with asgi_client() as client:
+        cache.clear()
+        results["cold"] = await run_requests(client, headers, args.requests, before_each=lambda: invalidate_user(user_id))
+        results["warm"] = await run_requests(client, headers, args.requests)
+        results["etag_304"] = await run_requests(client, headers, args.requests, etag_header=True)
+    results["cache_stats"] = cache.stats()
+    report("dashboard_cache", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Throughput and reliability of the email outbox worker against the fake SMTP server.
+
+* legacy: a new connection and login per email, as the old send_email_bg did
+* outbox: emails queued in email_outbox and drained by EmailWorker over one connection
+* flaky: the server answers every 5th message with a 451; everything must still arrive
+* bounce: 550 recipients are marked failed without being retried
+* forgot_password: request latency now that no SMTP work happens in the web process
+
+--handshake-ms stands in for the TLS negotiation and login a real provider costs.
+
+    python -m benchmarks.bench_email_outbox --emails 500 --handshake-ms 50
+"""
+import argparse
+import asyncio
+import smtplib
+import time
+
+from sqlalchemy import select, func
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, asgi_client, summarize, report
+from benchmarks.fake_smtp import FakeSMTPServer, BOUNCE_DOMAIN
+from core.email_worker import EmailWorker
+from core.mailer import SMTPMailer, build_message
+from crud.outbox_crud import add_email, get_outbox_stats
+from models import EmailOutbox
+
+
+def legacy_send(port: int, to_email: str):
+    server = smtplib.SMTP("127.0.0.1", port)
+    server.login("bench@example.com", "bench")
+    server.sendmail("bench@example.com", to_email, build_message("bench@example.com", to_email, "OTP for Password Reset", "Your OTP is 123456"))
+    server.quit()
+
+
+def queue_emails(recipients):
+    db = SessionLocal()
+    try:
+        for to_email in recipients:
+            add_email(db, to_email, "OTP for Password Reset", "Your OTP is 123456")
+        db.commit()
+    finally:
+        db.close()
+
+
+def outbox_counts():
+    db = SessionLocal()
+    try:
+        return get_outbox_stats(db)["counts"]
+    finally:
+        db.close()
+
+
+def drain(port: int, **worker_options) -> dict:
+    mailer = SMTPMailer(host="127.0.0.1", port=port, username="bench@example.com", password="bench", starttls=False)
+    worker = EmailWorker(mailer=mailer, **worker_options)
+    start = time.perf_counter()
+    worker.run(until_empty=True)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "connections": mailer.connections, "sent": worker.sent,
+            "retried": worker.retried, "failed": worker.failed, "outbox": outbox_counts()}
+
+
+def run(args):
+    reset_schema()
+    recipients = [f"user{i}@example.com" for i in range(args.emails)]
+    results = {"emails": args.emails, "handshake_ms": args.handshake_ms}
+
+    with FakeSMTPServer(args.port, handshake_ms=args.handshake_ms) as server:
+        start = time.perf_counter()
+        for to_email in recipients:
+            legacy_send(args.port, to_email)
+        seconds = time.perf_counter() - start
+        results["legacy"] = {"seconds": seconds, "emails_per_second": args.emails / seconds,
+                             "sessions": server.sessions, "delivered": len(server.messages)}
+
+        server.reset()
+        queue_emails(recipients)
+        outbox = drain(args.port)
+        outbox.update(emails_per_second=args.emails / outbox["seconds"], delivered=len(server.messages))
+        results["outbox"] = outbox
+        results["speedup"] = results["legacy"]["seconds"] / outbox["seconds"]
+
+    reset_schema()
+    with FakeSMTPServer(args.port, fail_every=5) as server:
+        queue_emails(recipients)
+        flaky = drain(args.port, retry_base_seconds=0)
+        flaky.update(rejected_by_server=server.rejected, delivered=len(server.messages),
+                     all_delivered=sorted(rcpt for _, (rcpt,), _ in server.messages) == sorted(recipients))
+        results["flaky"] = flaky
+
+    reset_schema()
+    with FakeSMTPServer(args.port) as server:
+        queue_emails([f"nobody{i}@{BOUNCE_DOMAIN}" for i in range(5)] + recipients[:5])
+        results["bounce"] = drain(args.port, retry_base_seconds=0)
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        seed_user(db)
+    finally:
+        db.close()
+
+    async def forgot_password():
+        samples = []
+        async with asgi_client() as client:
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = await client.post("/auth/send-otp", json={"email": "bench@example.com"})
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+        return samples
+
+    samples = asyncio.run(forgot_password())
+    db = SessionLocal()
+    try:
+        queued = db.execute(select(func.count()).select_from(EmailOutbox)).scalar()
+    finally:
+        db.close()
+    results["forgot_password"] = {"latency": summarize(samples), "queued": queued}
+    report("email_outbox", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
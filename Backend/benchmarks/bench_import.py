@@ -0,0 +1,103 @@
+"""Time POST /expense/import against the same rows sent one POST /expense at a time.
+
+The single-record rate is measured on --single requests and extrapolated to
+--rows. A few deliberately invalid rows check the error report, and the
+rollups are compared with the imported rows afterwards.
+
+    python -m benchmarks.bench_import --rows 100000 --single 500
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._common import CATEGORIES, SessionLocal, reset_schema, seed_user, auth_headers, asgi_client, report
+from crud.rollup_crud import check_rollups
+
+
+def make_records(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for i in range(count):
+        yield {
+            "amount": round(rng.uniform(1, 500), 2),
+            "category": rng.choice(CATEGORIES),
+            "description": f"imported {i}",
+            "date": (now - timedelta(days=rng.randrange(730))).strftime("%Y-%m-%d"),
+        }
+
+
+def make_upload(fmt: str, count: int, invalid: int) -> bytes:
+    records = list(make_records(count))
+    for i in range(invalid):
+        records[i * (count // max(invalid, 1))]["amount"] = "not-a-number"
+    if fmt == "ndjson":
+        return "".join(json.dumps(record) + "\n" for record in records).encode()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["date", "category", "amount", "description"])
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode()
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+    finally:
+        db.close()
+
+    headers = auth_headers(user_id=user_id)
+    results = {"rows": args.rows, "format": args.format}
+    async with asgi_client() as client:
+        start = time.perf_counter()
+        for record in make_records(args.single, seed=7):
+            response = await client.post("/expense", json=record, headers=headers)
+            response.raise_for_status()
+        single_rate = args.single / (time.perf_counter() - start)
+        results["single_post"] = {"rows_per_second": single_rate, "estimated_seconds_for_rows": args.rows / single_rate}
+
+        body = make_upload(args.format, args.rows, args.invalid)
+        start = time.perf_counter()
+        response = await client.post(
+            "/expense/import",
+            headers=headers,
+            files={"file": (f"expenses.{args.format}", body)},
+            timeout=None,
+        )
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        data = response.json()["data"]
+        results["bulk_import"] = {
+            "seconds": elapsed,
+            "rows_per_second": args.rows / elapsed,
+            "upload_mb": len(body) / 1e6,
+            "imported": data["imported"],
+            "failed": data["failed"],
+            "first_error": data["errors"][0] if data["errors"] else None,
+        }
+
+    db = SessionLocal()
+    try:
+        results["rollup_mismatches"] = len(check_rollups(db, user_id))
+    finally:
+        db.close()
+    report("import", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single", type=int, default=500, help="single POSTs used to estimate the one-at-a-time rate")
+    parser.add_argument("--invalid", type=int, default=10, help="rows with an invalid amount")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
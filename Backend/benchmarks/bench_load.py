@@ -0,0 +1,220 @@
+"""Load test of the real app: throughput and latency per endpoint and concurrency level.
+
+Seeds --users users with --rows expenses each (plus --rows / 10 incomes)
+through the bulk generator in _common, then drives main.app in-process over
+httpx's ASGI transport. At each --concurrency level, --requests requests per
+scenario are shared between that many concurrent clients, each request
+acting as one of the users in turn:
+
+* signin: POST /auth/signin (bcrypt at BCRYPT_ROUNDS, 4 unless set in the
+  environment, so a run stays short)
+* dashboard: GET /dashboard
+* expense_list: GET /expense?limit=50
+* expense_create / expense_update / expense_delete: POST, PUT and DELETE
+  /expense; the rows created are the ones updated and then deleted, so the
+  seeded history is the same at every level.
+
+Non-2xx responses are counted as errors, not raised. The results, with the
+commit, database backend and arguments, are printed as JSON and written to
+--output; --compare checks them against an earlier run and exits with
+status 1 when a scenario's p95 or throughput is more than --tolerance worse.
+
+    python -m benchmarks.bench_load --users 20 --rows 5000 --concurrency 1 10 50 --output load.json
+    python -m benchmarks.bench_load --compare load.json
+
+Point DATABASE_URL at a MySQL database to load-test it instead of SQLite.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from benchmarks._common import SessionLocal, engine, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+from core.security import get_password_hash
+
+PASSWORD = "bench-password-1"
+SCENARIOS = ("signin", "dashboard", "expense_list", "expense_create", "expense_update", "expense_delete")
+
+
+class Run:
+    """State shared by the clients of one scenario at one concurrency level."""
+
+    def __init__(self, users, requests: int):
+        self.users = users
+        self.remaining = requests
+        self.issued = 0
+        self.latencies = []
+        self.errors = {}
+
+    def next_user(self):
+        if self.remaining <= 0:
+            return None
+        self.remaining -= 1
+        self.issued += 1
+        return self.users[self.issued % len(self.users)]
+
+
+def build_requests(users, created):
+    """Scenario name -> function(user) returning (method, path, headers, json)."""
+
+    def signin(user):
+        return "POST", "/auth/signin", None, {"email": user["email"], "password": PASSWORD}
+
+    def dashboard(user):
+        return "GET", "/dashboard", user["headers"], None
+
+    def expense_list(user):
+        return "GET", "/expense?limit=50", user["headers"], None
+
+    def expense_create(user):
+        return "POST", "/expense", user["headers"], {"amount": 42.5, "category": "Food", "date": "2026-01-15", "description": "load test"}
+
+    def expense_update(user):
+        expense_id = created[user["id"]][user["cursor"] % len(created[user["id"]])]
+        user["cursor"] += 1
+        return "PUT", f"/expense/{expense_id}", user["headers"], {"amount": 17.25, "category": "Transport", "date": "2026-01-16"}
+
+    def expense_delete(user):
+        return "DELETE", f"/expense/{created[user['id']].pop()}", user["headers"], None
+
+    return {"signin": signin, "dashboard": dashboard, "expense_list": expense_list,
+            "expense_create": expense_create, "expense_update": expense_update, "expense_delete": expense_delete}
+
+
+async def drive(client, run: Run, make_request, on_response, concurrency: int):
+    async def worker():
+        while (user := run.next_user()) is not None:
+            method, path, headers, body = make_request(user)
+            start = time.perf_counter()
+            response = await client.request(method, path, headers=headers, json=body)
+            run.latencies.append(time.perf_counter() - start)
+            if response.is_success:
+                on_response(user, response)
+            else:
+                run.errors[response.status_code] = run.errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return dict(summarize(run.latencies), requests_per_second=len(run.latencies) / elapsed,
+                errors={str(status): count for status, count in sorted(run.errors.items())})
+
+
+def seed(args):
+    reset_schema()
+    password_hash = get_password_hash(PASSWORD)
+    users = []
+    db = SessionLocal()
+    try:
+        for index in range(args.users):
+            email = f"load{index}@example.com"
+            user_id = seed_user(db, email=email, password_hash=password_hash)
+            seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10, seed=index)
+            users.append({"id": user_id, "email": email, "headers": auth_headers(email=email, user_id=user_id), "cursor": 0})
+    finally:
+        db.close()
+    return users
+
+
+async def run_levels(args, users):
+    created = {user["id"]: [] for user in users}
+    requests = build_requests(users, created)
+
+    def remember_created(user, response):
+        created[user["id"]].append(response.json()["data"]["id"])
+
+    results = {}
+    async with asgi_client() as client:
+        for concurrency in args.concurrency:
+            level = {}
+            for name in args.scenarios:
+                on_response = remember_created if name == "expense_create" else lambda user, response: None
+                requests_count = args.signin_requests if name == "signin" else args.requests
+                if name == "expense_update":
+                    run = Run([user for user in users if created[user["id"]]], requests_count)
+                elif name == "expense_delete":
+                    # One turn per row this level created, so all of them go.
+                    turns = [user for user in users for _ in created[user["id"]]]
+                    run = Run(turns, len(turns))
+                else:
+                    run = Run(users, requests_count)
+                level[name] = await drive(client, run, requests[name], on_response, concurrency)
+            results[str(concurrency)] = level
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """Scenarios whose p95 latency rose, or throughput fell, by more than `tolerance` against `baseline`."""
+    regressions = []
+    for concurrency, level in results["levels"].items():
+        for name, current in level.items():
+            previous = baseline["levels"].get(concurrency, {}).get(name)
+            if previous is None:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append({"concurrency": int(concurrency), "scenario": name, "metric": "p95_ms",
+                                    "baseline": previous["p95_ms"], "current": current["p95_ms"]})
+            if current["requests_per_second"] < previous["requests_per_second"] * (1 - tolerance):
+                regressions.append({"concurrency": int(concurrency), "scenario": name, "metric": "requests_per_second",
+                                    "baseline": previous["requests_per_second"], "current": current["requests_per_second"]})
+    return regressions
+
+
+async def run(args):
+    users = seed(args)
+    results = {
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.url.get_backend_name(),
+        "python": platform.python_version(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "levels": await run_levels(args, users),
+    }
+
+    regressions = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = results["regressions"] = compare(results, baseline, args.tolerance)
+        results["baseline_commit"] = baseline.get("commit")
+
+    report("load", results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"benchmark": "load", "results": results}, output, indent=2, default=str)
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=2000, help="expenses per user (incomes are rows / 10)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and concurrency level")
+    parser.add_argument("--signin-requests", type=int, default=100, help="signin requests per level (each runs bcrypt)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown before a regression is reported")
+    args = parser.parse_args()
+    if ("expense_update" in args.scenarios or "expense_delete" in args.scenarios) and "expense_create" not in args.scenarios:
+        parser.error("expense_update and expense_delete need expense_create")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
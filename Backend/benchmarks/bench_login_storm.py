@@ -0,0 +1,93 @@
+"""Latency of GET /dashboard while a burst of logins hashes passwords.
+
+Each mode runs the same probe loop against /dashboard, first alone and then
+during a storm of concurrent POST /auth/signin requests:
+
+* inline: bcrypt on the event loop (the pre-pool behaviour)
+* thread: the default bounded thread pool
+
+    python -m benchmarks.bench_login_storm --storm 50 --probes 200
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+import core.security as security
+from core.security import PasswordHashPool, get_password_hash
+
+PASSWORD = "bench-password-1"
+
+
+async def probe(client, headers, count: int):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get("/dashboard", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def storm(client, stop: asyncio.Event, counter: list):
+    while not stop.is_set():
+        response = await client.post("/auth/signin", json={"email": "bench@example.com", "password": PASSWORD})
+        response.raise_for_status()
+        counter[0] += 1
+
+
+async def run_mode(client, headers, kind: str, args):
+    security.password_hash_pool = PasswordHashPool(kind, args.workers, args.max_in_flight)
+    try:
+        baseline = await probe(client, headers, args.probes)
+
+        stop = asyncio.Event()
+        logins = [0]
+        storm_tasks = [asyncio.create_task(storm(client, stop, logins)) for _ in range(args.storm)]
+        await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        under_storm = await probe(client, headers, args.probes)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*storm_tasks)
+
+        return {
+            "dashboard_alone": summarize(baseline),
+            "dashboard_during_storm": summarize(under_storm),
+            "logins_per_second": logins[0] / elapsed,
+            "pool": security.password_hash_pool.stats(),
+        }
+    finally:
+        security.password_hash_pool.shutdown()
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db, password_hash=get_password_hash(PASSWORD))
+        seed_rows(db, user_id, expenses=10_000, incomes=1_000)
+    finally:
+        db.close()
+
+    headers = auth_headers(user_id=user_id)
+    results = {"storm_concurrency": args.storm, "bcrypt_rounds": security.BCRYPT_ROUNDS}
+    async with asgi_client() as client:
+        for kind in args.modes:
+            results[kind] = await run_mode(client, headers, kind, args)
+    report("login_storm", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--storm", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--probes", type=int, default=200, help="dashboard requests per phase")
+    parser.add_argument("--workers", type=int, default=security.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-in-flight", type=int, default=security.PASSWORD_HASH_MAX_IN_FLIGHT)
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread"], choices=["inline", "thread", "process"])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
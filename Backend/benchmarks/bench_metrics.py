@@ -0,0 +1,144 @@
+"""Overhead of the metrics middleware and SQL statement listeners.
+
+The app is imported with METRICS_ENABLED=False, then driven in alternating
+blocks of requests with and without MetricsMiddleware wrapped around it and
+the listeners attached to the engines, so drift (warm caches, SQLite page
+cache) hits both sides equally. Endpoints:
+* /api/health: no SQL, so this is the middleware alone
+* /expense?limit=50: one keyset-paginated SELECT
+* /expense/{id} PUT: a write with rollup upserts (several statements)
+
+It also times the pieces in isolation: record_request, one SELECT 1 with
+and without the listeners, and rendering /metrics.
+
+    python -m benchmarks.bench_metrics --rows 10000 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ["METRICS_ENABLED"] = "False"
+
+from sqlalchemy import text
+
+from benchmarks._common import SessionLocal, engine, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, summarize, report
+from core.metrics import MetricsRegistry, RequestStats, instrument_engine, remove_instrumentation
+from database import async_engine
+from middleware.metrics import MetricsMiddleware
+from models import Expense
+
+BLOCK_SIZE = 10
+
+
+def attach(registry):
+    return [(target, instrument_engine(target, registry)) for target in (engine, async_engine.sync_engine)]
+
+
+def detach(listeners):
+    for target, functions in listeners:
+        remove_instrumentation(target, functions)
+
+
+async def timed_requests(client, method, path, headers, count, json=None):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.request(method, path, headers=headers, json=json)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return samples
+
+
+async def measure_endpoints(args, user_id, expense_id):
+    from main import app
+    headers = auth_headers(user_id=user_id)
+    endpoints = {
+        "health": ("GET", "/api/health", None),
+        "expense_page": ("GET", "/expense?limit=50", None),
+        "expense_update": ("PUT", f"/expense/{expense_id}", {"amount": 12.5, "category": "Food", "date": "2026-01-15"}),
+    }
+    registry = MetricsRegistry()
+    instrumented = MetricsMiddleware(app, registry)
+    samples = {name: {"off": [], "on": []} for name in endpoints}
+    async with asgi_client(app) as plain_client, asgi_client(instrumented) as instrumented_client:
+        clients = {"off": plain_client, "on": instrumented_client}
+        for name, (method, path, body) in endpoints.items():
+            for client in clients.values():
+                await timed_requests(client, method, path, headers, 20, body)  # warm-up
+            # Short alternating blocks, so both sides see the same conditions.
+            for block in range(2 * args.requests // BLOCK_SIZE):
+                for mode in ("off", "on") if block % 2 else ("on", "off"):
+                    listeners = attach(registry) if mode == "on" else []
+                    try:
+                        samples[name][mode] += await timed_requests(clients[mode], method, path, headers, BLOCK_SIZE, body)
+                    finally:
+                        detach(listeners)
+
+    results = {}
+    for name, modes in samples.items():
+        off, on = summarize(modes["off"]), summarize(modes["on"])
+        results[name] = {"off": off, "on": on,
+                         "overhead_us_p50": (on["p50_ms"] - off["p50_ms"]) * 1000,
+                         "overhead_us_mean": (on["mean_ms"] - off["mean_ms"]) * 1000}
+    return results, registry
+
+
+def measure_pieces(registry, repeat: int):
+    stats = RequestStats()
+    stats.statements, stats.rows = 3, 50
+    start = time.perf_counter()
+    for _ in range(repeat):
+        registry.request_started()
+        registry.record_request("GET", "/bench", 200, 0.01, stats, 1234)
+    record_us = (time.perf_counter() - start) / repeat * 1e6
+
+    def select_one(count):
+        with engine.connect() as connection:
+            start = time.perf_counter()
+            for _ in range(count):
+                connection.execute(text("SELECT 1")).all()
+            return (time.perf_counter() - start) / count * 1e6
+
+    plain_us = select_one(repeat)
+    listeners = attach(MetricsRegistry())
+    try:
+        listened_us = select_one(repeat)
+    finally:
+        detach(listeners)
+
+    render_samples = []
+    for _ in range(50):
+        start = time.perf_counter()
+        body = registry.render()
+        render_samples.append(time.perf_counter() - start)
+    return {
+        "record_request_us": record_us,
+        "select_1_us": {"plain": plain_us, "with_listeners": listened_us, "listener_overhead": listened_us - plain_us},
+        "render": dict(summarize(render_samples), body_bytes=len(body)),
+    }
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+        expense_id = db.query(Expense.id).filter(Expense.user_id == user_id).first()[0]
+    finally:
+        db.close()
+
+    endpoints, registry = await measure_endpoints(args, user_id, expense_id)
+    report("metrics", {"rows": args.rows, "endpoints": endpoints, "pieces": measure_pieces(registry, 10000)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
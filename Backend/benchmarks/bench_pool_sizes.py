@@ -0,0 +1,77 @@
+"""API throughput and pool contention at several connection pool sizes.
+
+Requests go to GET /expense?limit=50 through the async engine. Every statement
+sleeps --latency-ms (see bench_concurrency) so that a connection is held about
+as long as it would be against a networked MySQL server.
+
+    python -m benchmarks.bench_pool_sizes --pool-sizes 1 5 10 20 --concurrency 50
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from benchmarks._common import BENCH_DB_PATH, SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, asgi_client, report
+from benchmarks.bench_concurrency import SimulatedLatencyConnection, drive
+from database import get_async_db, pool_stats
+from database.pool import InstrumentedAsyncAdaptedQueuePool
+from main import app
+
+
+async def run_pool_size(client, headers, pool_size: int, args):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{BENCH_DB_PATH}",
+        connect_args={"factory": SimulatedLatencyConnection, "check_same_thread": False},
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+    Session = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def pooled_async_db():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = pooled_async_db
+    try:
+        result = await drive(client, "/expense?limit=50", headers, args.concurrency, args.requests)
+        result["pool"] = pool_stats(engine.sync_engine)
+        return result
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await engine.dispose()
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+
+    SimulatedLatencyConnection.latency = args.latency_ms / 1000
+    headers = auth_headers(user_id=user_id)
+    results = {"concurrency": args.concurrency, "latency_ms": args.latency_ms, "max_overflow": args.max_overflow}
+    async with asgi_client() as client:
+        for pool_size in args.pool_sizes:
+            results[str(pool_size)] = await run_pool_size(client, headers, pool_size, args)
+    report("pool_sizes", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=10, help="requests per concurrent client")
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--pool-timeout", type=float, default=30.0)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated per-statement round-trip")
+    parser.add_argument("--rows", type=int, default=10_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cost and effect of the auth rate limiter.
+
+* store: hits per second and bytes per key of the in-process GCRA store
+* stuffing: a credential-stuffing run of wrong passwords against one account,
+  from one IP and then rotating IPs via X-Forwarded-For, counting how many
+  requests got as far as a bcrypt verification
+* otp: one account guessing OTPs; only RATE_LIMIT_OTP_PER_MINUTE guesses get through
+
+    python -m benchmarks.bench_rate_limit --attempts 200
+"""
+import os
+
+os.environ["RATE_LIMIT_ENABLED"] = "True"
+os.environ["RATE_LIMIT_TRUST_FORWARDED"] = "True"
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import Counter
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, asgi_client, report
+from core.rate_limit import MemoryRateLimitStore, Rate, rate_limiter
+from core.security import get_password_hash, password_hash_pool
+
+
+def bench_store(keys: int) -> dict:
+    rate = Rate(30, 3600)
+    store = MemoryRateLimitStore(max_keys=keys * 2)
+    names = [f"auth:10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(keys)]
+
+    start = time.perf_counter()
+    for _ in range(keys):
+        store.hit("one-key", rate)
+    same_key = keys / (time.perf_counter() - start)
+
+    store.clear()
+    start = time.perf_counter()
+    for name in names:
+        store.hit(name, rate)
+    distinct = keys / (time.perf_counter() - start)
+
+    store.clear()
+    tracemalloc.start()
+    for name in names:
+        store.hit(name, rate)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    live = store.stats()["keys"]
+    return {"same_key_hits_per_second": same_key, "distinct_key_hits_per_second": distinct,
+            "keys": live, "bytes_per_key": size / live}
+
+
+async def stuffing(client, attempts: int, rotate_ips: bool) -> dict:
+    rate_limiter.store.clear()
+    verified_before = password_hash_pool.completed
+    statuses, retry_after = Counter(), set()
+    start = time.perf_counter()
+    for i in range(attempts):
+        ip = f"10.1.{i // 256 % 256}.{i % 256}" if rotate_ips else "10.0.0.1"
+        response = await client.post("/auth/signin", headers={"X-Forwarded-For": ip},
+                                     json={"email": "bench@example.com", "password": f"guess-{i}"})
+        statuses[response.status_code] += 1
+        if response.status_code == 429:
+            retry_after.add(int(response.headers["retry-after"]))
+    return {"seconds": time.perf_counter() - start, "statuses": dict(statuses),
+            "bcrypt_verifications": password_hash_pool.completed - verified_before,
+            "retry_after_seconds": sorted(retry_after)}
+
+
+async def otp_guessing(client, attempts: int) -> dict:
+    rate_limiter.store.clear()
+    statuses = Counter()
+    for i in range(attempts):
+        response = await client.post("/auth/verify-otp", headers={"X-Forwarded-For": f"10.2.0.{i % 256}"},
+                                     json={"email": "bench@example.com", "otp": f"{i:06d}"})
+        statuses[response.status_code] += 1
+    return {"statuses": dict(statuses)}
+
+
+async def run(args):
+    reset_schema()
+    db = SessionLocal()
+    try:
+        seed_user(db, password_hash=get_password_hash("correct-password"))
+    finally:
+        db.close()
+
+    results = {"store": bench_store(args.keys), "limiter": None}
+    async with asgi_client() as client:
+        results["stuffing_one_ip"] = await stuffing(client, args.attempts, rotate_ips=False)
+        results["stuffing_rotating_ips"] = await stuffing(client, args.attempts, rotate_ips=True)
+        results["otp"] = await otp_guessing(client, args.attempts)
+    results["limiter"] = rate_limiter.stats()
+    report("rate_limit", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=100_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Materialization pass for tens of thousands of recurring rules.
+
+Seeds --rules rules (daily/weekly/monthly/yearly, expense and income) spread
+over --users users, with start dates up to --catch-up-days in the past, as if
+the scheduler had been down since. Then:
+
+* catch_up: one materialize_due pass writing every missed occurrence
+* rerun: the same day again, which must write nothing
+* next_day: the following day, which only touches the rules due then
+* per_occurrence: the same catch-up done one create_expense/create_income
+  call per occurrence (the N+1 shape), on --naive-rules rules
+
+and checks for duplicate occurrences and rollup drift.
+
+    python -m benchmarks.bench_recurring --rules 20000 --users 2000
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, insert, select, func, delete
+
+from benchmarks._common import SessionLocal, engine, reset_schema, CATEGORIES, SOURCES, report
+from crud.expense_crud import create_expense
+from crud.income_crud import create_income
+from crud.recurring_crud import FREQUENCIES, materialize_due, occurrence_date
+from crud.rollup_crud import check_rollups
+from models import User, RecurringRule, Expense, Income
+
+INTERVALS = {"daily": (1, 2, 3), "weekly": (1, 2), "monthly": (1, 3), "yearly": (1,)}
+
+
+def seed(rules: int, users: int, catch_up_days: int, today: date):
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"fullname": "Bench User", "email": f"recurring{i}@example.com", "gender": "other",
+             "mobilenumber": f"{i:010d}", "password": "x"}
+            for i in range(users)
+        ])
+        user_ids = db.execute(select(User.id)).scalars().all()
+        rows = []
+        for _ in range(rules):
+            frequency = rng.choice(FREQUENCIES)
+            kind = rng.choice(("expense", "expense", "income"))
+            start = today - timedelta(days=rng.randint(0, catch_up_days))
+            rows.append({
+                "user_id": rng.choice(user_ids), "kind": kind, "amount": round(rng.uniform(5, 2000), 2),
+                "category": rng.choice(CATEGORIES) if kind == "expense" else None,
+                "source": rng.choice(SOURCES) if kind == "income" else None,
+                "description": "recurring", "frequency": frequency, "interval": rng.choice(INTERVALS[frequency]),
+                "start_date": start, "end_date": None, "occurrence_count": 0, "next_run_date": start, "active": True,
+            })
+        db.execute(insert(RecurringRule), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed_pass(today: date, batch_size: int) -> dict:
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = materialize_due(db, today, batch_size=batch_size)
+        stats["seconds"] = time.perf_counter() - start
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count_statement)
+    stats["statements"] = statements[0]
+    return stats
+
+
+def per_occurrence_pass(rules: int, today: date) -> dict:
+    """The catch-up without the batching: one committed create_* call per occurrence."""
+    db = SessionLocal()
+    try:
+        rule_rows = db.execute(select(RecurringRule).order_by(RecurringRule.id).limit(rules)).scalars().all()
+        start = time.perf_counter()
+        written = 0
+        for rule in rule_rows:
+            index = 0
+            day = occurrence_date(rule.start_date, rule.frequency, rule.interval, index)
+            while day <= today:
+                when = datetime.combine(day, datetime.min.time())
+                if rule.kind == "expense":
+                    create_expense(db, rule.user_id, rule.amount, rule.category, rule.description, when, rule.currency)
+                else:
+                    create_income(db, rule.user_id, rule.source, rule.amount, rule.description, when, rule.currency)
+                written += 1
+                index += 1
+                day = occurrence_date(rule.start_date, rule.frequency, rule.interval, index)
+        seconds = time.perf_counter() - start
+        # Undo, so the table only holds the scheduler's rows for the checks below.
+        for model in (Expense, Income):
+            db.execute(delete(model).where(model.recurring_rule_id.is_(None)))
+        db.commit()
+        return {"rules": len(rule_rows), "rows": written, "seconds": seconds}
+    finally:
+        db.close()
+
+
+def integrity() -> dict:
+    db = SessionLocal()
+    try:
+        duplicates = 0
+        for model, day in ((Expense, Expense.date), (Income, Income.income_date)):
+            total = db.execute(select(func.count()).select_from(model).where(model.recurring_rule_id.isnot(None))).scalar()
+            distinct = db.execute(select(func.count()).select_from(
+                select(model.recurring_rule_id, day).where(model.recurring_rule_id.isnot(None)).distinct().subquery()
+            )).scalar()
+            duplicates += total - distinct
+        return {"duplicate_occurrences": duplicates, "rollup_mismatches": len(check_rollups(db))}
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--catch-up-days", type=int, default=90)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--naive-rules", type=int, default=200)
+    args = parser.parse_args()
+
+    today = datetime.utcnow().date()
+    reset_schema()
+    seed(args.rules, args.users, args.catch_up_days, today)
+
+    results = {"rules": args.rules, "users": args.users, "catch_up_days": args.catch_up_days}
+    results["catch_up"] = timed_pass(today, args.batch_size)
+    results["catch_up"]["rows_per_second"] = (results["catch_up"]["expenses"] + results["catch_up"]["incomes"]) / results["catch_up"]["seconds"]
+    results["rerun"] = timed_pass(today, args.batch_size)
+    results["next_day"] = timed_pass(today + timedelta(days=1), args.batch_size)
+    results["integrity"] = integrity()
+
+    naive = per_occurrence_pass(args.naive_rules, today)
+    naive["rows_per_second"] = naive["rows"] / naive["seconds"]
+    results["per_occurrence"] = naive
+    results["speedup"] = results["catch_up"]["rows_per_second"] / naive["rows_per_second"]
+    report("recurring", results)
+
+
+if __name__ == "__main__":
+    main()
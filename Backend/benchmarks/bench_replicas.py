@@ -0,0 +1,178 @@
+"""Read-replica routing: consistency, failover and overhead.
+
+The primary is the benchmark database; the replica is a copy of it made
+with SQLite's backup API, which never sees later writes, so a read that
+lands on it is easy to recognise. The app is built with
+create_app(Settings(replica_urls=[...])) and driven through its lifespan
+(which starts the health checks and the pin-on-commit listeners).
+Reported:
+* read_your_writes: a POST /expense, then the same user's list right away
+  (pinned: served by the primary, the row is there) and again once the pin
+  has expired (served by the replica, which does not have it)
+* failover: with one good and one unreachable replica, reads after the
+  first health check only go to the good one; with none reachable they
+  all go to the primary
+* routing_us: the cost of choosing a session factory per request
+* expense_page: GET /expense?limit=50 latency with and without a replica,
+  in alternating blocks, plus the routing counters
+
+    python -m benchmarks.bench_replicas --rows 10000 --requests 1000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+# Short windows so the benchmark does not have to wait for the defaults.
+os.environ.setdefault("REPLICA_PIN_SECONDS", "1")
+os.environ.setdefault("REPLICA_CHECK_SECONDS", "0.5")
+os.environ["METRICS_ENABLED"] = "False"
+
+import httpx
+
+from benchmarks._common import BENCH_DB_PATH, SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, summarize, report
+from core.config import REPLICA_PIN_SECONDS, Settings
+from core.cache import pin_to_primary
+from database import ReplicaSet, AsyncSessionLocal, async_engine
+from main import create_app
+
+REPLICA_DB_PATH = os.path.join(tempfile.gettempdir(), "expense_tracker_bench_replica.db")
+UNREACHABLE_URL = "sqlite:////nonexistent-directory/replica.db"
+BLOCK_SIZE = 10
+MARKER = "ReplicaCheck"
+
+
+def copy_primary():
+    source, target = sqlite3.connect(BENCH_DB_PATH), sqlite3.connect(REPLICA_DB_PATH)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def time_routing(replica_set, user_id: int, repeat: int = 20000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        replica_set.sessionmaker_for(user_id)
+    return round((time.perf_counter() - start) / repeat * 1e6, 3)
+
+
+async def marker_count(client, headers) -> int:
+    response = await client.get(f"/expense?category={MARKER}", headers=headers)
+    response.raise_for_status()
+    return len(response.json()["data"])
+
+
+async def read_your_writes(client, app, headers):
+    counters = app.state.replicas
+    response = await client.post("/expense", headers=headers,
+                                 json={"amount": "12.50", "category": MARKER, "date": "2024-01-15", "description": "written to the primary"})
+    response.raise_for_status()
+    pinned_before = counters.primary_reads["pinned"]
+    right_after = await marker_count(client, headers)
+    served_by_primary = counters.primary_reads["pinned"] - pinned_before
+    await asyncio.sleep(REPLICA_PIN_SECONDS + 0.2)
+    reads_before = counters.replicas[0].reads
+    after_pin = await marker_count(client, headers)
+    return {
+        "pin_seconds": REPLICA_PIN_SECONDS,
+        "rows_seen_right_after_write": right_after,
+        "right_after_write_served_by_primary": served_by_primary == 1,
+        "rows_seen_after_pin_expired": after_pin,
+        "after_pin_served_by_replica": counters.replicas[0].reads - reads_before == 1,
+    }
+
+
+async def failover(user_id: int, reads: int = 100):
+    replica_url = f"sqlite:///{REPLICA_DB_PATH}"
+    mixed = ReplicaSet([replica_url, UNREACHABLE_URL])
+    all_down = ReplicaSet([UNREACHABLE_URL])
+    try:
+        await mixed.check()
+        await all_down.check()
+        for replica_set in (mixed, all_down):
+            for _ in range(reads):
+                async with replica_set.sessionmaker_for(user_id)() as db:
+                    await db.connection()
+        return {
+            "one_unreachable": {"replicas": [{key: replica[key] for key in ("url", "healthy", "error", "reads")}
+                                             for replica in mixed.stats()["replicas"]],
+                                "primary_reads": mixed.stats()["primary_reads"]},
+            "all_unreachable": {"primary_reads": all_down.stats()["primary_reads"]},
+        }
+    finally:
+        await mixed.stop()
+        await all_down.stop()
+
+
+async def expense_page(client_plain, client_replica, headers, requests: int):
+    samples = {"primary_only": [], "with_replica": []}
+    path = "/expense?limit=50"
+    for client in (client_plain, client_replica):
+        for _ in range(BLOCK_SIZE):
+            (await client.get(path, headers=headers)).raise_for_status()
+    for _ in range(0, requests, BLOCK_SIZE):
+        for name, client in (("primary_only", client_plain), ("with_replica", client_replica)):
+            for _ in range(BLOCK_SIZE):
+                start = time.perf_counter()
+                (await client.get(path, headers=headers)).raise_for_status()
+                samples[name].append(time.perf_counter() - start)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+async def run(args, user_id: int):
+    headers = auth_headers(user_id=user_id)
+    results = {}
+
+    plain = create_app(Settings(replica_urls=[]))
+    with_replica = create_app(Settings(replica_urls=[f"sqlite:///{REPLICA_DB_PATH}"]))
+    async with plain.router.lifespan_context(plain), with_replica.router.lifespan_context(with_replica):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=plain), base_url="http://bench") as client_plain, \
+                httpx.AsyncClient(transport=httpx.ASGITransport(app=with_replica), base_url="http://bench") as client_replica:
+            await with_replica.state.replicas.check()
+            results["read_your_writes"] = await read_your_writes(client_replica, with_replica, headers)
+            results["expense_page"] = await expense_page(client_plain, client_replica, headers, args.requests)
+            results["expense_page"]["routing"] = with_replica.state.replicas.stats()["primary_reads"]
+            results["expense_page"]["replica_reads"] = with_replica.state.replicas.replicas[0].reads
+
+    routing = ReplicaSet([f"sqlite:///{REPLICA_DB_PATH}"] * 2, primary_sessionmaker=AsyncSessionLocal)
+    try:
+        results["failover"] = await failover(user_id)
+        results["routing_us"] = {
+            "no_replicas": time_routing(ReplicaSet([]), user_id),
+            "two_replicas": time_routing(routing, user_id + 1),
+        }
+        pin_to_primary(user_id)
+        results["routing_us"]["pinned_user"] = time_routing(routing, user_id)
+    finally:
+        await routing.stop()
+        # The fallback reads above used the primary's pool after the lifespans closed it.
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=1000, help="GET /expense requests per side")
+    args = parser.parse_args()
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+    copy_primary()
+    try:
+        report("replicas", asyncio.run(run(args, user_id)))
+    finally:
+        os.remove(REPLICA_DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
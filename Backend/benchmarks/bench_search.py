@@ -0,0 +1,146 @@
+"""GET /search (FTS5 index) vs the substring ?q= filter on GET /expense.
+
+History with word-bearing descriptions is spread over --users users; the
+searched user owns 1/--users of it. A rare term (a handful of hits) and a
+common term (several percent of rows) are timed for the first page on both
+paths, and the per-row cost of keeping the index in sync is measured on a
+bulk insert with and without the triggers.
+
+    python -m benchmarks.bench_search --rows 200000 --users 10
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from benchmarks._common import SessionLocal, engine, reset_schema, seed_user, CATEGORIES, SOURCES, auth_headers, asgi_client, summarize, report
+from models import Expense, Income
+
+COMMON_WORDS = ["groceries", "coffee", "dinner", "lunch", "fuel", "taxi", "rent", "movie", "pharmacy", "books"]
+RARE_WORD = "zeppelin"
+
+
+def random_words(rng, count):
+    # Mostly a long tail of synthetic words, with a few common ones mixed in.
+    return " ".join(rng.choice(COMMON_WORDS) if rng.random() < 0.1 else f"w{rng.randint(1, 50_000)}" for _ in range(count))
+
+
+def seed_history(rows: int, users: int, batch_size: int = 10_000, seed: int = 7):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        user_ids = [seed_user(db, email=f"search{index}@example.com") for index in range(users)]
+        target = user_ids[0]
+        for start in range(0, rows, batch_size):
+            expenses, incomes = [], []
+            for offset in range(min(batch_size, rows - start)):
+                user_id = user_ids[(start + offset) % users]
+                description = random_words(rng, 4)
+                if user_id == target and rng.random() < 0.0005:
+                    description += f" {RARE_WORD}"
+                if rng.random() < 0.8:
+                    expenses.append({"user_id": user_id, "amount": round(rng.uniform(1, 500), 2), "category": rng.choice(CATEGORIES),
+                                     "description": description, "date": now - timedelta(days=rng.random() * 730)})
+                else:
+                    incomes.append({"user_id": user_id, "amount": round(rng.uniform(100, 5000), 2), "source": rng.choice(SOURCES),
+                                    "description": description, "income_date": now - timedelta(days=rng.random() * 730)})
+            if expenses:
+                db.execute(insert(Expense), expenses)
+            if incomes:
+                db.execute(insert(Income), incomes)
+            db.commit()
+        return target
+    finally:
+        db.close()
+
+
+def trigger_overhead(rows: int, seed: int = 11):
+    """Seconds per row for a bulk expense insert with the FTS triggers, then with them dropped."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db, email="trigger@example.com")
+        batch = lambda: [{"user_id": user_id, "amount": 1.0, "category": "Food", "description": random_words(rng, 4), "date": now} for _ in range(rows)]
+        timings = {}
+        for name in ("with_triggers", "without_triggers"):
+            values = batch()
+            start = time.perf_counter()
+            db.execute(insert(Expense), values)
+            db.commit()
+            timings[name] = (time.perf_counter() - start) / rows
+            if name == "with_triggers":
+                # Drop the expense triggers for the second run; the benchmark schema is rebuilt on the next run.
+                for suffix in ("ai", "ad", "au"):
+                    db.execute(text(f"DROP TRIGGER expenses_fts_{suffix}"))
+                db.commit()
+        timings["overhead_us_per_row"] = (timings["with_triggers"] - timings["without_triggers"]) * 1e6
+        return timings
+    finally:
+        db.close()
+
+
+async def time_get(client, path, headers, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return summarize(samples), response.json()
+
+
+async def run(args):
+    reset_schema()
+    target = seed_history(args.rows, args.users)
+    with engine.connect() as connection:
+        index_check = connection.execute(text(
+            "SELECT (SELECT count(*) FROM expenses_fts) = (SELECT count(*) FROM expenses) "
+            "AND (SELECT count(*) FROM incomes_fts) = (SELECT count(*) FROM incomes)"
+        )).scalar()
+
+    headers = auth_headers(email="search0@example.com", user_id=target)
+    results = {"rows": args.rows, "users": args.users, "index_row_counts_match": bool(index_check)}
+    async with asgi_client() as client:
+        for label, term in (("rare", RARE_WORD), ("common", "groceries"), ("prefix", "pharm")):
+            search_stats, body = await time_get(client, f"/search?q={term}&limit=20", headers, args.repeat)
+            like_stats, _ = await time_get(client, f"/expense?q={term}&limit=20", headers, args.repeat)
+            results[label] = {
+                "term": term,
+                "search": search_stats,
+                "like_filter": like_stats,
+                "speedup_p50": like_stats["p50_ms"] / search_stats["p50_ms"],
+                "first_page_hits": len(body["data"]),
+                "has_more": body["has_more"],
+            }
+        # Walk the common term a few pages deep to check the cursor and ordering.
+        cursor, seen, scores = None, set(), []
+        for _ in range(5):
+            response = await client.get("/search", params={"q": "groceries", "limit": 50, **({"cursor": cursor} if cursor else {})}, headers=headers)
+            body = response.json()
+            seen.update((item["type"], item["id"]) for item in body["data"])
+            scores.extend(item["score"] for item in body["data"])
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+        results["paging"] = {"distinct_results": len(seen), "scores_descending": scores == sorted(scores, reverse=True)}
+
+    results["write_cost"] = trigger_overhead(args.write_rows)
+    report("search", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--write-rows", type=int, default=20_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
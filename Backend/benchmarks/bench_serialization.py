@@ -0,0 +1,120 @@
+"""Fetch and serialization cost of the expense list response at 10k/100k rows.
+
+* legacy: ORM objects, the old per-row try/except loop, stdlib-json JSONResponse
+* orm_orjson: ORM objects, a plain dict comprehension, ORJSONResponse
+* pydantic: column rows validated and dumped through TypeAdapter(List[ExpenseOut])
+* rows_orjson: column rows, a dict comprehension, ORJSONResponse (the current handler)
+
+    python -m benchmarks.bench_serialization --rows 10000 100000 --repeat 5
+"""
+import argparse
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, summarize, report
+from crud.expense_crud import get_expenses
+from models import Expense
+from schemas import ExpenseOut
+
+
+def fetch_orm(db, user_id):
+    return db.query(Expense).filter(Expense.user_id == user_id).order_by(Expense.date.desc(), Expense.id.desc()).all()
+
+
+def serialize_legacy(records):
+    expense_list = []
+    for exp in records:
+        try:
+            amount = float(exp.amount) if exp.amount else 0.0
+            category = exp.category or ""
+            description = exp.description or ""
+            date_str = ""
+            if exp.date:
+                try:
+                    if hasattr(exp.date, "strftime"):
+                        date_str = exp.date.strftime("%Y-%m-%d")
+                    else:
+                        date_str = str(exp.date)
+                except Exception:
+                    date_str = str(exp.date)
+            expense_list.append({"id": exp.id, "amount": amount, "category": category, "description": description, "date": date_str})
+        except Exception:
+            continue
+    return JSONResponse(content={"status": "success", "data": expense_list}).body
+
+
+def serialize_orm_orjson(records):
+    data = [
+        {"id": exp.id, "amount": exp.amount, "currency": exp.currency, "category": exp.category, "description": exp.description or "", "date": exp.date.date()}
+        for exp in records
+    ]
+    return ORJSONResponse(content={"status": "success", "data": data}).body
+
+
+expense_list_adapter = TypeAdapter(List[ExpenseOut])
+
+
+def serialize_pydantic(rows):
+    data = expense_list_adapter.validate_python([
+        {"id": expense_id, "amount": amount, "currency": currency, "category": category, "description": description or "", "date": date.date()}
+        for expense_id, date, category, amount, description, currency in rows
+    ])
+    return b'{"status":"success","data":' + expense_list_adapter.dump_json(data) + b"}"
+
+
+def serialize_rows_orjson(rows):
+    data = [
+        {"id": expense_id, "amount": amount, "currency": currency, "category": category, "description": description or "", "date": date.date() if date else None}
+        for expense_id, date, category, amount, description, currency in rows
+    ]
+    return ORJSONResponse(content={"status": "success", "data": data}).body
+
+
+STRATEGIES = {
+    "legacy": (fetch_orm, serialize_legacy),
+    "orm_orjson": (fetch_orm, serialize_orm_orjson),
+    "pydantic": (get_expenses, serialize_pydantic),
+    "rows_orjson": (get_expenses, serialize_rows_orjson),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.rows:
+        reset_schema()
+        db = SessionLocal()
+        try:
+            user_id = seed_user(db)
+            seed_rows(db, user_id, expenses=rows, incomes=0)
+            size_results = {}
+            for name, (fetch, serialize) in STRATEGIES.items():
+                fetch_samples, serialize_samples = [], []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    records = fetch(db, user_id)
+                    fetched = time.perf_counter()
+                    body = serialize(records)
+                    fetch_samples.append(fetched - start)
+                    serialize_samples.append(time.perf_counter() - fetched)
+                    db.expunge_all()
+                size_results[name] = {
+                    "fetch": summarize(fetch_samples),
+                    "serialize": summarize(serialize_samples),
+                    "body_bytes": len(body),
+                }
+            results[str(rows)] = size_results
+        finally:
+            db.close()
+    report("serialization", results)
+
+
+if __name__ == "__main__":
+    main()
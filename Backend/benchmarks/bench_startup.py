@@ -0,0 +1,115 @@
+"""Cold start time and memory of one API worker.
+
+Each sample is a fresh interpreter that:
+* imports main (the app module, as `uvicorn main:app` does)
+* runs the lifespan startup
+* serves a first GET /api/health/ready and a first authenticated GET /expense
+  (the first database connection and the first route through the
+  ORM, JSON encoding, etc.)
+and reports how long each step took and the process's resident memory
+after the import and after the first requests. A bare `python -c pass`
+is timed too, so interpreter start can be told apart from the app's own cost.
+
+    python -m benchmarks.bench_startup --samples 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._common import SessionLocal, engine, reset_schema, seed_user, seed_rows, auth_headers, summarize, report
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+rss_import = rss_mb()
+modules = len(sys.modules)
+heavy = sorted(name for name in ("pandas", "numpy") if name in sys.modules)
+
+async def serve():
+    app = main.app
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            (await client.get("/api/health/ready")).raise_for_status()
+            ready = time.perf_counter()
+            (await client.get("/expense?limit=50", headers=HEADERS)).raise_for_status()
+            first = time.perf_counter()
+    return started, ready, first
+
+import asyncio
+import httpx
+HEADERS = json.loads(sys.argv[1])
+lifespan_start = time.perf_counter()
+started, ready, first = asyncio.run(serve())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_startup_ms": (started - lifespan_start) * 1000,
+    "first_ready_ms": (ready - started) * 1000,
+    "first_expense_page_ms": (first - ready) * 1000,
+    "rss_after_import_mb": rss_import,
+    "rss_after_first_requests_mb": rss_mb(),
+    "modules_after_import": modules,
+    "heavy_modules_at_import": heavy,
+}))
+"""
+
+
+def run_child(args, cwd):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    return time.perf_counter() - start, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+    headers = json.dumps(auth_headers(user_id=user_id))
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    interpreter, samples = [], []
+    for _ in range(args.samples):
+        interpreter.append(run_child(["-c", "pass"], backend)[0])
+        elapsed, output = run_child(["-c", CHILD, headers], backend)
+        samples.append(dict(json.loads(output), process_ms=elapsed * 1000))
+
+    results = {"database": engine.url.get_backend_name(), "interpreter": summarize(interpreter)}
+    for key in ("import_ms", "lifespan_startup_ms", "first_ready_ms", "first_expense_page_ms", "process_ms"):
+        results[key] = summarize([sample[key] / 1000 for sample in samples])
+    for key in ("rss_after_import_mb", "rss_after_first_requests_mb"):
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        results[key] = max(values) if values else None
+    results["modules_after_import"] = samples[-1]["modules_after_import"]
+    results["heavy_modules_at_import"] = samples[-1]["heavy_modules_at_import"]
+    report("startup", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Throughput of `python manage.py serve` as the worker count grows.
+
+For each --workers value a real server is started on a local port, then
+--clients load-generating processes (so the client is not the bottleneck)
+each keep --concurrency keep-alive requests in flight for --duration
+seconds against one endpoint. Reported per worker count:
+* requests_per_second, latency percentiles and errors
+* memory: RSS summed over the workers, and PSS where /proc exposes it
+  (shared copy-on-write pages from the preloaded app are split between
+  the processes that share them, so PSS is what the workers really cost)
+* shutdown_seconds: SIGTERM to the master exiting, with the load stopped
+
+Scaling tops out at the number of cores the server and the clients share.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --clients 4 --concurrency 16 --duration 10
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers, summarize, report
+
+ENDPOINTS = {"health": "/api/health", "expense_page": "/expense?limit=50", "dashboard": "/dashboard"}
+
+CLIENT = r"""
+import asyncio, json, sys, time
+import httpx
+url, headers, concurrency, duration = sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4])
+latencies, errors = [], 0
+
+async def worker(client, deadline):
+    global errors
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        errors += not ok
+
+async def main():
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, deadline) for _ in range(concurrency)))
+
+asyncio.run(main())
+print(json.dumps({"latencies": latencies, "errors": errors}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_mb(pid: int) -> dict:
+    usage = {}
+    for path, field in ((f"/proc/{pid}/status", "VmRSS:"), (f"/proc/{pid}/smaps_rollup", "Pss:")):
+        try:
+            with open(path) as proc_file:
+                for line in proc_file:
+                    if line.startswith(field):
+                        usage[field.rstrip(":").lower()] = int(line.split()[1]) / 1024
+                        break
+        except OSError:
+            pass
+    return usage
+
+
+def worker_pids(master: int):
+    return [int(pid) for pid in subprocess.run(["pgrep", "-P", str(master)], capture_output=True, text=True).stdout.split()]
+
+
+def start_server(backend: str, port: int, workers: int):
+    process = subprocess.Popen([sys.executable, "manage.py", "serve", "--host", "127.0.0.1", "--port", str(port),
+                                "--workers", str(workers)], cwd=backend, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    import httpx
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if len(worker_pids(process.pid)) == workers and httpx.get(f"http://127.0.0.1:{port}/api/health/ready").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server with {workers} workers did not become ready")
+
+
+def run_load(url: str, headers: dict, args):
+    clients = [subprocess.Popen([sys.executable, "-c", CLIENT, url, json.dumps(headers), str(args.concurrency), str(args.duration)],
+                                stdout=subprocess.PIPE, text=True) for _ in range(args.clients)]
+    start = time.perf_counter()
+    outputs = [json.loads(client.communicate()[0]) for client in clients]
+    elapsed = time.perf_counter() - start
+    latencies = [latency for output in outputs for latency in output["latencies"]]
+    return dict(summarize(latencies), requests_per_second=len(latencies) / elapsed,
+                errors=sum(output["errors"] for output in outputs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="expense_page")
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 2) // 2), help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=args.rows, incomes=args.rows // 10)
+    finally:
+        db.close()
+    headers = auth_headers(user_id=user_id)
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    results = {"cpu_count": os.cpu_count(), "endpoint": ENDPOINTS[args.endpoint], "clients": args.clients,
+               "concurrency_per_client": args.concurrency}
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(backend, port, workers)
+        try:
+            load = run_load(f"http://127.0.0.1:{port}{ENDPOINTS[args.endpoint]}", headers, args)
+            memory = [memory_mb(pid) for pid in worker_pids(server.pid)]
+            load["workers_rss_mb"] = sum(usage.get("vmrss", 0) for usage in memory)
+            if all("pss" in usage for usage in memory):
+                load["workers_pss_mb"] = sum(usage["pss"] for usage in memory)
+            start = time.perf_counter()
+            server.send_signal(signal.SIGTERM)
+            load["exit_code"] = server.wait(timeout=60)
+            load["shutdown_seconds"] = time.perf_counter() - start
+        finally:
+            if server.poll() is None:
+                server.kill()
+        results[str(workers)] = load
+    report("workers", results)
+
+
+if __name__ == "__main__":
+    main()
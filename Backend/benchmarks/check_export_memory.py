@@ -0,0 +1,135 @@
+"""Assert that the streaming export keeps a constant memory ceiling as history grows.
+
+For each history size, GET /expense/export (CSV and NDJSON) is driven directly
+through the ASGI interface. The response body is counted and then discarded,
+so only server-side allocations show up in the tracemalloc peak. The full-list
+GET /expense is measured the same way for comparison. Exits non-zero if an
+export peak goes over --ceiling-mb, or grows more than --growth times from the
+smallest size to the largest.
+
+    python -m benchmarks.check_export_memory --rows 20000 100000
+
+tests/test_export_memory.py runs the same check (with smaller sizes) under
+pytest.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from benchmarks._common import SessionLocal, reset_schema, seed_user, seed_rows, auth_headers
+from core.cache import token_cache, user_cache
+from database import async_engine
+from main import app
+
+
+async def call(path: str, headers: dict) -> dict:
+    """Run one GET through the app, keeping only byte counts and timings."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80), "root_path": "",
+    }
+    stats = {"status": None, "bytes": 0, "first_byte_ms": None}
+    request_sent = False
+    start = time.perf_counter()
+
+    async def receive():
+        # One empty request body, then block: StreamingResponse polls receive()
+        # for a disconnect while it streams.
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if stats["first_byte_ms"] is None:
+                stats["first_byte_ms"] = (time.perf_counter() - start) * 1000
+            stats["bytes"] += len(message["body"])
+
+    tracemalloc.start()
+    try:
+        await app(scope, receive, send)
+        stats["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+    stats["total_ms"] = (time.perf_counter() - start) * 1000
+    return stats
+
+
+async def measure(rows: int) -> dict:
+    reset_schema()
+    db = SessionLocal()
+    try:
+        user_id = seed_user(db)
+        seed_rows(db, user_id, expenses=rows, incomes=0)
+    finally:
+        db.close()
+    token_cache.clear()
+    user_cache.clear()
+
+    headers = auth_headers(user_id=user_id)
+    await call("/expense/export?format=csv", headers)  # warm caches, pools and imports
+    return {
+        "export_csv": await call("/expense/export?format=csv", headers),
+        "export_ndjson": await call("/expense/export?format=ndjson", headers),
+        "full_list": await call("/expense", headers),
+    }
+
+
+async def measure_all(sizes) -> dict:
+    """{rows: measure(rows)} for each history size."""
+    results = {}
+    try:
+        for rows in sizes:
+            results[rows] = await measure(rows)
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def find_failures(results: dict, ceiling_mb: float, growth_limit: float) -> list:
+    failures = []
+    smallest, largest = results[min(results)], results[max(results)]
+    for rows, result in results.items():
+        for name in ("export_csv", "export_ndjson"):
+            stats = result[name]
+            if stats["status"] != 200:
+                failures.append(f"rows={rows} {name}: status {stats['status']}")
+            if stats["peak_mb"] > ceiling_mb:
+                failures.append(f"rows={rows} {name}: peak {stats['peak_mb']:.1f} MB over the {ceiling_mb} MB ceiling")
+    for name in ("export_csv", "export_ndjson"):
+        growth = largest[name]["peak_mb"] / max(smallest[name]["peak_mb"], 0.1)
+        if growth > growth_limit:
+            failures.append(f"{name}: peak grew {growth:.1f}x between {min(results)} and {max(results)} rows")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--ceiling-mb", type=float, default=20.0)
+    parser.add_argument("--growth", type=float, default=1.5)
+    args = parser.parse_args()
+    results = asyncio.run(measure_all(args.rows))
+    for rows, result in results.items():
+        for name in ("export_csv", "export_ndjson"):
+            stats = result[name]
+            print(f"[INFO] rows={rows} {name}: peak {stats['peak_mb']:.1f} MB, first byte {stats['first_byte_ms']:.0f} ms, "
+                  f"{stats['bytes'] / 1e6:.1f} MB in {stats['total_ms']:.0f} ms")
+        print(f"[INFO] rows={rows} full_list: peak {result['full_list']['peak_mb']:.1f} MB")
+    failures = find_failures(results, args.ceiling_mb, args.growth)
+    for failure in failures:
+        print(f"[ERROR] {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Assert that the hot per-user queries are served by the composite indexes.
+
+The schema is built with the Alembic migrations (not create_all), the real
+CRUD functions are executed, and every statement they send is run again
+through EXPLAIN. Every list sort key is checked in both directions, and a
+page must come straight from its index, without a sort step. Exits non-zero
+if a query does not use the expected index.
+
+    python -m benchmarks.check_query_plans
+
+tests/test_query_plans.py runs it under pytest against a throwaway database.
+"""
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+
+from benchmarks._common import engine, SessionLocal, Base, seed_user, seed_rows
+from crud.expense_crud import EXPENSE_SORT_FIELDS, get_expenses, get_expenses_page
+from crud.income_crud import INCOME_SORT_FIELDS, get_incomes, get_incomes_page
+from crud.dashboard_crud import get_recent_expenses
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+PAGE_INDEXES = {
+    "expense": (get_expenses_page, EXPENSE_SORT_FIELDS, {"date": "ix_expenses_user_date", "amount": "ix_expenses_user_amount_id",
+                                                         "category": "ix_expenses_user_category_id"}),
+    "income": (get_incomes_page, INCOME_SORT_FIELDS, {"income_date": "ix_incomes_user_income_date", "amount": "ix_incomes_user_amount_id",
+                                                      "source": "ix_incomes_user_source_id"}),
+}
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def used_indexes(statement, parameters):
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            return " ".join(row[-1] for row in rows)
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        return " ".join(str(row.get("key")) for row in rows)
+
+
+def rebuild_schema_with_migrations():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    config = Config(ALEMBIC_INI)
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+
+
+def page_checks(db, user_id: int):
+    """(name, index, run) for the first and the second page of every sort key and direction."""
+    checks = []
+    for kind, (get_page, sort_fields, indexes) in PAGE_INDEXES.items():
+        assert set(indexes) == set(sort_fields), f"{kind} sort keys without an expected index"
+        for sort, index in indexes.items():
+            for order in ("desc", "asc"):
+                cursor = get_page(db, user_id, limit=50, sort=sort, order=order)[1]
+                checks.append((f"{kind} page by {sort} {order}", index,
+                               lambda get_page=get_page, sort=sort, order=order, cursor=cursor:
+                               get_page(db, user_id, limit=50, sort=sort, order=order, cursor=cursor)))
+    return checks
+
+
+def run_checks(db, user_id: int):
+    """Run every check against a seeded, analyzed database; returns (name, index, ok, plan) tuples."""
+    since = datetime.utcnow() - timedelta(days=30)
+    checks = page_checks(db, user_id) + [
+        ("expense date range", "ix_expenses_user_date", lambda: get_expenses(db, user_id, date_from=since)),
+        ("expense by category", "ix_expenses_user_category_date", lambda: get_expenses(db, user_id, category="Food", date_from=since)),
+        ("dashboard recent expenses", "ix_expenses_user_date", lambda: get_recent_expenses(db, user_id)),
+        ("income by source", "ix_incomes_user_source_income_date", lambda: get_incomes(db, user_id, source="Salary", date_from=since)),
+    ]
+    results = []
+    for name, index, run in checks:
+        with captured_statements() as statements:
+            run()
+        plan = " | ".join(used_indexes(stmt, params) for stmt, params in statements)
+        results.append((name, index, index in plan and "TEMP B-TREE" not in plan, plan))
+    return results
+
+
+def seed():
+    rebuild_schema_with_migrations()
+    db = SessionLocal()
+    user_id = seed_user(db)
+    seed_user(db, email="other@example.com")
+    seed_rows(db, user_id, expenses=5000, incomes=500)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return db, user_id
+
+
+def main():
+    db, user_id = seed()
+    try:
+        results = run_checks(db, user_id)
+    finally:
+        db.close()
+    for name, index, ok, plan in results:
+        print(f"[{'OK' if ok else 'FAIL'}] {name}: expected {index}; plan: {plan}")
+    sys.exit(0 if all(ok for _, _, ok, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""A local SMTP server for exercising the email outbox worker (needs `pip install aiosmtpd`).
+
+Accepts any login over plain SMTP and keeps delivered messages in memory.
+`handshake_ms` delays EHLO to stand in for the TLS negotiation and login of a
+real provider; `fail_every` answers every Nth message with a 451 so retries
+can be checked; recipients on the `bounce.invalid` domain get a permanent 550.
+
+    python -m benchmarks.fake_smtp --port 1025 --handshake-ms 150
+
+then point SMTP_SERVER/SMTP_PORT at it with SMTP_STARTTLS=False.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+BOUNCE_DOMAIN = "bounce.invalid"
+
+
+class RecordingHandler:
+    def __init__(self, handshake_ms: float = 0, message_ms: float = 0, fail_every: int = 0):
+        self.handshake_ms = handshake_ms
+        self.message_ms = message_ms
+        self.fail_every = fail_every
+        self.messages = []
+        self.sessions = 0
+        self.rejected = 0
+        self._received = 0
+        self._lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        with self._lock:
+            self.sessions += 1
+        if self.handshake_ms:
+            await asyncio.sleep(self.handshake_ms / 1000)
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@" + BOUNCE_DOMAIN):
+            return "550 5.1.1 Mailbox does not exist"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.message_ms:
+            await asyncio.sleep(self.message_ms / 1000)
+        with self._lock:
+            self._received += 1
+            if self.fail_every and self._received % self.fail_every == 0:
+                self.rejected += 1
+                return "451 4.3.0 Temporarily unable to accept message"
+            self.messages.append((envelope.mail_from, tuple(envelope.rcpt_tos), time.monotonic()))
+        return "250 Message accepted for delivery"
+
+    def reset(self):
+        with self._lock:
+            self.messages.clear()
+            self.sessions = self.rejected = self._received = 0
+
+
+def _accept_any_login(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+class FakeSMTPServer:
+    """Context manager running the fake server on a background thread."""
+
+    def __init__(self, port: int = 1025, **handler_options):
+        self.handler = RecordingHandler(**handler_options)
+        self.controller = Controller(
+            self.handler, hostname="127.0.0.1", port=port,
+            authenticator=_accept_any_login, auth_require_tls=False,
+        )
+
+    def __enter__(self):
+        self.controller.start()
+        return self.handler
+
+    def __exit__(self, *exc):
+        self.controller.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--handshake-ms", type=float, default=0)
+    parser.add_argument("--message-ms", type=float, default=0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    with FakeSMTPServer(args.port, handshake_ms=args.handshake_ms, message_ms=args.message_ms, fail_every=args.fail_every) as handler:
+        print(f"[INFO] Fake SMTP server listening on 127.0.0.1:{args.port}, Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"[INFO] {len(handler.messages)} messages, {handler.sessions} sessions, {handler.rejected} rejected")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
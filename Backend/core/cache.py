@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from .config import CACHE_BACKEND, CACHE_URL, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES, REPLICA_PIN_SECONDS
+
+VERSION_TTL_SECONDS = 24 * 60 * 60
+RATES_VERSION_KEY = "fx:version"
+
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL.
+
+    Entries are evicted least-recently-used once max_entries is reached, and
+    lazily dropped when read after their TTL has passed.
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: int = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value, ttl: int = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": size,
+            "max_entries": self.max_entries,
+        }
+
+
+class RedisCache:
+    """Shared cache backed by Redis, for running several API workers.
+
+    Values are stored as JSON. Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, default_ttl: int = 300, prefix: str = "expense-tracker:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value, ttl: int = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self._client.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def delete(self, key: str):
+        self._client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self) -> dict:
+        info = self._client.info("stats")
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": info.get("evicted_keys", 0),
+            "expirations": info.get("expired_keys", 0),
+        }
+
+
+def create_cache(backend: str = CACHE_BACKEND, url: str = CACHE_URL, max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL_SECONDS):
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, default_ttl=ttl)
+    if backend == "redis":
+        return RedisCache(url, default_ttl=ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+cache = create_cache()
+
+# Decoded tokens and user rows for core.security.get_current_user. These stay
+# in-process: entries are small, short-lived and cheap to rebuild.
+token_cache = MemoryCache(max_entries=AUTH_CACHE_MAX_ENTRIES, default_ttl=AUTH_CACHE_TTL_SECONDS)
+user_cache = MemoryCache(max_entries=AUTH_CACHE_MAX_ENTRIES, default_ttl=AUTH_CACHE_TTL_SECONDS)
+
+
+def _version(key: str) -> str:
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:16]
+        cache.set(key, version, ttl=VERSION_TTL_SECONDS)
+    return version
+
+
+def data_version(user_id: int) -> str:
+    """Opaque token that changes whenever the user's expenses or incomes change.
+
+    A missing version (first use, eviction, restart) is replaced by a fresh
+    random token, so stale cache entries and ETags can never match again.
+    Loading exchange rates changes every user's version.
+    """
+    return _version(f"user:{user_id}:version") + _version(RATES_VERSION_KEY)
+
+
+def history_version(user_id: int) -> str:
+    """Like data_version, but only changes when a write touches a month that has already ended.
+
+    Results computed from closed months are cached under it, so everyday
+    writes to the current month leave them in place.
+    """
+    return _version(f"user:{user_id}:history") + _version(RATES_VERSION_KEY)
+
+
+def invalidate_rates():
+    """Called after exchange rates are loaded; every converted total may have changed."""
+    cache.set(RATES_VERSION_KEY, uuid.uuid4().hex[:16], ttl=VERSION_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int):
+    """Called after a committed expense/income write for the user."""
+    cache.set(f"user:{user_id}:version", uuid.uuid4().hex[:16], ttl=VERSION_TTL_SECONDS)
+
+
+def invalidate_history(user_id: int):
+    """Called after a committed write that changed a closed month (see crud/rollup_crud.py)."""
+    cache.set(f"user:{user_id}:history", uuid.uuid4().hex[:16], ttl=VERSION_TTL_SECONDS)
+
+
+def invalidate_current_user(user_id: int, email: str = None):
+    """Drop the cached user row, e.g. after a password reset."""
+    user_cache.delete(f"user:{user_id}")
+    if email:
+        user_cache.delete(f"email:{email}")
+
+
+def pin_to_primary(user_id: int, seconds: int = REPLICA_PIN_SECONDS):
+    """Send the user's reads to the primary for a while, e.g. after they wrote (see database/replicas.py).
+
+    Kept in the shared cache so that, with CACHE_BACKEND=redis, a write
+    through one worker pins the user's reads on every worker.
+    """
+    cache.set(f"user:{user_id}:primary", 1, ttl=seconds)
+
+
+def is_pinned_to_primary(user_id: int) -> bool:
+    return cache.get(f"user:{user_id}:primary") is not None
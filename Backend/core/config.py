@@ -1,3 +1,5 @@
+import os
+from typing import NamedTuple
 from decouple import config
 from dotenv import load_dotenv
 
@@ -7,7 +9,148 @@ load_dotenv()
 
 SECRET_KEY = config('SECRET_KEY')
 DATABASE_URL = config('DATABASE_URL')
-SMTP_SERVER = config('SMTP_SERVER')
-SMTP_PORT = config('SMTP_PORT', cast=int)
-EMAIL_USER = config('EMAIL_USER')
-EMAIL_PASSWORD = config('EMAIL_PASSWORD')
+# Only the email worker needs these; the API starts without them.
+SMTP_SERVER = config('SMTP_SERVER', default='')
+SMTP_PORT = config('SMTP_PORT', default=587, cast=int)
+EMAIL_USER = config('EMAIL_USER', default='')
+EMAIL_PASSWORD = config('EMAIL_PASSWORD', default='')
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='memory')
+CACHE_URL = config('CACHE_URL', default='')
+CACHE_TTL_SECONDS = config('CACHE_TTL_SECONDS', default=300, cast=int)
+CACHE_MAX_ENTRIES = config('CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Optional explicit URL for the async engine; derived from DATABASE_URL when empty.
+ASYNC_DATABASE_URL = config('ASYNC_DATABASE_URL', default='')
+
+# bcrypt cost factor; stored hashes with a different cost are rehashed on login.
+BCRYPT_ROUNDS = config('BCRYPT_ROUNDS', default=12, cast=int)
+# Where bcrypt runs: "thread" or "process" pool, or "inline" on the event loop.
+PASSWORD_HASH_EXECUTOR = config('PASSWORD_HASH_EXECUTOR', default='thread')
+# One core is left to the event loop by default.
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=max(1, (os.cpu_count() or 2) - 1), cast=int)
+PASSWORD_HASH_MAX_IN_FLIGHT = config('PASSWORD_HASH_MAX_IN_FLIGHT', default=PASSWORD_HASH_WORKERS * 2, cast=int)
+
+# In-process cache of decoded access tokens and the users they belong to.
+AUTH_CACHE_TTL_SECONDS = config('AUTH_CACHE_TTL_SECONDS', default=60, cast=int)
+AUTH_CACHE_MAX_ENTRIES = config('AUTH_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Connection pool for the sync and async engines (each engine gets its own pool).
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=10, cast=int)
+DB_MAX_OVERFLOW = config('DB_MAX_OVERFLOW', default=20, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=30, cast=float)
+# Recycle well below MySQL's wait_timeout so idle connections are never stale.
+DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', default=1800, cast=int)
+DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', default=True, cast=bool)
+# Empty keeps the driver default (REPEATABLE READ on MySQL).
+DB_ISOLATION_LEVEL = config('DB_ISOLATION_LEVEL', default='')
+
+# Bulk import: rows per INSERT/commit, and how many row errors are reported back.
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=5000, cast=int)
+IMPORT_MAX_ERRORS = config('IMPORT_MAX_ERRORS', default=1000, cast=int)
+
+# Streaming export: rows fetched from the server-side cursor per chunk.
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', default=1000, cast=int)
+
+# Largest number of operations accepted by POST /expense/batch and /income/batch.
+BATCH_MAX_OPERATIONS = config('BATCH_MAX_OPERATIONS', default=1000, cast=int)
+
+# Outbound email. STARTTLS and login can be switched off for a local relay.
+SMTP_STARTTLS = config('SMTP_STARTTLS', default=True, cast=bool)
+SMTP_TIMEOUT_SECONDS = config('SMTP_TIMEOUT_SECONDS', default=10, cast=float)
+# The worker closes its SMTP connection after this long without mail to send.
+SMTP_IDLE_SECONDS = config('SMTP_IDLE_SECONDS', default=60, cast=float)
+# Email outbox worker: rows claimed per poll, and exponential retry backoff.
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=50, cast=int)
+EMAIL_POLL_SECONDS = config('EMAIL_POLL_SECONDS', default=1.0, cast=float)
+EMAIL_LEASE_SECONDS = config('EMAIL_LEASE_SECONDS', default=300, cast=int)
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_RETRY_BASE_SECONDS = config('EMAIL_RETRY_BASE_SECONDS', default=30, cast=float)
+EMAIL_RETRY_MAX_SECONDS = config('EMAIL_RETRY_MAX_SECONDS', default=3600, cast=float)
+
+# Auth throttling (GCRA). "memory" keeps buckets per process; "redis" shares
+# them between workers through RATE_LIMIT_URL.
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='memory')
+RATE_LIMIT_URL = config('RATE_LIMIT_URL', default=CACHE_URL)
+RATE_LIMIT_MAX_KEYS = config('RATE_LIMIT_MAX_KEYS', default=100000, cast=int)
+# Only honour X-Forwarded-For when the API sits behind a trusted proxy.
+RATE_LIMIT_TRUST_FORWARDED = config('RATE_LIMIT_TRUST_FORWARDED', default=False, cast=bool)
+RATE_LIMIT_IP_PER_MINUTE = config('RATE_LIMIT_IP_PER_MINUTE', default=30, cast=int)
+RATE_LIMIT_SIGNIN_PER_MINUTE = config('RATE_LIMIT_SIGNIN_PER_MINUTE', default=10, cast=int)
+RATE_LIMIT_OTP_PER_MINUTE = config('RATE_LIMIT_OTP_PER_MINUTE', default=5, cast=int)
+RATE_LIMIT_EMAIL_PER_HOUR = config('RATE_LIMIT_EMAIL_PER_HOUR', default=5, cast=int)
+
+# Recurring rules materialized per transaction by `python manage.py recurring run`,
+# and the most occurrences one transaction writes (a daily rule started years ago
+# catches up over several transactions).
+RECURRING_BATCH_SIZE = config('RECURRING_BATCH_SIZE', default=1000, cast=int)
+RECURRING_MAX_OCCURRENCES_PER_BATCH = config('RECURRING_MAX_OCCURRENCES_PER_BATCH', default=10000, cast=int)
+
+# Budget alerts fire once per month at each of these percentages of the budget,
+# and are also emailed through the outbox when BUDGET_ALERT_EMAILS is on.
+BUDGET_ALERT_THRESHOLDS = config('BUDGET_ALERT_THRESHOLDS', default='80,100', cast=lambda value: sorted(int(part) for part in value.split(',') if part.strip()))
+BUDGET_ALERT_EMAILS = config('BUDGET_ALERT_EMAILS', default=True, cast=bool)
+
+# GET /search: results per page by default, and how deep paging may go.
+SEARCH_PAGE_SIZE = config('SEARCH_PAGE_SIZE', default=20, cast=int)
+SEARCH_MAX_RESULTS = config('SEARCH_MAX_RESULTS', default=1000, cast=int)
+
+# GET /analytics/trend: the longest range in days, the most periods in one
+# response, and how long results for closed months stay cached.
+ANALYTICS_MAX_DAYS = config('ANALYTICS_MAX_DAYS', default=7320, cast=int)
+ANALYTICS_MAX_PERIODS = config('ANALYTICS_MAX_PERIODS', default=3660, cast=int)
+ANALYTICS_CACHE_TTL_SECONDS = config('ANALYTICS_CACHE_TTL_SECONDS', default=86400, cast=int)
+
+# Amounts default to BASE_CURRENCY, and dashboard, analytics and budget totals
+# are reported in it. It must not change once data exists. FX_RATES_FILE is
+# the CSV (currency,rate) read by `python manage.py fx load`.
+BASE_CURRENCY = config('BASE_CURRENCY', default='INR')
+FX_RATES_FILE = config('FX_RATES_FILE', default='fx_rates.csv')
+
+# Request/SQL metrics served at /metrics in the Prometheus text format.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# /api/health/ready reports not ready when `SELECT 1` takes longer than this.
+HEALTH_DB_TIMEOUT_SECONDS = config('HEALTH_DB_TIMEOUT_SECONDS', default=2, cast=float)
+
+# Create missing tables when the app starts (create_all, no migrations).
+# Meant for tests and throwaway databases; deployments run `alembic upgrade head`.
+DB_CREATE_SCHEMA = config('DB_CREATE_SCHEMA', default=False, cast=bool)
+
+
+# `python manage.py serve`: forked uvicorn workers sharing one listening socket.
+# SERVER_WORKERS=0 starts one per CPU core. Every worker has its own DB pools
+# (DB_POOL_SIZE + DB_MAX_OVERFLOW each), caches and metrics.
+SERVER_HOST = config('SERVER_HOST', default='0.0.0.0')
+SERVER_PORT = config('SERVER_PORT', default=8000, cast=int)
+SERVER_WORKERS = config('SERVER_WORKERS', default=0, cast=int)
+SERVER_BACKLOG = config('SERVER_BACKLOG', default=2048, cast=int)
+SERVER_KEEP_ALIVE_SECONDS = config('SERVER_KEEP_ALIVE_SECONDS', default=5, cast=int)
+# On SIGTERM a worker stops accepting, gives in-flight requests this long to finish, then exits.
+SERVER_GRACEFUL_TIMEOUT_SECONDS = config('SERVER_GRACEFUL_TIMEOUT_SECONDS', default=30, cast=int)
+SERVER_ACCESS_LOG = config('SERVER_ACCESS_LOG', default=False, cast=bool)
+
+
+# Read replicas (comma-separated URLs like DATABASE_URL) serve the GET endpoints.
+# After a write, a user reads from the primary for REPLICA_PIN_SECONDS, so keep
+# it above the lag a replica may have: on MySQL, replicas more than
+# REPLICA_MAX_LAG_SECONDS behind are skipped. Replicas are checked every
+# REPLICA_CHECK_SECONDS, and ones that fail are skipped until they pass again.
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=lambda value: [url.strip() for url in value.split(',') if url.strip()])
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+REPLICA_CHECK_SECONDS = config('REPLICA_CHECK_SECONDS', default=5, cast=float)
+
+
+class Settings(NamedTuple):
+    """The only per-app settings (app.state.settings); every other constant here is process-wide.
+
+    database_url gives the app its own engines, which the shared session
+    factories point at while it runs, so one such app at a time. replica_urls
+    replaces DATABASE_REPLICA_URLS.
+    """
+    database_url: str = None
+    async_database_url: str = None
+    replica_urls: list = None
+    metrics_enabled: bool = METRICS_ENABLED
+    create_schema: bool = DB_CREATE_SCHEMA
@@ -0,0 +1,117 @@
+import random
+import signal
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from database import SessionLocal
+from crud.outbox_crud import claim_emails, mark_emails_sent, mark_emails_unsent, release_emails
+from .mailer import SMTPMailer
+from .config import (
+    EMAIL_BATCH_SIZE, EMAIL_POLL_SECONDS, EMAIL_LEASE_SECONDS, EMAIL_MAX_ATTEMPTS,
+    EMAIL_RETRY_BASE_SECONDS, EMAIL_RETRY_MAX_SECONDS,
+)
+
+# Failures that say nothing about the email itself: the rest of the batch would
+# fail the same way, so it is put back untried. Only the email that hit the
+# error counts the attempt; the others are due again after retry_base_seconds.
+CONNECTION_ERRORS = (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected, smtplib.SMTPAuthenticationError)
+
+
+def is_connection_error(error: Exception) -> bool:
+    # SMTPException subclasses OSError, so socket errors are told apart explicitly.
+    return isinstance(error, CONNECTION_ERRORS) or (isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException))
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies to a message or its recipient will not change on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException) and not isinstance(error, smtplib.SMTPAuthenticationError):
+        return error.smtp_code >= 500
+    return False
+
+
+def retry_delay(attempts: int, base: float = EMAIL_RETRY_BASE_SECONDS, cap: float = EMAIL_RETRY_MAX_SECONDS) -> float:
+    """Exponential backoff with jitter, so a recovering server is not hit by every retry at once."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class EmailWorker:
+    """Drains the email outbox in batches through one reused SMTP connection.
+
+    Run it as its own process with `python manage.py email worker`; the web
+    workers only insert outbox rows.
+    """
+
+    def __init__(self, mailer: SMTPMailer = None, batch_size: int = EMAIL_BATCH_SIZE,
+                 poll_seconds: float = EMAIL_POLL_SECONDS, lease_seconds: int = EMAIL_LEASE_SECONDS,
+                 max_attempts: int = EMAIL_MAX_ATTEMPTS, retry_base_seconds: float = EMAIL_RETRY_BASE_SECONDS,
+                 retry_max_seconds: float = EMAIL_RETRY_MAX_SECONDS, session_factory=SessionLocal):
+        self.mailer = mailer or SMTPMailer()
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.session_factory = session_factory
+        self.stopping = threading.Event()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _unsent(self, email, error, now):
+        if email.attempts >= self.max_attempts or is_permanent(error):
+            self.failed += 1
+            print(f"[ERROR] Giving up on email {email.id} to {email.to_email} after {email.attempts} attempts: {error}")
+            return email.id, error, None
+        self.retried += 1
+        return email.id, error, now + timedelta(seconds=retry_delay(email.attempts, self.retry_base_seconds, self.retry_max_seconds))
+
+    def run_once(self) -> int:
+        """Claim and deliver one batch; returns how many emails were claimed."""
+        db = self.session_factory()
+        try:
+            emails = claim_emails(db, self.batch_size, self.lease_seconds)
+            sent, failures, untried = [], [], []
+            for index, email in enumerate(emails):
+                try:
+                    self.mailer.send(email.to_email, email.subject, email.body)
+                    sent.append(email.id)
+                except Exception as e:
+                    now = datetime.utcnow()
+                    if is_connection_error(e):
+                        print(f"[ERROR] SMTP connection failed: {e}")
+                        self.mailer.close()
+                        failures.append(self._unsent(email, e, now))
+                        untried = [remaining.id for remaining in emails[index + 1:]]
+                        break
+                    failures.append(self._unsent(email, e, now))
+            mark_emails_sent(db, sent)
+            mark_emails_unsent(db, failures)
+            if untried:
+                release_emails(db, untried, now + timedelta(seconds=self.retry_base_seconds))
+            self.sent += len(sent)
+            return len(emails)
+        finally:
+            db.close()
+
+    def run(self, until_empty: bool = False):
+        """Poll until stop() is called (or, with until_empty, until nothing is due)."""
+        try:
+            while not self.stopping.is_set():
+                claimed = self.run_once()
+                if until_empty and claimed == 0:
+                    break
+                if claimed < self.batch_size and not until_empty:
+                    self.mailer.close_if_idle()
+                    self.stopping.wait(self.poll_seconds)
+        finally:
+            self.mailer.close()
+
+    def stop(self, *_):
+        self.stopping.set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
@@ -0,0 +1,83 @@
+import smtplib
+import time
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from .config import SMTP_SERVER, SMTP_PORT, EMAIL_USER, EMAIL_PASSWORD, SMTP_STARTTLS, SMTP_TIMEOUT_SECONDS, SMTP_IDLE_SECONDS
+
+
+def build_message(sender: str, to_email: str, subject: str, body: str) -> str:
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg.as_string()
+
+
+class SMTPMailer:
+    """One SMTP connection, opened lazily and reused for every send.
+
+    STARTTLS and login happen once per connection rather than once per email.
+    A connection the server has dropped is reopened and the send retried once;
+    one left idle longer than idle_seconds is closed before it can go stale.
+    """
+
+    def __init__(self, host: str = SMTP_SERVER, port: int = SMTP_PORT, username: str = EMAIL_USER,
+                 password: str = EMAIL_PASSWORD, starttls: bool = SMTP_STARTTLS,
+                 timeout: float = SMTP_TIMEOUT_SECONDS, idle_seconds: float = SMTP_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._server = None
+        self._last_used = 0.0
+        self.connections = 0
+        self.sent = 0
+
+    def _connect(self):
+        if not self.host:
+            raise ConnectionError("SMTP_SERVER is not configured")
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connections += 1
+        return server
+
+    def send(self, to_email: str, subject: str, body: str):
+        message = build_message(self.username, to_email, subject, body)
+        self.close_if_idle()
+        for retry in (False, True):
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.sendmail(self.username, [to_email], message)
+                break
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                if retry:
+                    raise
+            finally:
+                self._last_used = time.monotonic()
+        self.sent += 1
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
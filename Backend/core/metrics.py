@@ -0,0 +1,287 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Histogram upper bounds (the +Inf bucket is implicit).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BYTE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# (name, help, buckets) of the per-request histograms, all labelled by method and route.
+REQUEST_HISTOGRAMS = (
+    ("http_request_duration_seconds", "Time from receiving the request to sending the last body byte.", LATENCY_BUCKETS),
+    ("http_request_db_statements", "SQL statements executed while handling the request.", STATEMENT_BUCKETS),
+    ("http_request_db_rows", "Rows returned by the request's SQL statements.", ROW_BUCKETS),
+    ("http_response_size_bytes", "Response body size.", BYTE_BUCKETS),
+)
+
+# (stats() key, metric name, kind, help) of the components /metrics reports alongside the requests.
+POOL_METRICS = (
+    ("pool_size", "db_pool_size", "gauge", "Configured pool size."),
+    ("max_overflow", "db_pool_max_overflow", "gauge", "Configured overflow beyond the pool size."),
+    ("checked_out", "db_pool_checked_out", "gauge", "Connections in use."),
+    ("idle", "db_pool_idle", "gauge", "Connections idle in the pool."),
+    ("overflow", "db_pool_overflow", "gauge", "Overflow connections open."),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts."),
+    ("waits", "db_pool_waits_total", "counter", "Checkouts that waited for a free connection."),
+    ("wait_seconds", "db_pool_wait_seconds_total", "counter", "Time checkouts spent waiting for a free connection."),
+    ("overflow_events", "db_pool_overflow_events_total", "counter", "Checkouts that opened an overflow connection."),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that gave up after the pool timeout."),
+)
+CACHE_METRICS = (
+    ("hits", "cache_hits_total", "counter", "Response cache lookups that found an entry."),
+    ("misses", "cache_misses_total", "counter", "Response cache lookups that found nothing."),
+    ("evictions", "cache_evictions_total", "counter", "Entries evicted to make room."),
+    ("expirations", "cache_expirations_total", "counter", "Entries dropped once their TTL passed."),
+    ("size", "cache_entries", "gauge", "Entries held (memory backend)."),
+    ("max_entries", "cache_max_entries", "gauge", "Entry limit (memory backend)."),
+)
+PASSWORD_HASH_METRICS = (
+    ("workers", "password_hash_workers", "gauge", "Executor workers."),
+    ("max_in_flight", "password_hash_max_in_flight", "gauge", "Hashes handed to the executor at once, at most."),
+    ("in_flight", "password_hash_in_flight", "gauge", "Hashes running in the executor."),
+    ("queued", "password_hash_queued", "gauge", "Hashes waiting for an executor slot."),
+    ("max_queued", "password_hash_max_queued", "gauge", "Longest queue seen."),
+    ("completed", "password_hash_completed_total", "counter", "Hashes and verifications finished."),
+    ("total_wait_seconds", "password_hash_wait_seconds_total", "counter", "Time spent waiting for an executor slot."),
+    ("total_run_seconds", "password_hash_run_seconds_total", "counter", "Time spent hashing in the executor."),
+)
+RATE_LIMIT_METRICS = (
+    ("enabled", "rate_limit_enabled", "gauge", "1 when rate limits are enforced."),
+    ("allowed", "rate_limit_allowed_total", "counter", "Hits let through."),
+    ("limited", "rate_limit_limited_total", "counter", "Hits refused with a 429."),
+    ("keys", "rate_limit_keys", "gauge", "Keys tracked (memory backend)."),
+    ("max_keys", "rate_limit_max_keys", "gauge", "Key limit (memory backend)."),
+    ("evictions", "rate_limit_evictions_total", "counter", "Keys evicted before expiry to stay within the limit."),
+)
+REPLICA_METRICS = (
+    ("healthy", "db_replica_healthy", "gauge", "1 while the replica passes its health checks."),
+    ("lag_seconds", "db_replica_lag_seconds", "gauge", "Replication lag at the last check, where the server reports it."),
+    ("check_seconds", "db_replica_check_seconds", "gauge", "Duration of the last health check."),
+    ("checked_at", "db_replica_last_check_time_seconds", "gauge", "End of the last health check since the Unix epoch."),
+    ("reads", "db_replica_reads_total", "counter", "Read sessions routed to the replica."),
+)
+
+
+class RequestStats:
+    """SQL activity of the request being handled, filled in by the engine listeners."""
+    __slots__ = ("statements", "rows", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+
+
+# A mutable RequestStats per request: asyncio tasks, run_in_threadpool and
+# SQLAlchemy's run_sync greenlets all see the object the middleware set.
+current_request = ContextVar("current_request_stats", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Request and SQL counters for this process, rendered in the Prometheus text format.
+
+    Everything a request records is written under one lock acquisition;
+    label values are the route template (never the raw path), so the number
+    of series stays bounded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = {}
+            self._histograms = {name: {} for name, _, _ in REQUEST_HISTOGRAMS}
+            self.in_flight = 0
+            self.statements = 0
+            self.statement_seconds = 0.0
+            self.rows = 0
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats, size: int):
+        values = (seconds, stats.statements, stats.rows, size)
+        with self._lock:
+            self.in_flight -= 1
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for (name, _, buckets), value in zip(REQUEST_HISTOGRAMS, values):
+                series = self._histograms[name]
+                histogram = series.get((method, route))
+                if histogram is None:
+                    histogram = series[(method, route)] = Histogram(buckets)
+                histogram.observe(value)
+
+    def record_statement(self, seconds: float, rows: int):
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds += seconds
+            self.rows += rows
+
+    def render(self, pools=None, cache=None, password_hashing=None, rate_limit=None, replicas=None) -> str:
+        """Prometheus text exposition (format 0.0.4).
+
+        pools maps an engine name to pool_stats(); the others are the stats()
+        of the response cache, the password hash pool, the rate limiter and
+        the replica set (whose pools are reported with the others).
+        """
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def stat_families(table, series):
+            """One family per table row, one sample per (labels, stats) in series that has the key."""
+            for key, name, kind, help_text in table:
+                metric(name, kind, help_text)
+                for labels, stats in series:
+                    if stats.get(key) is not None:
+                        lines.append(f"{name}{_labels(labels, labels.values()) if labels else ''} {_number(stats[key])}")
+
+        with self._lock:
+            metric("http_requests_total", "counter", "Requests handled, by route template and status code.")
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f"http_requests_total{_labels(('method', 'route', 'status'), (method, route, status))} {count}")
+            metric("http_requests_in_flight", "gauge", "Requests currently being handled.")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            for name, help_text, buckets in REQUEST_HISTOGRAMS:
+                metric(name, "histogram", help_text)
+                for (method, route), histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip((*buckets, float("inf")), histogram.counts):
+                        cumulative += count
+                        labels = _labels(("method", "route", "le"), (method, route, _number(float(bound))))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _labels(("method", "route"), (method, route))
+                    lines.append(f"{name}_sum{labels} {_number(float(histogram.sum))}")
+                    lines.append(f"{name}_count{labels} {histogram.count}")
+
+            metric("db_statements_total", "counter", "SQL statements executed by this process, inside requests or not.")
+            lines.append(f"db_statements_total {self.statements}")
+            metric("db_statement_seconds_total", "counter", "Time spent executing SQL statements.")
+            lines.append(f"db_statement_seconds_total {_number(self.statement_seconds)}")
+            metric("db_rows_total", "counter", "Rows returned by SQL statements, where the driver reports them.")
+            lines.append(f"db_rows_total {self.rows}")
+
+        if replicas:
+            pools = {**(pools or {}), **{f"replica:{replica['url']}": replica["pool"] for replica in replicas["replicas"]}}
+        if pools:
+            stat_families(POOL_METRICS, [({"engine": engine_name}, stats) for engine_name, stats in pools.items()])
+        if cache:
+            stat_families(CACHE_METRICS, [({"backend": cache["backend"]}, cache)])
+        if password_hashing:
+            stat_families(PASSWORD_HASH_METRICS, [({"executor": password_hashing["executor"]}, password_hashing)])
+        if rate_limit:
+            stat_families(RATE_LIMIT_METRICS, [({"backend": rate_limit["backend"]}, rate_limit)])
+        if replicas:
+            stat_families(REPLICA_METRICS, [
+                ({"replica": replica["url"]},
+                 dict(replica, check_seconds=replica["check_latency_ms"] / 1000 if replica["check_latency_ms"] is not None else None))
+                for replica in replicas["replicas"]
+            ])
+            metric("db_replica_primary_reads_total", "counter", "Reads kept on the primary, by reason.")
+            for reason, count in sorted(replicas["primary_reads"].items()):
+                lines.append(f"db_replica_primary_reads_total{_labels(('reason',), (reason,))} {count}")
+
+        metric("process_start_time_seconds", "gauge", "Start time of the process since the Unix epoch.")
+        lines.append(f"process_start_time_seconds {_number(self.started)}")
+        return "\n".join(lines) + "\n"
+
+
+def _rows_returned(cursor) -> int:
+    """Rows a statement returned, without touching the result.
+
+    The asyncio adapters buffer the whole result at execute time (except
+    server-side cursors used for streaming); MySQL's buffered cursors report
+    it as rowcount. sqlite3 reports -1, so sync SQLite rows are not counted.
+    """
+    if cursor.description is None:
+        return 0
+    buffered = getattr(cursor, "_rows", None)
+    if buffered is not None:
+        return len(buffered)
+    return max(cursor.rowcount, 0)
+
+
+# Engine events instrument_engine() listens to, in the order it returns the listeners.
+LISTENER_EVENTS = ("before_cursor_execute", "after_cursor_execute", "handle_error")
+
+
+def instrument_engine(engine, registry=None):
+    """Count every statement `engine` executes, and charge it to the current request if there is one.
+
+    Returns the listeners, for remove_instrumentation().
+    """
+    registry = registry or metrics
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["metrics_started"].pop()
+        rows = _rows_returned(cursor)
+        registry.record_statement(seconds, rows)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.rows += rows
+            stats.db_seconds += seconds
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    return _before, _after, _error
+
+
+def remove_instrumentation(engine, listeners):
+    for name, listener in zip(LISTENER_EVENTS, listeners):
+        event.remove(engine, name, listener)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from .config import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, RATE_LIMIT_URL, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_TRUST_FORWARDED,
+    RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_SIGNIN_PER_MINUTE, RATE_LIMIT_OTP_PER_MINUTE, RATE_LIMIT_EMAIL_PER_HOUR,
+)
+
+
+class Rate(NamedTuple):
+    """`limit` requests per `period` seconds, all of which may arrive in one burst."""
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+
+class MemoryRateLimitStore:
+    """Per-process GCRA state: one float (the theoretical arrival time) per key.
+
+    A key whose arrival time has passed is indistinguishable from a fresh one,
+    so expired keys are swept from the least-recently-used end as new hits
+    come in, and the oldest are evicted once max_keys is reached.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._arrivals = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def hit(self, key: str, rate: Rate) -> float:
+        with self._lock:
+            now = time.monotonic()
+            new_arrival = max(self._arrivals.get(key, now), now) + rate.interval
+            if new_arrival - now > rate.period:
+                return new_arrival - now - rate.period
+            self._arrivals[key] = new_arrival
+            self._arrivals.move_to_end(key)
+            while self._arrivals:
+                oldest_key, oldest_arrival = next(iter(self._arrivals.items()))
+                if oldest_arrival > now and len(self._arrivals) <= self.max_keys:
+                    break
+                if oldest_arrival > now:
+                    self.evictions += 1
+                del self._arrivals[oldest_key]
+            return 0.0
+
+    def clear(self):
+        with self._lock:
+            self._arrivals.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._arrivals)
+        return {"backend": "memory", "keys": size, "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+# The same GCRA step as MemoryRateLimitStore.hit, run atomically in Redis with
+# the server's clock, so every worker shares one bucket per key.
+_GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local arrival = tonumber(redis.call('GET', KEYS[1]) or now)
+if arrival < now then arrival = now end
+local new_arrival = arrival + interval
+if new_arrival - now > period then
+    return tostring(new_arrival - now - period)
+end
+redis.call('SET', KEYS[1], tostring(new_arrival), 'PX', math.ceil((new_arrival - now) * 1000))
+return '0'
+"""
+
+
+class RedisRateLimitStore:
+    """Shared GCRA state for several API workers. Requires the optional `redis` package."""
+
+    def __init__(self, url: str, prefix: str = "expense-tracker:rate:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+        self.prefix = prefix
+
+    def hit(self, key: str, rate: Rate) -> float:
+        return float(self._script(keys=[self.prefix + key], args=[rate.interval, rate.period]))
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class RateLimiter:
+    def __init__(self, store, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+
+    def hit(self, scope: str, key: str, rate: Rate) -> float:
+        """Count one request against scope/key; returns 0 if allowed, else seconds until it would be."""
+        if not self.enabled:
+            return 0.0
+        retry_after = self.store.hit(f"{scope}:{key}", rate)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "allowed": self.allowed, "limited": self.limited, **self.store.stats()}
+
+
+def create_rate_limiter(backend: str = RATE_LIMIT_BACKEND, url: str = RATE_LIMIT_URL, max_keys: int = RATE_LIMIT_MAX_KEYS):
+    if backend == "memory":
+        return RateLimiter(MemoryRateLimitStore(max_keys), enabled=RATE_LIMIT_ENABLED)
+    if backend == "redis":
+        return RateLimiter(RedisRateLimitStore(url), enabled=RATE_LIMIT_ENABLED)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+rate_limiter = create_rate_limiter()
+
+IP_RATE = Rate(RATE_LIMIT_IP_PER_MINUTE, 60)
+# Per account: sign-in attempts (each costs a bcrypt verify), OTP guesses, and
+# emails sent (each is an outbox row and an SMTP send).
+SIGNIN_RATE = Rate(RATE_LIMIT_SIGNIN_PER_MINUTE, 60)
+OTP_RATE = Rate(RATE_LIMIT_OTP_PER_MINUTE, 60)
+EMAIL_RATE = Rate(RATE_LIMIT_EMAIL_PER_HOUR, 3600)
+
+TOO_MANY_REQUESTS_MESSAGE = "Too many requests, please try again later"
+
+
+def _retry_after_header(retry_after: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(scope: str, rate: Rate = IP_RATE):
+    """Route dependency that rejects a client IP going over `rate` with a 429."""
+    async def dependency(request: Request):
+        retry_after = rate_limiter.hit(scope, client_ip(request), rate)
+        if retry_after:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=TOO_MANY_REQUESTS_MESSAGE,
+                                headers=_retry_after_header(retry_after))
+    return dependency
+
+
+def limit_account(scope: str, account: str, rate: Rate):
+    """Per-account check for handlers: a 429 response to return, or None when allowed."""
+    retry_after = rate_limiter.hit(scope, account, rate)
+    if not retry_after:
+        return None
+    return JSONResponse(status_code=429, content={"status": "error", "message": TOO_MANY_REQUESTS_MESSAGE},
+                        headers=_retry_after_header(retry_after))
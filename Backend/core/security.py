@@ -1,12 +1,28 @@
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import NamedTuple
+import asyncio
 import re
-from .config import SECRET_KEY
+import time
+from .config import SECRET_KEY, BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_IN_FLIGHT
+from .cache import token_cache, user_cache
+from database import get_async_db, current_user_id
+from crud.async_user_crud import get_user_by_id, get_user_by_email
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pinned to the configured cost so that needs_update() flags hashes
+# made with any other cost, in either direction.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
 security = HTTPBearer()
@@ -17,6 +33,93 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    """Return (verified, new_hash); new_hash is set when the stored cost is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashPool:
+    """Runs bcrypt off the event loop in a bounded worker pool.
+
+    At most max_in_flight calls are handed to the executor at once; further
+    callers wait on a semaphore, and that backlog is reported as the queue
+    depth in stats().
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_in_flight: int = 8):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown PASSWORD_HASH_EXECUTOR: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._executor = None
+        self._semaphore = None
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.kind == "inline":
+            return fn(*args)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "total_wait_seconds": self.total_wait_seconds,
+            "total_run_seconds": self.total_run_seconds,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_IN_FLIGHT)
+
+async def hash_password_async(password):
+    return await password_hash_pool.run(get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password, hashed_password):
+    return await password_hash_pool.run(verify_and_update_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=120))
@@ -39,6 +142,60 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    fullname: str
+
+
+def _decode_access_token(token: str):
+    """Return (user_id, email) for a valid token, caching the result until it expires.
+
+    user_id is None for tokens issued before they carried a `uid` claim.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
+    email = payload.get("sub")
+    if email is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
+    claims = (payload.get("uid"), email)
+    remaining = int(payload["exp"] - time.time())
+    if remaining > 0:
+        token_cache.set(token, claims, ttl=min(remaining, token_cache.default_ttl))
+    return claims
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    """Authenticated user for a request, usually without touching the database.
+
+    Both the decoded token and the user row are held in short-lived in-process
+    caches; a miss costs a single primary-key lookup (or an email lookup for
+    tokens without `uid`).
+    """
+    user_id, email = _decode_access_token(credentials.credentials)
+    key = f"user:{user_id}" if user_id is not None else f"email:{email}"
+    user = user_cache.get(key)
+    if user is None:
+        row = await get_user_by_id(db, user_id) if user_id is not None else await get_user_by_email(db, email)
+        if not row or row.email != email:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = CurrentUser(row.id, row.email, row.fullname)
+        user_cache.set(key, user)
+    current_user_id.set(user.id)
+    return user
+
+async def get_read_db(request: Request, user: CurrentUser = Depends(get_current_user)):
+    """Session for a read-only endpoint: a healthy replica, or the primary if the user just wrote.
+
+    Without replicas configured this is the same session as get_async_db.
+    """
+    async with request.app.state.replicas.sessionmaker_for(user.id)() as db:
+        yield db
+
 def validate_email(email: str) -> bool:
     return re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email) is not None
 
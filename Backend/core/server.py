@@ -0,0 +1,97 @@
+import gc
+import os
+import signal
+import time
+import uvicorn
+from database import reset_after_fork
+from .config import (
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_BACKLOG, SERVER_KEEP_ALIVE_SECONDS,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS, SERVER_ACCESS_LOG,
+)
+
+# A worker that dies sooner than this after starting is replaced only after a
+# pause, so a startup failure does not turn into a fork loop.
+MIN_WORKER_UPTIME_SECONDS = 1.0
+
+
+class PreforkServer:
+    """Serves an already imported app from `workers` forked uvicorn processes, replacing any that exit.
+
+    SIGTERM/SIGINT gives in-flight requests graceful_timeout seconds before workers are killed.
+    """
+
+    def __init__(self, app, host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS,
+                 backlog: int = SERVER_BACKLOG, keep_alive: int = SERVER_KEEP_ALIVE_SECONDS,
+                 graceful_timeout: int = SERVER_GRACEFUL_TIMEOUT_SECONDS, access_log: bool = SERVER_ACCESS_LOG):
+        self.workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self.config = uvicorn.Config(
+            app, host=host, port=port, backlog=backlog, timeout_keep_alive=keep_alive,
+            timeout_graceful_shutdown=graceful_timeout, access_log=access_log, lifespan="on",
+        )
+        self.children = {}
+        self.stopping = False
+        self.replaced = 0
+
+    def _spawn(self, sock):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+        # Worker: uvicorn installs its own SIGTERM/SIGINT handlers once its loop runs.
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGALRM, signal.SIG_DFL)
+            reset_after_fork()
+            server = uvicorn.Server(self.config)
+            server.run(sockets=[sock])
+            if not server.started:
+                status = 3  # the lifespan startup failed; uvicorn has logged why
+        except BaseException as e:
+            print(f"[ERROR] Worker {os.getpid()} failed: {e}")
+            status = 1
+        finally:
+            # Never fall back into the master's code.
+            os._exit(status)
+
+    def stop(self, *_):
+        if self.stopping:
+            return
+        self.stopping = True
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+        signal.alarm(self.graceful_timeout + 5)
+
+    def _kill_stragglers(self, *_):
+        for pid in self.children:
+            print(f"[ERROR] Worker {pid} still running after {self.graceful_timeout}s; killing it")
+            os.kill(pid, signal.SIGKILL)
+
+    def run(self) -> int:
+        sock = self.config.bind_socket()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self._kill_stragglers)
+        # Objects that exist now are never freed; frozen, the workers' collector
+        # leaves them alone instead of touching (and so copying) their pages.
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn(sock)
+        try:
+            while self.children:
+                pid, status = os.wait()
+                started = self.children.pop(pid, None)
+                if started is None or self.stopping:
+                    continue
+                print(f"[ERROR] Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; starting a new one")
+                if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+                    time.sleep(MIN_WORKER_UPTIME_SECONDS)
+                self.replaced += 1
+                if not self.stopping:
+                    self._spawn(sock)
+        finally:
+            signal.alarm(0)
+            sock.close()
+        return 0
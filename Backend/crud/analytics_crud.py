@@ -0,0 +1,114 @@
+import json
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from models import Expense, Income, ExpenseMonthlyRollup, IncomeMonthlyRollup
+from core.cache import cache, history_version
+from core.config import ANALYTICS_CACHE_TTL_SECONDS
+from .rollup_crud import month_key
+from .fx_crud import converted, join_rates
+
+# Trends are aggregated to one row per day in SQL; everything after that
+# (resampling, running balance, moving averages, forecast) works on those
+# compact rows, never on individual transactions.
+
+def _day_totals(db: Session, model, date_column, user_id: int, start, end, filter_column, values=None):
+    """(day, total in BASE_CURRENCY) rows; amounts are summed per day and currency before the rate join."""
+    day = func.date(date_column).label("day")
+    query = select(day, model.currency, func.sum(model.amount).label("total")).where(
+        model.user_id == user_id, date_column >= start, date_column < end)
+    if values:
+        query = query.where(filter_column.in_(values))
+    per_currency = query.group_by(day, model.currency).subquery()
+    total = func.sum(converted(per_currency.c.total, per_currency.c.currency))
+    return db.execute(join_rates(select(per_currency.c.day, total), per_currency.c.currency).group_by(per_currency.c.day)).all()
+
+def _converted_sum(model, amount_column, *criteria):
+    """Scalar subquery summing amount_column in BASE_CURRENCY over the rows matching criteria."""
+    total = func.coalesce(func.sum(converted(amount_column, model.currency)), 0)
+    return join_rates(select(total), model.currency).where(*criteria)
+
+def get_daily_totals(db: Session, user_id: int, start, end, categories=None, sources=None):
+    """[[day, expense, income], ...] for days in [start, end) with any activity, ordered by day.
+
+    categories narrows the expenses and sources the incomes; each filter only
+    applies to its own side.
+    """
+    days = {}
+    expenses = _day_totals(db, Expense, Expense.date, user_id, start, end, Expense.category, categories)
+    incomes = _day_totals(db, Income, Income.income_date, user_id, start, end, Income.source, sources)
+    for index, rows in ((1, expenses), (2, incomes)):
+        for day, total in rows:
+            days.setdefault(str(day), [str(day), 0.0, 0.0])[index] = float(total)
+    return [days[day] for day in sorted(days)]
+
+def get_balance_before(db: Session, user_id: int, start, categories=None, sources=None):
+    """Income minus expenses dated before `start`, in BASE_CURRENCY.
+
+    Whole months come from the rollup tables; only the days of start's own
+    month are summed from the transactions. Incomes filtered by source have no
+    rollup to use, so they are summed directly.
+    """
+    month_start = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month = month_key(start)
+
+    expense_months = _converted_sum(ExpenseMonthlyRollup, ExpenseMonthlyRollup.total,
+                                    ExpenseMonthlyRollup.user_id == user_id, ExpenseMonthlyRollup.month < month)
+    expense_days = _converted_sum(Expense, Expense.amount,
+                                  Expense.user_id == user_id, Expense.date >= month_start, Expense.date < start)
+    if categories:
+        expense_months = expense_months.where(ExpenseMonthlyRollup.category.in_(categories))
+        expense_days = expense_days.where(Expense.category.in_(categories))
+    if sources:
+        income_months = _converted_sum(Income, Income.amount,
+                                       Income.user_id == user_id, Income.source.in_(sources), Income.income_date < month_start)
+    else:
+        income_months = _converted_sum(IncomeMonthlyRollup, IncomeMonthlyRollup.total,
+                                       IncomeMonthlyRollup.user_id == user_id, IncomeMonthlyRollup.month < month)
+    income_days = _converted_sum(Income, Income.amount,
+                                 Income.user_id == user_id, Income.income_date >= month_start, Income.income_date < start)
+    if sources:
+        income_days = income_days.where(Income.source.in_(sources))
+
+    spent_months, spent_days, earned_months, earned_days = db.execute(select(
+        expense_months.scalar_subquery(), expense_days.scalar_subquery(),
+        income_months.scalar_subquery(), income_days.scalar_subquery(),
+    )).one()
+    return float(earned_months) + float(earned_days) - float(spent_months) - float(spent_days)
+
+def _closed_history(db: Session, user_id: int, start, end, categories, sources):
+    """Opening balance and daily totals for [start, end), where `end` is at most the start of the current month.
+
+    Nothing in those months changes without bumping history_version, so the
+    result is cached under it.
+    """
+    # JSON, so that a category named "a,b" and the categories a and b get different keys.
+    key = "analytics:history:{}:{}:{:%Y%m%d}:{:%Y%m%d}:{}:{}".format(
+        user_id, history_version(user_id), start, end, json.dumps(sorted(categories or ())), json.dumps(sorted(sources or ())))
+    history = cache.get(key)
+    if history is None:
+        history = {
+            "opening_balance": get_balance_before(db, user_id, start, categories, sources),
+            "days": get_daily_totals(db, user_id, start, end, categories, sources),
+        }
+        cache.set(key, history, ttl=ANALYTICS_CACHE_TTL_SECONDS)
+    return history
+
+def get_trend_history(db: Session, user_id: int, start, end, categories=None, sources=None, now=None):
+    """(opening_balance, daily totals) for [start, end).
+
+    Closed months (before the current one) are served from the cache; only
+    the part of the range in the current month or later is queried each time.
+    """
+    now = now or datetime.utcnow()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    closed_end = min(end, month_start)
+    if start < closed_end:
+        history = _closed_history(db, user_id, start, closed_end, categories, sources)
+        opening_balance, days = history["opening_balance"], list(history["days"])
+    else:
+        opening_balance, days = get_balance_before(db, user_id, start, categories, sources), []
+    open_start = max(start, month_start)
+    if open_start < end:
+        days.extend(get_daily_totals(db, user_id, open_start, end, categories, sources))
+    return opening_balance, days
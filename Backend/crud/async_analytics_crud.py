@@ -0,0 +1,6 @@
+"""AsyncSession versions of crud/analytics_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import analytics_crud
+
+async def get_trend_history(db: AsyncSession, user_id: int, start, end, categories=None, sources=None):
+    return await db.run_sync(analytics_crud.get_trend_history, user_id, start, end, categories, sources)
@@ -0,0 +1,24 @@
+"""AsyncSession versions of crud/budget_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import budget_crud
+
+async def get_budgets(db: AsyncSession, user_id: int):
+    return await db.run_sync(budget_crud.get_budgets, user_id)
+
+async def get_budget_by_category(db: AsyncSession, user_id: int, category: str):
+    return await db.run_sync(budget_crud.get_budget_by_category, user_id, category)
+
+async def create_budget(db: AsyncSession, user_id: int, category: str, amount: float):
+    return await db.run_sync(budget_crud.create_budget, user_id, category, amount)
+
+async def update_budget(db: AsyncSession, budget_id: int, user_id: int, amount: float):
+    return await db.run_sync(budget_crud.update_budget, budget_id, user_id, amount)
+
+async def delete_budget(db: AsyncSession, budget_id: int, user_id: int):
+    return await db.run_sync(budget_crud.delete_budget, budget_id, user_id)
+
+async def get_budget_status(db: AsyncSession, user_id: int, month: str):
+    return await db.run_sync(budget_crud.get_budget_status, user_id, month)
+
+async def get_budget_alerts(db: AsyncSession, user_id: int, month: str = None):
+    return await db.run_sync(budget_crud.get_budget_alerts, user_id, month)
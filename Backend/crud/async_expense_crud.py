@@ -0,0 +1,33 @@
+"""AsyncSession versions of crud/expense_crud.py.
+
+Each function runs its sync counterpart through AsyncSession.run_sync, so the
+query logic lives in one place while the driver I/O is awaited instead of
+blocking the event loop.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import BASE_CURRENCY
+from . import expense_crud
+
+async def get_expenses(db: AsyncSession, user_id: int, **kwargs):
+    return await db.run_sync(expense_crud.get_expenses, user_id, **kwargs)
+
+async def get_expenses_page(db: AsyncSession, user_id: int, **kwargs):
+    return await db.run_sync(expense_crud.get_expenses_page, user_id, **kwargs)
+
+async def get_expense(db: AsyncSession, expense_id: int, user_id: int):
+    return await db.run_sync(expense_crud.get_expense, expense_id, user_id)
+
+async def create_expense(db: AsyncSession, user_id: int, amount: float, category: str, description: str, date, currency: str = BASE_CURRENCY):
+    return await db.run_sync(expense_crud.create_expense, user_id, amount, category, description, date, currency)
+
+async def update_expense(db: AsyncSession, expense_id: int, user_id: int, amount: float, category: str, description: str, date, currency: str = BASE_CURRENCY):
+    return await db.run_sync(expense_crud.update_expense, expense_id, user_id, amount, category, description, date, currency)
+
+async def delete_expense(db: AsyncSession, expense_id: int, user_id: int):
+    return await db.run_sync(expense_crud.delete_expense, expense_id, user_id)
+
+async def import_expenses(db: AsyncSession, user_id: int, rows):
+    return await db.run_sync(expense_crud.import_expenses, user_id, rows)
+
+async def apply_expense_batch(db: AsyncSession, user_id: int, creates, updates, deletes):
+    return await db.run_sync(expense_crud.apply_expense_batch, user_id, creates, updates, deletes)
@@ -0,0 +1,6 @@
+"""AsyncSession versions of crud/fx_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import fx_crud
+
+async def get_currencies(db: AsyncSession):
+    return await db.run_sync(fx_crud.get_currencies)
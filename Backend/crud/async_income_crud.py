@@ -0,0 +1,28 @@
+"""AsyncSession versions of crud/income_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import BASE_CURRENCY
+from . import income_crud
+
+async def get_incomes(db: AsyncSession, user_id: int, **kwargs):
+    return await db.run_sync(income_crud.get_incomes, user_id, **kwargs)
+
+async def get_incomes_page(db: AsyncSession, user_id: int, **kwargs):
+    return await db.run_sync(income_crud.get_incomes_page, user_id, **kwargs)
+
+async def get_income(db: AsyncSession, income_id: int, user_id: int):
+    return await db.run_sync(income_crud.get_income, income_id, user_id)
+
+async def create_income(db: AsyncSession, user_id: int, source: str, amount: float, description: str, income_date, currency: str = BASE_CURRENCY):
+    return await db.run_sync(income_crud.create_income, user_id, source, amount, description, income_date, currency)
+
+async def update_income(db: AsyncSession, income_id: int, user_id: int, source: str, amount: float, description: str, income_date, currency: str = BASE_CURRENCY):
+    return await db.run_sync(income_crud.update_income, income_id, user_id, source, amount, description, income_date, currency)
+
+async def delete_income(db: AsyncSession, income_id: int, user_id: int):
+    return await db.run_sync(income_crud.delete_income, income_id, user_id)
+
+async def import_incomes(db: AsyncSession, user_id: int, rows):
+    return await db.run_sync(income_crud.import_incomes, user_id, rows)
+
+async def apply_income_batch(db: AsyncSession, user_id: int, creates, updates, deletes):
+    return await db.run_sync(income_crud.apply_income_batch, user_id, creates, updates, deletes)
@@ -0,0 +1,18 @@
+"""AsyncSession versions of crud/recurring_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import recurring_crud
+
+async def get_recurring_rules(db: AsyncSession, user_id: int):
+    return await db.run_sync(recurring_crud.get_recurring_rules, user_id)
+
+async def get_recurring_rule(db: AsyncSession, rule_id: int, user_id: int):
+    return await db.run_sync(recurring_crud.get_recurring_rule, rule_id, user_id)
+
+async def create_recurring_rule(db: AsyncSession, user_id: int, values: dict):
+    return await db.run_sync(recurring_crud.create_recurring_rule, user_id, values)
+
+async def update_recurring_rule(db: AsyncSession, rule_id: int, user_id: int, changes: dict):
+    return await db.run_sync(recurring_crud.update_recurring_rule, rule_id, user_id, changes)
+
+async def delete_recurring_rule(db: AsyncSession, rule_id: int, user_id: int):
+    return await db.run_sync(recurring_crud.delete_recurring_rule, rule_id, user_id)
@@ -0,0 +1,25 @@
+"""AsyncSession versions of crud/user_crud.py (see async_expense_crud.py)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User
+from . import user_crud
+
+async def create_user(db: AsyncSession, fullname: str, email: str, gender: str, mobilenumber: str, password: str):
+    return await db.run_sync(user_crud.create_user, fullname, email, gender, mobilenumber, password)
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.run_sync(user_crud.get_user_by_id, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.run_sync(user_crud.get_user_by_email, email)
+
+async def get_user_by_email_or_mobile(db: AsyncSession, email: str, mobile: str):
+    return await db.run_sync(user_crud.get_user_by_email_or_mobile, email, mobile)
+
+async def update_user_reset_token(db: AsyncSession, user: User, reset_token: str, expires, email=None):
+    return await db.run_sync(user_crud.update_user_reset_token, user, reset_token, expires, email)
+
+async def update_user_password(db: AsyncSession, user: User, new_password: str):
+    return await db.run_sync(user_crud.update_user_password, user, new_password)
+
+async def update_user_password_hash(db: AsyncSession, user_id: int, password_hash: str):
+    return await db.run_sync(user_crud.update_user_password_hash, user_id, password_hash)
@@ -0,0 +1,157 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, func, and_, tuple_
+from models import User, Budget, BudgetAlert, ExpenseMonthlyRollup
+from core.config import BUDGET_ALERT_THRESHOLDS, BUDGET_ALERT_EMAILS
+from .outbox_crud import add_email
+from .fx_crud import rate_for, join_rates, converted
+
+def current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+def _insert_ignore(db: Session, model, rows):
+    """INSERT rows, skipping any that hit a unique constraint (a concurrent write got there first)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        db.execute(insert(model).prefix_with("IGNORE"), rows)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        db.execute(sqlite_insert(model).on_conflict_do_nothing(), rows)
+    else:
+        for values in rows:
+            with db.begin_nested():
+                db.add(model(**values))
+
+def evaluate_budget_alerts(db: Session, increments, thresholds=BUDGET_ALERT_THRESHOLDS):
+    """Record (and email) alerts for budgets this write's rollup `increments` took across a threshold.
+
+    Only the current month alerts, and each threshold once per budget and month.
+    """
+    month = current_month()
+    increment_totals = {}
+    for row in increments:
+        if row["total"] > 0 and row["month"] == month:
+            key = (row["user_id"], row["month"], row["category"], row["currency"])
+            increment_totals[key] = increment_totals.get(key, 0.0) + row["total"]
+    if not increment_totals or not thresholds:
+        return []
+
+    query = (
+        select(Budget.user_id, ExpenseMonthlyRollup.month, Budget.category, Budget.amount, User.email,
+               ExpenseMonthlyRollup.currency, ExpenseMonthlyRollup.total, rate_for(ExpenseMonthlyRollup.currency))
+        .join(ExpenseMonthlyRollup, and_(ExpenseMonthlyRollup.user_id == Budget.user_id, ExpenseMonthlyRollup.category == Budget.category))
+        .join(User, User.id == Budget.user_id)
+        .where(tuple_(ExpenseMonthlyRollup.user_id, ExpenseMonthlyRollup.month, ExpenseMonthlyRollup.category)
+               .in_(list({key[:3] for key in increment_totals})))
+    )
+    # One row per currency the category has been spent in that month; sum them
+    # into before/after totals per budget.
+    budgets = {}
+    for user_id, month, category, budget_amount, email, currency, total, rate in db.execute(join_rates(query, ExpenseMonthlyRollup.currency)):
+        rate = rate or 0.0
+        after = total * rate
+        before = after - increment_totals.get((user_id, month, category, currency), 0.0) * rate
+        key = (user_id, month, category)
+        _, _, total_before, total_after = budgets.get(key, (budget_amount, email, 0.0, 0.0))
+        budgets[key] = (budget_amount, email, total_before + before, total_after + after)
+
+    crossed, emails = [], {}
+    for (user_id, month, category), (budget_amount, email, before, total) in budgets.items():
+        before, total = round(before, 2), round(total, 2)
+        for threshold in thresholds:
+            limit = budget_amount * threshold / 100
+            if before < limit <= total:
+                crossed.append({"user_id": user_id, "category": category, "month": month, "threshold": threshold,
+                                "budget_amount": budget_amount, "spent": total})
+                emails[(user_id, category, month, threshold)] = email
+    if not crossed:
+        return []
+
+    # Alerts that already fired this month (spending dipped and came back)
+    # are not recorded or emailed again.
+    already = set(db.execute(
+        select(BudgetAlert.user_id, BudgetAlert.category, BudgetAlert.month, BudgetAlert.threshold)
+        .where(tuple_(BudgetAlert.user_id, BudgetAlert.category, BudgetAlert.month, BudgetAlert.threshold).in_(list(emails)))
+    ).all())
+    new_alerts = [alert for alert in crossed if (alert["user_id"], alert["category"], alert["month"], alert["threshold"]) not in already]
+    if new_alerts:
+        _insert_ignore(db, BudgetAlert, new_alerts)
+        if BUDGET_ALERT_EMAILS:
+            for alert in new_alerts:
+                add_email(db, emails[(alert["user_id"], alert["category"], alert["month"], alert["threshold"])],
+                          f"Budget alert: {alert['category']} at {alert['threshold']}%",
+                          f"You have spent {alert['spent']:.2f} of your {alert['budget_amount']:.2f} "
+                          f"{alert['category']} budget for {alert['month']}.")
+    return new_alerts
+
+def _current_spending(db: Session, budget: Budget):
+    """This month's rollup rows for the budget's category, as increments (one per currency)."""
+    month = current_month()
+    rows = db.execute(select(ExpenseMonthlyRollup.currency, ExpenseMonthlyRollup.total).where(
+        ExpenseMonthlyRollup.user_id == budget.user_id, ExpenseMonthlyRollup.month == month,
+        ExpenseMonthlyRollup.category == budget.category,
+    )).all()
+    return [{"user_id": budget.user_id, "month": month, "category": budget.category, "currency": currency, "total": total}
+            for currency, total in rows]
+
+def get_budgets(db: Session, user_id: int):
+    return db.query(Budget).filter(Budget.user_id == user_id).order_by(Budget.category).all()
+
+def get_budget(db: Session, budget_id: int, user_id: int):
+    return db.query(Budget).filter(Budget.id == budget_id, Budget.user_id == user_id).first()
+
+def get_budget_by_category(db: Session, user_id: int, category: str):
+    return db.query(Budget).filter(Budget.user_id == user_id, Budget.category == category).first()
+
+def create_budget(db: Session, user_id: int, category: str, amount: float):
+    """Create a budget; spending already over a threshold this month alerts straight away."""
+    budget = Budget(user_id=user_id, category=category, amount=amount)
+    db.add(budget)
+    db.flush()
+    evaluate_budget_alerts(db, _current_spending(db, budget))
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+def update_budget(db: Session, budget_id: int, user_id: int, amount: float):
+    budget = get_budget(db, budget_id, user_id)
+    if not budget:
+        return None
+    budget.amount = amount
+    db.flush()
+    evaluate_budget_alerts(db, _current_spending(db, budget))
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+def delete_budget(db: Session, budget_id: int, user_id: int):
+    budget = get_budget(db, budget_id, user_id)
+    if not budget:
+        return False
+    db.delete(budget)
+    db.commit()
+    return True
+
+def get_budget_status(db: Session, user_id: int, month: str):
+    """Each budget with the month's spending in BASE_CURRENCY, from one join against the rollup rows."""
+    spending = join_rates(
+        select(ExpenseMonthlyRollup.category,
+               func.sum(converted(ExpenseMonthlyRollup.total, ExpenseMonthlyRollup.currency)).label("total")),
+        ExpenseMonthlyRollup.currency,
+    ).where(
+        ExpenseMonthlyRollup.user_id == user_id, ExpenseMonthlyRollup.month == month,
+    ).group_by(ExpenseMonthlyRollup.category).subquery()
+    rows = db.execute(
+        select(Budget.id, Budget.category, Budget.amount, spending.c.total)
+        .outerjoin(spending, spending.c.category == Budget.category)
+        .where(Budget.user_id == user_id)
+        .order_by(Budget.category)
+    ).all()
+    return [(budget_id, category, amount, total or 0.0) for budget_id, category, amount, total in rows]
+
+def get_budget_alerts(db: Session, user_id: int, month: str = None):
+    query = select(BudgetAlert.category, BudgetAlert.month, BudgetAlert.threshold, BudgetAlert.budget_amount,
+                   BudgetAlert.spent, BudgetAlert.created_at).where(BudgetAlert.user_id == user_id)
+    if month:
+        query = query.where(BudgetAlert.month == month)
+    return db.execute(query.order_by(BudgetAlert.created_at.desc(), BudgetAlert.id.desc())).all()
@@ -0,0 +1,64 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from models import Expense, ExpenseMonthlyRollup, IncomeMonthlyRollup
+from .rollup_crud import month_key
+from .fx_crud import converted, join_rates
+
+# Everything except the recent-expenses list is read from the monthly rollup
+# tables, so the cost depends on the number of months and categories a user
+# has, not on the number of transactions. Rollup rows are kept per currency
+# and converted to BASE_CURRENCY in the same statement.
+
+def _converted_total(rollup):
+    return func.sum(converted(rollup.total, rollup.currency))
+
+def get_totals(db: Session, user_id: int):
+    """Return (total_spent, total_income, expense_count) in one round-trip; amounts in BASE_CURRENCY."""
+    spent = join_rates(select(func.coalesce(_converted_total(ExpenseMonthlyRollup), 0)), ExpenseMonthlyRollup.currency).where(
+        ExpenseMonthlyRollup.user_id == user_id).scalar_subquery()
+    count = select(func.coalesce(func.sum(ExpenseMonthlyRollup.count), 0)).where(ExpenseMonthlyRollup.user_id == user_id).scalar_subquery()
+    income = join_rates(select(func.coalesce(_converted_total(IncomeMonthlyRollup), 0)), IncomeMonthlyRollup.currency).where(
+        IncomeMonthlyRollup.user_id == user_id).scalar_subquery()
+    total_spent, total_income, expense_count = db.execute(select(spent, income, count)).one()
+    return float(total_spent), float(total_income), int(expense_count)
+
+def get_first_expense_month(db: Session, user_id: int):
+    """The earliest "YYYY-MM" with expenses, or None."""
+    return db.execute(select(func.min(ExpenseMonthlyRollup.month)).where(ExpenseMonthlyRollup.user_id == user_id)).scalar()
+
+def get_recent_expenses(db: Session, user_id: int, limit: int = 5):
+    return db.execute(
+        select(Expense.date, Expense.category, Expense.amount, Expense.description, Expense.currency)
+        .where(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .limit(limit)
+    ).all()
+
+def get_category_breakdown(db: Session, user_id: int):
+    rows = db.execute(
+        join_rates(select(ExpenseMonthlyRollup.category, _converted_total(ExpenseMonthlyRollup)), ExpenseMonthlyRollup.currency)
+        .where(ExpenseMonthlyRollup.user_id == user_id)
+        .group_by(ExpenseMonthlyRollup.category)
+    ).all()
+    return {category: float(total) for category, total in rows}
+
+def get_monthly_trend(db: Session, user_id: int, since):
+    """Income and expense per calendar month, from the month containing `since`."""
+    since_month = month_key(since)
+    expenses = db.execute(
+        join_rates(select(ExpenseMonthlyRollup.month, _converted_total(ExpenseMonthlyRollup)), ExpenseMonthlyRollup.currency)
+        .where(ExpenseMonthlyRollup.user_id == user_id, ExpenseMonthlyRollup.month >= since_month)
+        .group_by(ExpenseMonthlyRollup.month)
+    ).all()
+    incomes = db.execute(
+        join_rates(select(IncomeMonthlyRollup.month, _converted_total(IncomeMonthlyRollup)), IncomeMonthlyRollup.currency)
+        .where(IncomeMonthlyRollup.user_id == user_id, IncomeMonthlyRollup.month >= since_month)
+        .group_by(IncomeMonthlyRollup.month)
+    ).all()
+
+    monthly_expenses = {month: float(total) for month, total in expenses}
+    monthly_incomes = {month: float(total) for month, total in incomes}
+    return [
+        {"month": month, "income": monthly_incomes.get(month, 0), "expense": monthly_expenses.get(month, 0)}
+        for month in sorted(set(monthly_expenses) | set(monthly_incomes))
+    ]
@@ -1,31 +1,90 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, insert, select, update, delete
 from models import Expense
+from core.cache import invalidate_user
+from core.config import BASE_CURRENCY
+from .pagination import paginate, DEFAULT_PAGE_SIZE
+from .search_crud import contains_pattern
+from .rollup_crud import apply_expense_delta, apply_expense_deltas
 
-def get_expenses(db: Session, user_id: int):
-    return db.query(Expense).filter(Expense.user_id == user_id).all()
+EXPENSE_SORT_FIELDS = {
+    "date": Expense.date,
+    "amount": Expense.amount,
+    "category": Expense.category,
+}
 
-def create_expense(db: Session, user_id: int, amount: float, category: str, description: str, date):
+# Columns returned by the list and export queries, as plain rows rather than ORM objects.
+EXPENSE_COLUMNS = (Expense.id, Expense.date, Expense.category, Expense.amount, Expense.description, Expense.currency)
+
+def _filtered_expenses(db: Session, user_id: int, category: str = None, date_from=None, date_to=None,
+                       min_amount: float = None, max_amount: float = None, search: str = None):
+    query = db.query(Expense).filter(Expense.user_id == user_id)
+    if category:
+        query = query.filter(Expense.category == category)
+    if date_from:
+        query = query.filter(Expense.date >= date_from)
+    if date_to:
+        query = query.filter(Expense.date < date_to)
+    if min_amount is not None:
+        query = query.filter(Expense.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Expense.amount <= max_amount)
+    if search:
+        pattern = contains_pattern(search)
+        query = query.filter(or_(Expense.description.ilike(pattern, escape="\\"), Expense.category.ilike(pattern, escape="\\")))
+    return query
+
+def _sorted_expenses(db: Session, user_id: int, sort: str, order: str, **filters):
+    sort_column = EXPENSE_SORT_FIELDS[sort]
+    query = _filtered_expenses(db, user_id, **filters).with_entities(*EXPENSE_COLUMNS)
+    if order == "asc":
+        return query.order_by(sort_column.asc(), Expense.id.asc())
+    return query.order_by(sort_column.desc(), Expense.id.desc())
+
+def get_expenses(db: Session, user_id: int, sort: str = "date", order: str = "desc", **filters):
+    return _sorted_expenses(db, user_id, sort, order, **filters).all()
+
+def get_expenses_page(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None,
+                      sort: str = "date", order: str = "desc", **filters):
+    query = _filtered_expenses(db, user_id, **filters).with_entities(*EXPENSE_COLUMNS)
+    return paginate(query, EXPENSE_SORT_FIELDS[sort], Expense.id, order != "asc", limit, cursor)
+
+def get_expenses_export_statement(db: Session, user_id: int, sort: str = "date", order: str = "desc", **filters):
+    """Plain column SELECT of the filtered expenses, for streaming exports."""
+    return _sorted_expenses(db, user_id, sort, order, **filters).statement
+
+def get_expense(db: Session, expense_id: int, user_id: int):
+    return db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == user_id).first()
+
+def create_expense(db: Session, user_id: int, amount: float, category: str, description: str, date, currency: str = BASE_CURRENCY):
     new_expense = Expense(
         user_id=user_id,
         amount=amount,
+        currency=currency,
         category=category,
         description=description,
         date=date
     )
     db.add(new_expense)
+    apply_expense_delta(db, user_id, date, category, currency, amount, 1)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(new_expense)
     return new_expense
 
-def update_expense(db: Session, expense_id: int, user_id: int, amount: float, category: str, description: str, date):
+def update_expense(db: Session, expense_id: int, user_id: int, amount: float, category: str, description: str, date, currency: str = BASE_CURRENCY):
     expense = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == user_id).first()
     if not expense:
         return None
+    apply_expense_delta(db, user_id, expense.date, expense.category, expense.currency, -expense.amount, -1)
+    apply_expense_delta(db, user_id, date, category, currency, amount, 1)
     expense.amount = amount
+    expense.currency = currency
     expense.category = category
     expense.description = description
     expense.date = date
     db.commit()
+    invalidate_user(user_id)
     db.refresh(expense)
     return expense
 
@@ -33,6 +92,67 @@ def delete_expense(db: Session, expense_id: int, user_id: int):
     expense = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == user_id).first()
     if not expense:
         return False
+    apply_expense_delta(db, user_id, expense.date, expense.category, expense.currency, -expense.amount, -1)
     db.delete(expense)
     db.commit()
+    invalidate_user(user_id)
     return True
+
+def import_expenses(db: Session, user_id: int, rows):
+    """Insert validated rows (dicts of amount/currency/category/description/date) in one transaction.
+
+    Uses a single Core executemany INSERT (no ORM unit of work) and one
+    rollup upsert per (month, category).
+    """
+    if not rows:
+        return 0
+    db.execute(insert(Expense.__table__), [dict(row, user_id=user_id) for row in rows])
+    apply_expense_deltas(db, user_id, ((row["date"], row["category"], row["currency"], row["amount"], 1) for row in rows))
+    db.commit()
+    invalidate_user(user_id)
+    return len(rows)
+
+def apply_expense_batch(db: Session, user_id: int, creates, updates, deletes):
+    """Apply validated creates, (id, changes) updates and id deletes in one transaction.
+
+    Returns (created_ids, []), or ([], missing_ids) without writing anything
+    if a record is not the user's.
+    """
+    ids = [record_id for record_id, _ in updates] + list(deletes)
+    existing = {}
+    if ids:
+        rows = db.execute(select(Expense.id, Expense.date, Expense.category, Expense.currency, Expense.amount).where(Expense.id.in_(ids), Expense.user_id == user_id)).all()
+        existing = {row.id: row for row in rows}
+    missing = [record_id for record_id in ids if record_id not in existing]
+    if missing:
+        return [], missing
+
+    deltas = []
+    if deletes:
+        db.execute(delete(Expense).where(Expense.id.in_(deletes), Expense.user_id == user_id).execution_options(synchronize_session=False))
+        for record_id in deletes:
+            old = existing[record_id]
+            deltas.append((old.date, old.category, old.currency, -old.amount, -1))
+
+    groups = {}
+    for record_id, changes in updates:
+        groups.setdefault(tuple(sorted(changes.items())), []).append(record_id)
+    for key, group_ids in groups.items():
+        changes = dict(key)
+        db.execute(update(Expense).where(Expense.id.in_(group_ids), Expense.user_id == user_id).values(**changes).execution_options(synchronize_session=False))
+        for record_id in group_ids:
+            old = existing[record_id]
+            deltas.append((old.date, old.category, old.currency, -old.amount, -1))
+            deltas.append((changes.get("date", old.date), changes.get("category", old.category),
+                           changes.get("currency", old.currency), changes.get("amount", old.amount), 1))
+
+    new_expenses = [Expense(user_id=user_id, **values) for values in creates]
+    if new_expenses:
+        db.add_all(new_expenses)
+        db.flush()
+        deltas.extend((values["date"], values["category"], values["currency"], values["amount"], 1) for values in creates)
+
+    apply_expense_deltas(db, user_id, deltas)
+    db.commit()
+    invalidate_user(user_id)
+    return [expense.id for expense in new_expenses], []
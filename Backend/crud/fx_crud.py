@@ -0,0 +1,91 @@
+import csv
+import math
+import re
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import select, case, type_coerce
+from models import FxRate
+from models.types import Money
+from core.cache import cache, invalidate_rates
+from core.config import BASE_CURRENCY
+
+CURRENCY_PATTERN = re.compile(r"[A-Z]{3}")
+# Money stores hundredths, so only ISO 4217 currencies whose minor unit is the
+# cent are accepted; JPY (0 decimals) or KWD (3 decimals) would be misstated.
+CENT_CURRENCIES = frozenset("""
+    AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BMD BND BOB BOV BRL BSD BTN BWP BYN BZD
+    CAD CDF CHE CHF CHW CNY COP COU CRC CUC CUP CVE CZK DKK DOP DZD EGP ERN ETB EUR FJD FKP GBP GEL
+    GHS GIP GMD GTQ GYD HKD HNL HTG HUF IDR ILS INR IRR JMD KES KGS KHR KPW KYD KZT LAK LBP LKR LRD
+    LSL MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MXV MYR MZN NAD NGN NIO NOK NPR NZD PAB PEN
+    PGK PHP PKR PLN QAR RON RSD RUB SAR SBD SCR SDG SEK SGD SHP SLE SLL SOS SRD SSP STN SVC SYP SZL
+    THB TJS TMT TOP TRY TTD TWD TZS UAH USD USN UZS VED VES WST XCD XCG YER ZAR ZMW ZWG ZWL
+""".split())
+_CURRENCIES_KEY = "fx:currencies"
+
+# Totals in mixed currencies are converted in SQL: the rows (or rollup rows)
+# are outer-joined to fx_rates on their currency and multiplied by the rate,
+# so a dashboard or trend is still one statement however many currencies the
+# user holds.
+
+def rate_for(currency_column):
+    """Base-currency units per unit of currency_column; the query must outer-join FxRate with join_rates."""
+    return case((currency_column == BASE_CURRENCY, 1.0), else_=FxRate.rate)
+
+def join_rates(query, currency_column):
+    return query.outerjoin(FxRate, FxRate.currency == currency_column)
+
+def converted(amount_column, currency_column):
+    """amount_column in BASE_CURRENCY, still typed as Money so sums come back as amounts."""
+    return type_coerce(amount_column * rate_for(currency_column), Money)
+
+def get_currencies(db: Session):
+    """Currencies amounts may be recorded in: BASE_CURRENCY plus every loaded rate.
+
+    Cached, so a `fx load` in another process shows up here within CACHE_TTL_SECONDS.
+    """
+    currencies = cache.get(_CURRENCIES_KEY)
+    if currencies is None:
+        currencies = sorted({BASE_CURRENCY, *db.execute(select(FxRate.currency)).scalars()})
+        cache.set(_CURRENCIES_KEY, currencies)
+    return set(currencies)
+
+def get_rates(db: Session):
+    return db.execute(select(FxRate.currency, FxRate.rate, FxRate.updated_at).order_by(FxRate.currency)).all()
+
+def read_rates_file(path: str):
+    """Parse a currency,rate CSV (with a header row). Returns (rates, errors) with rates as {currency: rate}."""
+    rates, errors = {}, []
+    with open(path, newline="") as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            currency = (row.get("currency") or "").strip().upper()
+            try:
+                rate = float(row.get("rate") or "")
+            except ValueError:
+                rate = math.nan
+            if not CURRENCY_PATTERN.fullmatch(currency):
+                errors.append(f"line {line}: currency must be a 3-letter code")
+            elif currency not in CENT_CURRENCIES:
+                errors.append(f"line {line}: {currency} is not a currency with cents")
+            elif not math.isfinite(rate) or rate <= 0:
+                errors.append(f"line {line}: rate must be a number > 0")
+            elif currency != BASE_CURRENCY:
+                rates[currency] = rate
+    return rates, errors
+
+def load_rates(db: Session, rates: dict):
+    """Insert or update rates ({currency: rate}) in one transaction; existing currencies are never removed.
+
+    Cached dashboards and trends are invalidated for every user.
+    """
+    existing = {rate.currency: rate for rate in db.scalars(select(FxRate).where(FxRate.currency.in_(list(rates))))}
+    now = datetime.utcnow()
+    for currency, rate in rates.items():
+        if currency in existing:
+            existing[currency].rate = rate
+            existing[currency].updated_at = now
+        else:
+            db.add(FxRate(currency=currency, rate=rate, updated_at=now))
+    db.commit()
+    cache.delete(_CURRENCIES_KEY)
+    invalidate_rates()
+    return len(rates)
@@ -1,31 +1,90 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, insert, select, update, delete
 from models import Income
+from core.cache import invalidate_user
+from core.config import BASE_CURRENCY
+from .pagination import paginate, DEFAULT_PAGE_SIZE
+from .search_crud import contains_pattern
+from .rollup_crud import apply_income_delta, apply_income_deltas
 
-def get_incomes(db: Session, user_id: int):
-    return db.query(Income).filter(Income.user_id == user_id).all()
+INCOME_SORT_FIELDS = {
+    "income_date": Income.income_date,
+    "amount": Income.amount,
+    "source": Income.source,
+}
 
-def create_income(db: Session, user_id: int, source: str, amount: float, description: str, income_date):
+# Columns returned by the list and export queries, as plain rows rather than ORM objects.
+INCOME_COLUMNS = (Income.id, Income.income_date, Income.source, Income.amount, Income.description, Income.currency)
+
+def _filtered_incomes(db: Session, user_id: int, source: str = None, date_from=None, date_to=None,
+                      min_amount: float = None, max_amount: float = None, search: str = None):
+    query = db.query(Income).filter(Income.user_id == user_id)
+    if source:
+        query = query.filter(Income.source == source)
+    if date_from:
+        query = query.filter(Income.income_date >= date_from)
+    if date_to:
+        query = query.filter(Income.income_date < date_to)
+    if min_amount is not None:
+        query = query.filter(Income.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Income.amount <= max_amount)
+    if search:
+        pattern = contains_pattern(search)
+        query = query.filter(or_(Income.description.ilike(pattern, escape="\\"), Income.source.ilike(pattern, escape="\\")))
+    return query
+
+def _sorted_incomes(db: Session, user_id: int, sort: str, order: str, **filters):
+    sort_column = INCOME_SORT_FIELDS[sort]
+    query = _filtered_incomes(db, user_id, **filters).with_entities(*INCOME_COLUMNS)
+    if order == "asc":
+        return query.order_by(sort_column.asc(), Income.id.asc())
+    return query.order_by(sort_column.desc(), Income.id.desc())
+
+def get_incomes(db: Session, user_id: int, sort: str = "income_date", order: str = "desc", **filters):
+    return _sorted_incomes(db, user_id, sort, order, **filters).all()
+
+def get_incomes_page(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None,
+                     sort: str = "income_date", order: str = "desc", **filters):
+    query = _filtered_incomes(db, user_id, **filters).with_entities(*INCOME_COLUMNS)
+    return paginate(query, INCOME_SORT_FIELDS[sort], Income.id, order != "asc", limit, cursor)
+
+def get_incomes_export_statement(db: Session, user_id: int, sort: str = "income_date", order: str = "desc", **filters):
+    """Plain column SELECT of the filtered incomes, for streaming exports."""
+    return _sorted_incomes(db, user_id, sort, order, **filters).statement
+
+def get_income(db: Session, income_id: int, user_id: int):
+    return db.query(Income).filter(Income.id == income_id, Income.user_id == user_id).first()
+
+def create_income(db: Session, user_id: int, source: str, amount: float, description: str, income_date, currency: str = BASE_CURRENCY):
     new_income = Income(
         user_id=user_id,
         source=source,
         amount=amount,
+        currency=currency,
         description=description,
         income_date=income_date
     )
     db.add(new_income)
+    apply_income_delta(db, user_id, income_date, currency, amount, 1)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(new_income)
     return new_income
 
-def update_income(db: Session, income_id: int, user_id: int, source: str, amount: float, description: str, income_date):
+def update_income(db: Session, income_id: int, user_id: int, source: str, amount: float, description: str, income_date, currency: str = BASE_CURRENCY):
     income = db.query(Income).filter(Income.id == income_id, Income.user_id == user_id).first()
     if not income:
         return None
+    apply_income_delta(db, user_id, income.income_date, income.currency, -income.amount, -1)
+    apply_income_delta(db, user_id, income_date, currency, amount, 1)
     income.source = source
     income.amount = amount
+    income.currency = currency
     income.description = description
     income.income_date = income_date
     db.commit()
+    invalidate_user(user_id)
     db.refresh(income)
     return income
 
@@ -33,6 +92,58 @@ def delete_income(db: Session, income_id: int, user_id: int):
     income = db.query(Income).filter(Income.id == income_id, Income.user_id == user_id).first()
     if not income:
         return False
+    apply_income_delta(db, user_id, income.income_date, income.currency, -income.amount, -1)
     db.delete(income)
     db.commit()
+    invalidate_user(user_id)
     return True
+
+def import_incomes(db: Session, user_id: int, rows):
+    """Insert validated rows (dicts of source/amount/currency/description/income_date); see import_expenses."""
+    if not rows:
+        return 0
+    db.execute(insert(Income.__table__), [dict(row, user_id=user_id) for row in rows])
+    apply_income_deltas(db, user_id, ((row["income_date"], row["currency"], row["amount"], 1) for row in rows))
+    db.commit()
+    invalidate_user(user_id)
+    return len(rows)
+
+def apply_income_batch(db: Session, user_id: int, creates, updates, deletes):
+    """Apply validated creates, partial updates and deletes; see apply_expense_batch."""
+    ids = [record_id for record_id, _ in updates] + list(deletes)
+    existing = {}
+    if ids:
+        rows = db.execute(select(Income.id, Income.income_date, Income.currency, Income.amount).where(Income.id.in_(ids), Income.user_id == user_id)).all()
+        existing = {row.id: row for row in rows}
+    missing = [record_id for record_id in ids if record_id not in existing]
+    if missing:
+        return [], missing
+
+    deltas = []
+    if deletes:
+        db.execute(delete(Income).where(Income.id.in_(deletes), Income.user_id == user_id).execution_options(synchronize_session=False))
+        for record_id in deletes:
+            old = existing[record_id]
+            deltas.append((old.income_date, old.currency, -old.amount, -1))
+
+    groups = {}
+    for record_id, changes in updates:
+        groups.setdefault(tuple(sorted(changes.items())), []).append(record_id)
+    for key, group_ids in groups.items():
+        changes = dict(key)
+        db.execute(update(Income).where(Income.id.in_(group_ids), Income.user_id == user_id).values(**changes).execution_options(synchronize_session=False))
+        for record_id in group_ids:
+            old = existing[record_id]
+            deltas.append((old.income_date, old.currency, -old.amount, -1))
+            deltas.append((changes.get("income_date", old.income_date), changes.get("currency", old.currency), changes.get("amount", old.amount), 1))
+
+    new_incomes = [Income(user_id=user_id, **values) for values in creates]
+    if new_incomes:
+        db.add_all(new_incomes)
+        db.flush()
+        deltas.extend((values["income_date"], values["currency"], values["amount"], 1) for values in creates)
+
+    apply_income_deltas(db, user_id, deltas)
+    db.commit()
+    invalidate_user(user_id)
+    return [income.id for income in new_incomes], []
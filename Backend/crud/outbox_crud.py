@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func
+from models import EmailOutbox
+
+def add_email(db: Session, to_email: str, subject: str, body: str):
+    """Queue an email in the caller's transaction; it is only sent once that commits."""
+    email = EmailOutbox(to_email=to_email, subject=subject, body=body, status="pending", attempts=0, next_attempt_at=datetime.utcnow())
+    db.add(email)
+    return email
+
+def claim_emails(db: Session, limit: int, lease_seconds: int, now: datetime = None):
+    """Lease up to `limit` due emails to this worker and return them.
+
+    "sending" rows whose lease ran out (their worker died) are claimed again.
+    """
+    now = now or datetime.utcnow()
+    ids = db.execute(
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        db.commit()
+        return []
+    db.execute(
+        update(EmailOutbox).where(EmailOutbox.id.in_(ids))
+        .values(status="sending", attempts=EmailOutbox.attempts + 1, next_attempt_at=now + timedelta(seconds=lease_seconds)),
+        execution_options={"synchronize_session": False},
+    )
+    emails = db.execute(
+        select(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject, EmailOutbox.body, EmailOutbox.attempts)
+        .where(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id)
+    ).all()
+    db.commit()
+    return emails
+
+def mark_emails_sent(db: Session, email_ids, now: datetime = None):
+    if not email_ids:
+        return
+    db.execute(
+        update(EmailOutbox).where(EmailOutbox.id.in_(email_ids))
+        .values(status="sent", sent_at=now or datetime.utcnow(), last_error=None),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+def mark_emails_unsent(db: Session, failures):
+    """Record failed deliveries from (email_id, error, next_attempt_at) tuples.
+
+    A next_attempt_at of None gives up on the email for good.
+    """
+    for email_id, error, next_attempt_at in failures:
+        values = {"last_error": str(error)[:500]}
+        if next_attempt_at is None:
+            values["status"] = "failed"
+        else:
+            values.update(status="pending", next_attempt_at=next_attempt_at)
+        db.execute(update(EmailOutbox).where(EmailOutbox.id == email_id).values(**values), execution_options={"synchronize_session": False})
+    db.commit()
+
+def release_emails(db: Session, email_ids, next_attempt_at: datetime):
+    """Hand claimed emails back untried: pending again from next_attempt_at, with the claim's attempt undone."""
+    if not email_ids:
+        return
+    db.execute(
+        update(EmailOutbox).where(EmailOutbox.id.in_(email_ids))
+        .values(status="pending", attempts=EmailOutbox.attempts - 1, next_attempt_at=next_attempt_at),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+def get_outbox_stats(db: Session):
+    """Email counts by status, plus the age in seconds of the oldest pending email."""
+    counts = dict(db.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)).all())
+    oldest = db.execute(select(func.min(EmailOutbox.created_at)).where(EmailOutbox.status.in_(("pending", "sending")))).scalar()
+    return {
+        "counts": {status: counts.get(status, 0) for status in ("pending", "sending", "sent", "failed")},
+        "oldest_pending_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else None,
+    }
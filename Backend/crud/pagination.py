@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id: int, key: str = "") -> str:
+    """Opaque cursor for the row at (sort_value, row_id); `key` names the ordering it belongs to."""
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    raw = json.dumps([key, sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str = ""):
+    """(sort_value, row_id) from a cursor made by encode_cursor with the same `key`.
+
+    A cursor from another ordering (sort field or direction) is rejected
+    rather than compared against the wrong column.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_key, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+        row_id = int(row_id)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if cursor_key != key:
+        raise InvalidCursor("Invalid cursor")
+    return sort_value, row_id
+
+
+def paginate(query, sort_column, id_column, descending: bool, limit: int, cursor: str = None):
+    """Keyset pagination over (sort_column, id_column).
+
+    The page is located with a range predicate on the sort key instead of an
+    OFFSET, so fetching page N costs the same as fetching page 1.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    key = f"{sort_column.class_.__tablename__}.{sort_column.key}:{'desc' if descending else 'asc'}"
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, key)
+        if descending:
+            query = query.filter(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id)))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key), key)
+    return rows, next_cursor
@@ -0,0 +1,202 @@
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, insert, delete
+from sqlalchemy.exc import IntegrityError
+from models import RecurringRule, Expense, Income
+from core.cache import invalidate_user
+from core.config import RECURRING_BATCH_SIZE, RECURRING_MAX_OCCURRENCES_PER_BATCH
+from .rollup_crud import apply_user_expense_deltas, apply_user_income_deltas
+
+RECURRING_KINDS = ("expense", "income")
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+# Everything _materialize needs, selected as plain columns rather than ORM objects.
+_RULE_COLUMNS = (
+    RecurringRule.id, RecurringRule.user_id, RecurringRule.kind, RecurringRule.amount, RecurringRule.currency, RecurringRule.category,
+    RecurringRule.source, RecurringRule.description, RecurringRule.frequency, RecurringRule.interval,
+    RecurringRule.start_date, RecurringRule.end_date, RecurringRule.occurrence_count,
+)
+
+def _add_months(day: date, months: int) -> date:
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    return date(year, month + 1, min(day.day, monthrange(year, month + 1)[1]))
+
+def occurrence_date(start_date: date, frequency: str, interval: int, index: int) -> date:
+    """Date of occurrence `index` (0 is start_date), always counted from start_date so month-end clamping never drifts."""
+    if frequency == "daily":
+        return start_date + timedelta(days=interval * index)
+    if frequency == "weekly":
+        return start_date + timedelta(weeks=interval * index)
+    if frequency == "monthly":
+        return _add_months(start_date, interval * index)
+    if frequency == "yearly":
+        return _add_months(start_date, 12 * interval * index)
+    raise ValueError(f"Unknown frequency: {frequency}")
+
+def _next_run_date(rule, occurrence_count: int):
+    day = occurrence_date(rule.start_date, rule.frequency, rule.interval, occurrence_count)
+    return None if rule.end_date is not None and day > rule.end_date else day
+
+def _materialize(db: Session, rules, today: date, max_occurrences: int = RECURRING_MAX_OCCURRENCES_PER_BATCH):
+    """Write the occurrences of `rules` due on or before today, at most max_occurrences, and advance the rules.
+
+    The caller commits. Returns (expenses, incomes, stopped_at): stopped_at is
+    the id of the rule the limit cut short, or None when every rule caught up.
+    """
+    if max_occurrences < 1:
+        raise ValueError("max_occurrences must be at least 1")
+    expense_rows, income_rows, rule_updates = [], [], []
+    stopped_at = None
+    for rule in rules:
+        if len(expense_rows) + len(income_rows) >= max_occurrences:
+            stopped_at = rule.id
+            break
+        count = rule.occurrence_count
+        day = _next_run_date(rule, count)
+        while day is not None and day <= today:
+            if len(expense_rows) + len(income_rows) >= max_occurrences:
+                stopped_at = rule.id
+                break
+            when = datetime.combine(day, time.min)
+            if rule.kind == "expense":
+                expense_rows.append({"user_id": rule.user_id, "amount": rule.amount, "currency": rule.currency, "category": rule.category,
+                                     "description": rule.description, "date": when, "recurring_rule_id": rule.id})
+            else:
+                income_rows.append({"user_id": rule.user_id, "amount": rule.amount, "currency": rule.currency, "source": rule.source,
+                                    "description": rule.description, "income_date": when, "recurring_rule_id": rule.id})
+            count += 1
+            day = _next_run_date(rule, count)
+        rule_updates.append({"id": rule.id, "occurrence_count": count, "next_run_date": day})
+        if stopped_at is not None:
+            break
+
+    if expense_rows:
+        db.execute(insert(Expense.__table__), expense_rows)
+        apply_user_expense_deltas(db, ((row["user_id"], row["date"], row["category"], row["currency"], row["amount"], 1) for row in expense_rows))
+    if income_rows:
+        db.execute(insert(Income.__table__), income_rows)
+        apply_user_income_deltas(db, ((row["user_id"], row["income_date"], row["currency"], row["amount"], 1) for row in income_rows))
+    if rule_updates:
+        db.execute(update(RecurringRule), rule_updates)
+    return len(expense_rows), len(income_rows), stopped_at
+
+def _materialize_batch(db: Session, rules, today: date, max_occurrences: int):
+    """_materialize and commit `rules`; returns (expenses, incomes, stopped_at, skipped rule ids).
+
+    On a duplicate occurrence the batch is redone one rule per transaction, skipping the rules that collide.
+    """
+    try:
+        result = _materialize(db, rules, today, max_occurrences)
+        db.commit()
+        return (*result, [])
+    except IntegrityError:
+        db.rollback()
+    expenses = incomes = 0
+    stopped_at, skipped = None, []
+    for rule in rules:
+        if expenses + incomes >= max_occurrences:
+            stopped_at = rule.id
+            break
+        try:
+            rule_expenses, rule_incomes, stopped_at = _materialize(db, [rule], today, max_occurrences - expenses - incomes)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            skipped.append(rule.id)
+            continue
+        expenses += rule_expenses
+        incomes += rule_incomes
+        if stopped_at is not None:
+            break
+    return expenses, incomes, stopped_at, skipped
+
+def materialize_due(db: Session, today: date = None, batch_size: int = RECURRING_BATCH_SIZE, user_id: int = None,
+                    max_occurrences: int = RECURRING_MAX_OCCURRENCES_PER_BATCH):
+    """Materialize every active rule due on or before today, batch_size rules and at most max_occurrences rows per transaction.
+
+    A rule cut short by max_occurrences starts the next batch. Rules whose
+    occurrences were already written elsewhere are skipped and counted.
+    """
+    if max_occurrences < 1:
+        raise ValueError("max_occurrences must be at least 1")
+    today = today or datetime.utcnow().date()
+    stats = {"batches": 0, "rules": 0, "expenses": 0, "incomes": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        query = select(*_RULE_COLUMNS).where(
+            RecurringRule.active.is_(True), RecurringRule.next_run_date <= today, RecurringRule.id > last_id,
+        )
+        if user_id is not None:
+            query = query.where(RecurringRule.user_id == user_id)
+        # SKIP LOCKED lets concurrent runs on MySQL split the work.
+        rules = db.execute(query.order_by(RecurringRule.id).limit(batch_size).with_for_update(skip_locked=True)).all()
+        if not rules:
+            break
+        expenses, incomes, stopped_at, skipped = _materialize_batch(db, rules, today, max_occurrences)
+        caught_up = [rule for rule in rules if (stopped_at is None or rule.id < stopped_at) and rule.id not in skipped]
+        last_id = rules[-1].id if stopped_at is None else stopped_at - 1
+        for affected_user_id in {rule.user_id for rule in rules}:
+            invalidate_user(affected_user_id)
+        stats["batches"] += 1
+        stats["rules"] += len(caught_up)
+        stats["expenses"] += expenses
+        stats["incomes"] += incomes
+        stats["skipped"] += len(skipped)
+    return stats
+
+def get_recurring_rules(db: Session, user_id: int):
+    return db.query(RecurringRule).filter(RecurringRule.user_id == user_id).order_by(RecurringRule.id).all()
+
+def get_recurring_rule(db: Session, rule_id: int, user_id: int):
+    return db.query(RecurringRule).filter(RecurringRule.id == rule_id, RecurringRule.user_id == user_id).first()
+
+def create_recurring_rule(db: Session, user_id: int, values: dict, today: date = None):
+    """Create a rule and write the occurrences already due (e.g. a start_date in the past)."""
+    today = today or datetime.utcnow().date()
+    rule = RecurringRule(user_id=user_id, occurrence_count=0, active=True, **values)
+    rule.next_run_date = _next_run_date(rule, 0)
+    db.add(rule)
+    db.flush()
+    # A long catch-up is written over several transactions; if one fails, the
+    # rule is still due from where it stopped and the scheduler carries on.
+    while True:
+        stopped_at = _materialize(db, [rule], today)[2]
+        db.commit()
+        db.refresh(rule)
+        if stopped_at is None:
+            break
+    invalidate_user(user_id)
+    return rule
+
+def update_recurring_rule(db: Session, rule_id: int, user_id: int, changes: dict, today: date = None):
+    """Apply changes to future occurrences; rows already written are left alone.
+
+    Resuming a paused rule skips the occurrences that fell while it was paused.
+    """
+    today = today or datetime.utcnow().date()
+    rule = get_recurring_rule(db, rule_id, user_id)
+    if not rule:
+        return None
+    resuming = changes.get("active") is True and not rule.active
+    for field, value in changes.items():
+        setattr(rule, field, value)
+    if resuming:
+        while occurrence_date(rule.start_date, rule.frequency, rule.interval, rule.occurrence_count) < today:
+            rule.occurrence_count += 1
+    rule.next_run_date = _next_run_date(rule, rule.occurrence_count)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+def delete_recurring_rule(db: Session, rule_id: int, user_id: int):
+    """Delete the rule; expenses and incomes it already created are kept, unlinked."""
+    rule = get_recurring_rule(db, rule_id, user_id)
+    if not rule:
+        return False
+    for model in (Expense, Income):
+        db.execute(update(model).where(model.recurring_rule_id == rule_id).values(recurring_rule_id=None).execution_options(synchronize_session=False))
+    db.execute(delete(RecurringRule).where(RecurringRule.id == rule_id))
+    db.commit()
+    return True
@@ -0,0 +1,197 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, insert, func, extract, event
+from models import Expense, Income, ExpenseMonthlyRollup, IncomeMonthlyRollup
+from core.cache import invalidate_history
+from .budget_crud import evaluate_budget_alerts, current_month
+
+TOLERANCE = 0.005
+
+def month_key(value) -> str:
+    return value.strftime("%Y-%m")
+
+def _mark_history_changed(db: Session, rows):
+    """Remember users whose closed months this transaction changes; see _invalidate_history."""
+    month = current_month()
+    user_ids = {values["user_id"] for values in rows if values["month"] < month}
+    if user_ids:
+        db.info.setdefault("history_changed", set()).update(user_ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_history(session):
+    # Bumped only once the write is visible, so a concurrent reader cannot
+    # cache the old history under the new version.
+    for user_id in session.info.pop("history_changed", ()):
+        invalidate_history(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_history_changes(session):
+    session.info.pop("history_changed", None)
+
+def _upsert_increments(db: Session, model, key_columns, rows):
+    """Atomically add total/count to the rollup rows identified by the key columns of each dict in `rows`.
+
+    MySQL and SQLite run a single executemany upsert, so the statement is
+    compiled once however many rows there are.
+    """
+    if not rows:
+        return
+    _mark_history_changed(db, rows)
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(model)
+        db.execute(stmt.on_duplicate_key_update(total=model.total + stmt.inserted.total, count=model.count + stmt.inserted.count), rows)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(model)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={"total": model.total + stmt.excluded.total, "count": model.count + stmt.excluded.count},
+        ), rows)
+    else:
+        for values in rows:
+            row = db.get(model, tuple(values[column] for column in key_columns), with_for_update=True)
+            if row is None:
+                db.add(model(**values))
+            else:
+                row.total += values["total"]
+                row.count += values["count"]
+        db.flush()
+
+    emptied_users = {values["user_id"] for values in rows if values["count"] < 0}
+    if emptied_users:
+        db.execute(delete(model).where(model.user_id.in_(emptied_users), model.count <= 0))
+
+def _upsert_increment(db: Session, model, key: dict, amount: float, count: int):
+    """Atomically add (amount, count) to the rollup row identified by `key`."""
+    _upsert_increments(db, model, list(key), [dict(key, total=amount, count=count)])
+
+def apply_expense_delta(db: Session, user_id: int, date, category: str, currency: str, amount: float, count: int):
+    key = {"user_id": user_id, "month": month_key(date), "category": category, "currency": currency}
+    _upsert_increment(db, ExpenseMonthlyRollup, key, amount, count)
+    evaluate_budget_alerts(db, [dict(key, total=amount)])
+
+def apply_income_delta(db: Session, user_id: int, income_date, currency: str, amount: float, count: int):
+    _upsert_increment(db, IncomeMonthlyRollup, {"user_id": user_id, "month": month_key(income_date), "currency": currency}, amount, count)
+
+def apply_expense_deltas(db: Session, user_id: int, deltas):
+    """Apply many (date, category, currency, amount, count) deltas with one upsert per rollup row."""
+    apply_user_expense_deltas(db, ((user_id, *delta) for delta in deltas))
+
+def apply_income_deltas(db: Session, user_id: int, deltas):
+    """Apply many (income_date, currency, amount, count) deltas with one upsert per rollup row."""
+    apply_user_income_deltas(db, ((user_id, *delta) for delta in deltas))
+
+def apply_user_expense_deltas(db: Session, deltas):
+    """apply_expense_deltas for (user_id, date, category, currency, amount, count) deltas spanning several users."""
+    totals = {}
+    for user_id, date, category, currency, amount, count in deltas:
+        key = (user_id, month_key(date), category, currency)
+        total, n = totals.get(key, (0.0, 0))
+        totals[key] = (total + amount, n + count)
+    rows = [
+        {"user_id": user_id, "month": month, "category": category, "currency": currency, "total": amount, "count": count}
+        for (user_id, month, category, currency), (amount, count) in totals.items()
+    ]
+    _upsert_increments(db, ExpenseMonthlyRollup, ("user_id", "month", "category", "currency"), rows)
+    evaluate_budget_alerts(db, rows)
+
+def apply_user_income_deltas(db: Session, deltas):
+    """apply_income_deltas for (user_id, income_date, currency, amount, count) deltas spanning several users."""
+    totals = {}
+    for user_id, income_date, currency, amount, count in deltas:
+        key = (user_id, month_key(income_date), currency)
+        total, n = totals.get(key, (0.0, 0))
+        totals[key] = (total + amount, n + count)
+    _upsert_increments(db, IncomeMonthlyRollup, ("user_id", "month", "currency"), [
+        {"user_id": user_id, "month": month, "currency": currency, "total": amount, "count": count}
+        for (user_id, month, currency), (amount, count) in totals.items()
+    ])
+
+def _expense_source_totals(db: Session, user_id: int = None):
+    year = extract("year", Expense.date)
+    month = extract("month", Expense.date)
+    query = select(Expense.user_id, year, month, Expense.category, Expense.currency, func.sum(Expense.amount), func.count(Expense.id))
+    if user_id is not None:
+        query = query.where(Expense.user_id == user_id)
+    rows = db.execute(query.group_by(Expense.user_id, year, month, Expense.category, Expense.currency)).all()
+    return {
+        (uid, f"{int(y):04d}-{int(m):02d}", category, currency): (total, count)
+        for uid, y, m, category, currency, total, count in rows
+    }
+
+def _income_source_totals(db: Session, user_id: int = None):
+    year = extract("year", Income.income_date)
+    month = extract("month", Income.income_date)
+    query = select(Income.user_id, year, month, Income.currency, func.sum(Income.amount), func.count(Income.id))
+    if user_id is not None:
+        query = query.where(Income.user_id == user_id)
+    rows = db.execute(query.group_by(Income.user_id, year, month, Income.currency)).all()
+    return {
+        (uid, f"{int(y):04d}-{int(m):02d}", currency): (total, count)
+        for uid, y, m, currency, total, count in rows
+    }
+
+def rebuild_rollups(db: Session, user_id: int = None):
+    """Recompute the rollup tables from the expense and income rows.
+
+    Limited to one user when user_id is given. Returns the number of rollup
+    rows written. The caller is responsible for committing.
+    """
+    expense_totals = _expense_source_totals(db, user_id)
+    income_totals = _income_source_totals(db, user_id)
+
+    for model in (ExpenseMonthlyRollup, IncomeMonthlyRollup):
+        stmt = delete(model)
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        db.execute(stmt)
+
+    expense_rows = [
+        {"user_id": uid, "month": month, "category": category, "currency": currency, "total": total, "count": count}
+        for (uid, month, category, currency), (total, count) in expense_totals.items()
+    ]
+    income_rows = [
+        {"user_id": uid, "month": month, "currency": currency, "total": total, "count": count}
+        for (uid, month, currency), (total, count) in income_totals.items()
+    ]
+    if expense_rows:
+        db.execute(insert(ExpenseMonthlyRollup), expense_rows)
+    if income_rows:
+        db.execute(insert(IncomeMonthlyRollup), income_rows)
+    _mark_history_changed(db, expense_rows + income_rows)
+    return len(expense_rows) + len(income_rows)
+
+def check_rollups(db: Session, user_id: int = None):
+    """Compare the rollup tables with the source rows.
+
+    Returns a list of mismatch dicts; an empty list means the rollups are
+    consistent.
+    """
+    mismatches = []
+
+    def compare(kind, expected, actual):
+        for key in sorted(set(expected) | set(actual), key=str):
+            exp_total, exp_count = expected.get(key, (0.0, 0))
+            act_total, act_count = actual.get(key, (0.0, 0))
+            if exp_count != act_count or abs(exp_total - act_total) > TOLERANCE:
+                mismatches.append({
+                    "kind": kind,
+                    "key": key,
+                    "expected": {"total": exp_total, "count": exp_count},
+                    "actual": {"total": act_total, "count": act_count},
+                })
+
+    query = select(ExpenseMonthlyRollup)
+    if user_id is not None:
+        query = query.where(ExpenseMonthlyRollup.user_id == user_id)
+    actual = {(r.user_id, r.month, r.category, r.currency): (r.total, r.count) for r in db.scalars(query)}
+    compare("expense", _expense_source_totals(db, user_id), actual)
+
+    query = select(IncomeMonthlyRollup)
+    if user_id is not None:
+        query = query.where(IncomeMonthlyRollup.user_id == user_id)
+    actual = {(r.user_id, r.month, r.currency): (r.total, r.count) for r in db.scalars(query)}
+    compare("income", _income_source_totals(db, user_id), actual)
+
+    return mismatches
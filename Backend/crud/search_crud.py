@@ -0,0 +1,114 @@
+import re
+from sqlalchemy.orm import Session
+from sqlalchemy import text, select, literal, union_all, and_, or_, Integer, String, Float, Text, DateTime
+from models import Expense, Income
+from models.types import Money
+from core.config import SEARCH_MAX_RESULTS
+from .pagination import encode_cursor, decode_cursor, InvalidCursor
+
+MAX_SEARCH_TERMS = 8
+# InnoDB ignores shorter tokens (innodb_ft_min_token_size), so they cannot be required.
+MYSQL_MIN_TOKEN_SIZE = 3
+
+_RESULT_COLUMNS = {"kind": String, "id": Integer, "date": DateTime, "label": String, "amount": Money, "currency": String,
+                   "description": Text, "score": Float}
+
+def contains_pattern(text: str) -> str:
+    """LIKE pattern matching `text` anywhere, with its own % and _ taken literally (use escape="\\")."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def search_terms(q: str):
+    """Lowercased words of the query; every term must match, each as a prefix."""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+def _interleaved(expense_matches: str, income_matches: str) -> str:
+    """One statement over both match queries, numbered best-first within each table and merged by that number.
+
+    bm25() and MATCH ... AGAINST scores depend on each table's statistics, so
+    they are never compared across the two.
+    """
+    return (
+        "SELECT kind, id, date, label, amount, currency, description, score FROM ("
+        f"SELECT *, ROW_NUMBER() OVER (ORDER BY score DESC, id) AS kind_rank FROM ({expense_matches}) AS expense_matches "
+        "UNION ALL "
+        f"SELECT *, ROW_NUMBER() OVER (ORDER BY score DESC, id) AS kind_rank FROM ({income_matches}) AS income_matches"
+        ") AS ranked ORDER BY kind_rank, kind, id LIMIT :limit OFFSET :offset"
+    )
+
+def _sqlite_search(db: Session, user_id: int, terms, limit: int, offset: int):
+    # FTS5 query: the user_id token pins the user, then every term as a
+    # prefix in the text columns. Terms are \w+ only, so quoting is safe.
+    prefixes = " ".join(f'"{term}"*' for term in terms)
+    statement = text(_interleaved(
+        "SELECT 'expense' AS kind, e.id AS id, e.date AS date, e.category AS label, e.amount AS amount, "
+        "e.currency AS currency, e.description AS description, -bm25(expenses_fts, 2.0, 1.0, 0.0) AS score "
+        "FROM expenses_fts JOIN expenses e ON e.id = expenses_fts.rowid WHERE expenses_fts MATCH :expense_query",
+        "SELECT 'income' AS kind, i.id AS id, i.income_date AS date, i.source AS label, i.amount AS amount, "
+        "i.currency AS currency, i.description AS description, -bm25(incomes_fts, 2.0, 1.0, 0.0) AS score "
+        "FROM incomes_fts JOIN incomes i ON i.id = incomes_fts.rowid WHERE incomes_fts MATCH :income_query",
+    )).columns(**_RESULT_COLUMNS)
+    return db.execute(statement, {
+        "expense_query": f'{{user_id}} : "{user_id}" AND {{category description}} : ({prefixes})',
+        "income_query": f'{{user_id}} : "{user_id}" AND {{source description}} : ({prefixes})',
+        "limit": limit, "offset": offset,
+    }).all()
+
+def _mysql_search(db: Session, user_id: int, terms, limit: int, offset: int):
+    terms = [term for term in terms if len(term) >= MYSQL_MIN_TOKEN_SIZE]
+    if not terms:
+        return []
+    # user_id is in the WHERE of each FULLTEXT query itself, not applied after the union.
+    statement = text(_interleaved(
+        "SELECT 'expense' AS kind, id, date, category AS label, amount, currency, description, "
+        "MATCH(category, description) AGAINST (:query IN BOOLEAN MODE) AS score "
+        "FROM expenses WHERE user_id = :user_id AND MATCH(category, description) AGAINST (:query IN BOOLEAN MODE)",
+        "SELECT 'income' AS kind, id, income_date AS date, source AS label, amount, currency, description, "
+        "MATCH(source, description) AGAINST (:query IN BOOLEAN MODE) AS score "
+        "FROM incomes WHERE user_id = :user_id AND MATCH(source, description) AGAINST (:query IN BOOLEAN MODE)",
+    )).columns(**_RESULT_COLUMNS)
+    return db.execute(statement, {
+        "query": " ".join(f"+{term}*" for term in terms), "user_id": user_id, "limit": limit, "offset": offset,
+    }).all()
+
+def _like_search(db: Session, user_id: int, terms, limit: int, offset: int):
+    """Unindexed fallback for other databases: every term as a substring, newest first."""
+    def matches(*columns):
+        return and_(*(or_(*(column.ilike(contains_pattern(term), escape="\\") for column in columns)) for term in terms))
+
+    expenses = select(literal("expense").label("kind"), Expense.id.label("id"), Expense.date.label("date"),
+                      Expense.category.label("label"), Expense.amount.label("amount"), Expense.currency.label("currency"),
+                      Expense.description.label("description"), literal(0.0).label("score")
+                      ).where(Expense.user_id == user_id, matches(Expense.category, Expense.description))
+    incomes = select(literal("income"), Income.id, Income.income_date, Income.source, Income.amount, Income.currency,
+                     Income.description, literal(0.0)
+                     ).where(Income.user_id == user_id, matches(Income.source, Income.description))
+    combined = union_all(expenses, incomes).subquery()
+    return db.execute(
+        select(combined).order_by(combined.c.date.desc(), combined.c.kind, combined.c.id).limit(limit).offset(offset)
+    ).all()
+
+_BACKENDS = {"sqlite": _sqlite_search, "mysql": _mysql_search}
+
+def search_records(db: Session, user_id: int, q: str, limit: int, cursor: str = None):
+    """(rows, next_cursor) of the user's matching expenses and incomes, the best of each kind alternating.
+
+    Rows are (kind, id, date, label, amount, currency, description, score); label is the category or source.
+    """
+    offset = 0
+    if cursor:
+        kind, offset = decode_cursor(cursor)
+        if kind != "search" or not 0 <= offset < SEARCH_MAX_RESULTS:
+            raise InvalidCursor("Invalid cursor")
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+    limit = min(limit, SEARCH_MAX_RESULTS - offset)
+    search = _BACKENDS.get(db.get_bind().dialect.name, _like_search)
+    rows = search(db, user_id, terms, limit + 1, offset)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if offset + limit < SEARCH_MAX_RESULTS:
+            next_cursor = encode_cursor("search", offset + limit)
+    return rows, next_cursor
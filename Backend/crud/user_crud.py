@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
 from models import User
+from core.cache import invalidate_current_user
+from .outbox_crud import add_email
 
 def create_user(db: Session, fullname: str, email: str, gender: str, mobilenumber: str, password: str):
     new_user = User(
@@ -14,6 +16,9 @@ def create_user(db: Session, fullname: str, email: str, gender: str, mobilenumbe
     db.refresh(new_user)
     return new_user
 
+def get_user_by_id(db: Session, user_id: int):
+    return db.get(User, user_id)
+
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
@@ -22,9 +27,12 @@ def get_user_by_email_or_mobile(db: Session, email: str, mobile: str):
         (User.email == email) | (User.mobilenumber == mobile)
     ).first()
 
-def update_user_reset_token(db: Session, user: User, reset_token: str, expires):
+def update_user_reset_token(db: Session, user: User, reset_token: str, expires, email=None):
+    """Store the reset token or OTP; `email` is an optional (subject, body) queued in the same commit."""
     user.reset_token = reset_token
     user.reset_token_expires = expires
+    if email:
+        add_email(db, user.email, *email)
     db.commit()
 
 def update_user_password(db: Session, user: User, new_password: str):
@@ -32,3 +40,9 @@ def update_user_password(db: Session, user: User, new_password: str):
     user.reset_token = None
     user.reset_token_expires = None
     db.commit()
+    invalidate_current_user(user.id, user.email)
+
+def update_user_password_hash(db: Session, user_id: int, password_hash: str):
+    """Replace the stored hash (e.g. after a bcrypt cost change) without touching reset tokens."""
+    db.query(User).filter(User.id == user_id).update({User.password: password_hash})
+    db.commit()
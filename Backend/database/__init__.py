@@ -1 +1,17 @@
-from .connection import engine, Base, SessionLocal, get_db
+from .connection import engine, Base, SessionLocal, get_db, make_engine
+from .async_connection import async_engine, AsyncSessionLocal, get_async_db, make_async_engine
+from .pool import pool_stats
+from .replicas import replicas, ReplicaSet, current_user_id, pin_writers
+
+
+def bind_sessions(sync_engine, async_engine):
+    """Point SessionLocal and AsyncSessionLocal (and so get_db/get_async_db) at other engines."""
+    SessionLocal.configure(bind=sync_engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+
+
+def reset_after_fork():
+    """Drop the pools a forked process inherited, without closing their connections (the parent's)."""
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    replicas.reset_after_fork()
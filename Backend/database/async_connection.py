@@ -0,0 +1,32 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from core.config import DATABASE_URL, ASYNC_DATABASE_URL
+from .pool import engine_options
+
+ASYNC_DRIVERS = {
+    "mysql": "mysql+asyncmy",
+    "mysql+pymysql": "mysql+asyncmy",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the blocking DBAPI driver in a sync URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+def make_async_engine(database_url: str, async_database_url: str = None):
+    """Async engine for `async_database_url`, or for `database_url` with its driver swapped."""
+    url = async_database_url or to_async_url(database_url)
+    return create_async_engine(url, **engine_options(url, is_async=True))
+
+async_engine = make_async_engine(DATABASE_URL, ASYNC_DATABASE_URL)
+
+# expire_on_commit=False: attributes must stay readable after commit without
+# an implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,17 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import DATABASE_URL
+from .pool import engine_options
 
-engine = create_engine(DATABASE_URL)
+def make_engine(url: str):
+    return create_engine(url, **engine_options(url))
+
+# Creating an engine does not connect; the first checkout does.
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
-Base.metadata.create_all(bind=engine)
-
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,132 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_ISOLATION_LEVEL
+
+
+class PoolMetrics:
+    """Counters for connection checkouts from one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.overflow_events = 0
+
+    def record_checkout(self, seconds: float, waited: bool, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self, seconds: float):
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_ms": self.checkout_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_checkout_ms": self.max_checkout_seconds * 1000,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times QueuePool checkouts.
+
+    A checkout counts as a wait when every pooled and overflow connection was
+    already in use, so the caller blocked for up to the pool timeout.
+    """
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        if "_metrics" not in self.__dict__:
+            self._metrics = PoolMetrics()
+        return self._metrics
+
+    def _do_get(self):
+        exhausted = self._pool.empty() and 0 <= self._max_overflow <= self._overflow
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, exhausted, self._overflow > max(overflow_before, 0))
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting across it.
+        pool = super().recreate()
+        pool._metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict:
+        return dict(
+            self.metrics.snapshot(),
+            pool_size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_out=self.checkedout(),
+            overflow=max(self.overflow(), 0),
+            idle=self.checkedin(),
+        )
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine() keyword arguments from the DB_* settings.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool, since
+    each new connection would see an empty database.
+    """
+    options = {}
+    if DB_ISOLATION_LEVEL:
+        options["isolation_level"] = DB_ISOLATION_LEVEL
+    if _is_memory_sqlite(make_url(url)):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedPoolMixin):
+        return pool.stats()
+    return {"pool": type(pool).__name__}
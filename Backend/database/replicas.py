@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from core.cache import pin_to_primary, is_pinned_to_primary
+from core.config import DATABASE_REPLICA_URLS, REPLICA_MAX_LAG_SECONDS, REPLICA_CHECK_SECONDS, HEALTH_DB_TIMEOUT_SECONDS
+from .async_connection import AsyncSessionLocal, make_async_engine
+from .pool import pool_stats
+
+# The authenticated user of the request being handled (set by get_current_user),
+# so a commit on the primary can pin that user to it.
+current_user_id = ContextVar("current_user_id", default=None)
+
+# Replication status statement and lag column, by MySQL version (8.0.22+ first).
+LAG_QUERIES = (("SHOW REPLICA STATUS", "Seconds_Behind_Source"), ("SHOW SLAVE STATUS", "Seconds_Behind_Master"))
+
+
+def pin_writers(engine):
+    """Pin the current request's user to the primary whenever `engine` commits.
+
+    Read-only handlers never commit on the primary, so a commit means the
+    request wrote something; for REPLICA_PIN_SECONDS that user's reads go to
+    the primary, which already has the write. Returns the listener.
+    """
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        user_id = current_user_id.get()
+        if user_id is not None:
+            pin_to_primary(user_id)
+
+    return _commit
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = make_async_engine(url)
+        self.sessionmaker = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        self.error = None
+        self.lag_seconds = None
+        self.latency_ms = None
+        self.checked_at = None
+        self.reads = 0
+
+    async def _probe(self):
+        """SELECT 1, then the replication lag where MySQL reports it (None when unknown)."""
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            if connection.dialect.name != "mysql":
+                return None
+            for statement, column in LAG_QUERIES:
+                try:
+                    row = (await connection.execute(text(statement))).mappings().first()
+                except exc.DBAPIError as e:
+                    # Older server syntax, or no REPLICATION CLIENT privilege: lag stays unknown.
+                    if e.connection_invalidated:
+                        raise
+                    continue
+                if row is None:
+                    return None
+                if row[column] is None:
+                    raise RuntimeError("Replication is not running")
+                return float(row[column])
+            return None
+
+    async def check(self, timeout: float, max_lag: float):
+        start = time.perf_counter()
+        try:
+            self.lag_seconds = await asyncio.wait_for(self._probe(), timeout)
+            if self.lag_seconds is not None and self.lag_seconds > max_lag:
+                raise RuntimeError(f"Replication lag {self.lag_seconds:g}s exceeds {max_lag:g}s")
+            self.healthy, self.error = True, None
+        except asyncio.TimeoutError:
+            self.healthy, self.error = False, f"No answer within {timeout:g}s"
+        except Exception as e:
+            self.healthy, self.error = False, str(e)
+        self.latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.checked_at = time.time()
+
+    def stats(self) -> dict:
+        return {
+            "url": self.name,
+            "healthy": self.healthy,
+            "error": self.error,
+            "lag_seconds": self.lag_seconds,
+            "check_latency_ms": self.latency_ms,
+            "checked_at": self.checked_at,
+            "reads": self.reads,
+            "pool": pool_stats(self.engine.sync_engine),
+        }
+
+
+class ReplicaSet:
+    """Sends read-only sessions to healthy replicas in turn; pinned users (see pin_writers) read from the primary.
+
+    Replicas count as healthy until the first check after start().
+    """
+
+    def __init__(self, urls=DATABASE_REPLICA_URLS, primary_sessionmaker=AsyncSessionLocal,
+                 check_seconds: float = REPLICA_CHECK_SECONDS, max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 timeout: float = HEALTH_DB_TIMEOUT_SECONDS):
+        self.replicas = [Replica(url) for url in urls]
+        self.primary_sessionmaker = primary_sessionmaker
+        self.check_seconds = check_seconds
+        self.max_lag = max_lag
+        self.timeout = timeout
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._task = None
+        self.primary_reads = {"pinned": 0, "no_healthy_replica": 0}
+
+    def sessionmaker_for(self, user_id: int = None):
+        """Session factory a read-only request by `user_id` should use."""
+        if not self.replicas:
+            return self.primary_sessionmaker
+        if user_id is not None and is_pinned_to_primary(user_id):
+            reason = "pinned"
+        else:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if healthy:
+                replica = healthy[next(self._turn) % len(healthy)]
+                with self._lock:
+                    replica.reads += 1
+                return replica.sessionmaker
+            reason = "no_healthy_replica"
+        with self._lock:
+            self.primary_reads[reason] += 1
+        return self.primary_sessionmaker
+
+    async def check(self):
+        await asyncio.gather(*(replica.check(self.timeout, self.max_lag) for replica in self.replicas))
+
+    async def _check_forever(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_seconds)
+
+    def start(self):
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._check_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def reset_after_fork(self):
+        for replica in self.replicas:
+            replica.engine.sync_engine.dispose(close=False)
+
+    def stats(self) -> dict:
+        return {"replicas": [replica.stats() for replica in self.replicas], "primary_reads": dict(self.primary_reads)}
+
+
+replicas = ReplicaSet()
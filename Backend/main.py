@@ -1,27 +1,147 @@
-from fastapi import FastAPI
-from database import engine
-from models import Base
+import asyncio
+import gc
+import time
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy import event, text
+from sqlalchemy.orm import configure_mappers
+from database import engine, async_engine, pool_stats, make_engine, make_async_engine, bind_sessions, Base, replicas, ReplicaSet, pin_writers
 from api.auth import router as auth_router
 from api.dashboard import router as dashboard_router
 from api.income import router as income_router
 from api.expense import router as expense_router
+from api.recurring import router as recurring_router
+from api.budget import router as budget_router
+from api.search import router as search_router
+from api.analytics import router as analytics_router
 from middleware.cors import add_cors_middleware
+from middleware.metrics import add_metrics_middleware
+from core.cache import cache
+from core.config import HEALTH_DB_TIMEOUT_SECONDS, Settings
+from core.metrics import metrics, instrument_engine, remove_instrumentation
+from core.security import password_hash_pool
+from core.rate_limit import rate_limiter
 
-Base.metadata.create_all(bind=engine)
+system_router = APIRouter()
+metrics_router = APIRouter()
 
-app = FastAPI(title="Expense Tracker API", version="1.0.0")
+@system_router.get("/api/health")
+async def health_check():
+    return {"status": "healthy", "message": "Expense Tracker API is running"}
 
-add_cors_middleware(app)
+@system_router.get("/api/health/ready")
+async def readiness_check(request: Request):
+    """Ready when a connection can be checked out and answers SELECT 1 within HEALTH_DB_TIMEOUT_SECONDS.
 
-app.include_router(auth_router, prefix="/auth", tags=["auth"])
-app.include_router(dashboard_router)
-app.include_router(income_router)
-app.include_router(expense_router)
+    The pool state is reported either way; an exhausted pool shows up here as
+    a timed-out check.
+    """
+    connectable = request.app.state.async_engine
+    start = time.perf_counter()
+    error = None
+    try:
+        async def ping():
+            async with connectable.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        await asyncio.wait_for(ping(), HEALTH_DB_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        error = f"Database did not answer within {HEALTH_DB_TIMEOUT_SECONDS:g}s"
+    except Exception as e:
+        error = f"Database unavailable: {str(e)}"
+    data = {
+        "database": {"ok": error is None, "latency_ms": round((time.perf_counter() - start) * 1000, 2)},
+        "pool": pool_stats(connectable.sync_engine),
+    }
+    if error:
+        data["database"]["error"] = error
+        return ORJSONResponse(status_code=503, content={"status": "error", "message": "Not ready", "data": data})
+    return {"status": "ready", "message": "Expense Tracker API is ready", "data": data}
 
-@app.get("/api/health")
-async def health_check():
-    return {"status": "healthy", "message": "Expense Tracker API is running"}
+@metrics_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    state = request.app.state
+    pools = {"sync": pool_stats(state.engine), "async": pool_stats(state.async_engine.sync_engine)}
+    text = metrics.render(pools, cache=cache.stats(), password_hashing=password_hash_pool.stats(),
+                          rate_limit=rate_limiter.stats(), replicas=state.replicas.stats())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+def create_app(settings: Settings = None) -> FastAPI:
+    """Build the API. Nothing here touches the database; engines are set up by the lifespan.
+
+    Serve it with `uvicorn main:app`, or `uvicorn --factory main:create_app`
+    for a fresh app per process.
+    """
+    settings = settings or Settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        own_engines = settings.database_url is not None
+        if own_engines:
+            app.state.engine = make_engine(settings.database_url)
+            app.state.async_engine = make_async_engine(settings.database_url, settings.async_database_url)
+            bind_sessions(app.state.engine, app.state.async_engine)
+        own_replicas = settings.replica_urls is not None
+        if own_replicas:
+            app.state.replicas = ReplicaSet(settings.replica_urls)
+        engines = (app.state.engine, app.state.async_engine.sync_engine)
+        listeners = [(target, instrument_engine(target)) for target in engines] if settings.metrics_enabled else []
+        # Reads go to replicas only with a commit on the primary pinning its user there.
+        pins = [(target, pin_writers(target)) for target in engines] if app.state.replicas.replicas else []
+        app.state.replicas.start()
+        try:
+            # Otherwise the first query of the first request pays for it (tens of ms).
+            configure_mappers()
+            if settings.create_schema:
+                async with app.state.async_engine.begin() as connection:
+                    await connection.run_sync(Base.metadata.create_all)
+            # Everything imported and built so far lives as long as the process. Frozen,
+            # it is left out of full collections, the first of which would otherwise
+            # land on an early request and walk all of it (~50 ms).
+            gc.freeze()
+            yield
+        finally:
+            for target, functions in listeners:
+                remove_instrumentation(target, functions)
+            for target, function in pins:
+                event.remove(target, "commit", function)
+            await app.state.replicas.stop()
+            if own_replicas:
+                app.state.replicas = replicas
+            password_hash_pool.shutdown()
+            await app.state.async_engine.dispose()
+            if own_engines:
+                app.state.engine.dispose()
+                bind_sessions(engine, async_engine)
+
+    app = FastAPI(title="Expense Tracker API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+    app.state.settings = settings
+    # Until the lifespan runs (or when it never does, e.g. under httpx's ASGITransport) the process-wide engines serve.
+    app.state.engine = engine
+    app.state.async_engine = async_engine
+    app.state.replicas = replicas
+
+    add_cors_middleware(app)
+    if settings.metrics_enabled:
+        # Added last so it is the outermost middleware and times everything else.
+        add_metrics_middleware(app)
+
+    app.include_router(auth_router, prefix="/auth", tags=["auth"])
+    app.include_router(dashboard_router)
+    app.include_router(income_router)
+    app.include_router(expense_router)
+    app.include_router(recurring_router)
+    app.include_router(budget_router)
+    app.include_router(search_router)
+    app.include_router(analytics_router)
+    app.include_router(system_router)
+    if settings.metrics_enabled:
+        app.include_router(metrics_router)
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
+    # Development server; production runs `python manage.py serve`.
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000, reload=True)
+    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,200 @@
+"""Maintenance commands for the Expense Tracker backend.
+
+Run from the Backend directory:
+
+    python manage.py rollups rebuild [--user-id ID]
+    python manage.py rollups check [--user-id ID]
+    python manage.py email worker [--once]
+    python manage.py email stats
+    python manage.py recurring run [--date YYYY-MM-DD] [--user-id ID]
+    python manage.py fx load [--file PATH]
+    python manage.py fx list
+    python manage.py serve [--workers N] [--host HOST] [--port PORT]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+from database import SessionLocal
+from crud.rollup_crud import rebuild_rollups, check_rollups
+from crud.outbox_crud import get_outbox_stats
+from crud.recurring_crud import materialize_due
+from crud.fx_crud import read_rates_file, load_rates, get_rates
+from core.config import (
+    BASE_CURRENCY, FX_RATES_FILE, CACHE_BACKEND, SMTP_SERVER, SERVER_HOST, SERVER_PORT, SERVER_WORKERS,
+    SERVER_BACKLOG, SERVER_KEEP_ALIVE_SECONDS, SERVER_GRACEFUL_TIMEOUT_SECONDS,
+)
+from core.email_worker import EmailWorker
+
+
+def rollups_rebuild(args):
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, args.user_id)
+        db.commit()
+        print(f"[INFO] Rebuilt rollups: {written} rows written")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return 0
+
+
+def rollups_check(args):
+    db = SessionLocal()
+    try:
+        mismatches = check_rollups(db, args.user_id)
+    finally:
+        db.close()
+    for mismatch in mismatches:
+        print(f"[ERROR] {mismatch['kind']} rollup {mismatch['key']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+    if mismatches:
+        print(f"[ERROR] {len(mismatches)} inconsistent rollup rows; run 'python manage.py rollups rebuild'")
+        return 1
+    print("[INFO] Rollups are consistent")
+    return 0
+
+
+def email_worker(args):
+    if not SMTP_SERVER:
+        print("[ERROR] SMTP_SERVER is not set; the email worker has nowhere to send mail")
+        return 1
+    worker = EmailWorker()
+    worker.install_signal_handlers()
+    print(f"[INFO] Email worker started (batch size {worker.batch_size})")
+    worker.run(until_empty=args.once)
+    print(f"[INFO] Email worker stopped: {worker.sent} sent, {worker.retried} retried, {worker.failed} failed")
+    return 0
+
+
+def email_stats(args):
+    db = SessionLocal()
+    try:
+        stats = get_outbox_stats(db)
+    finally:
+        db.close()
+    counts = ", ".join(f"{status} {count}" for status, count in stats["counts"].items())
+    print(f"[INFO] Email outbox: {counts}")
+    if stats["oldest_pending_seconds"] is not None:
+        print(f"[INFO] Oldest unsent email queued {stats['oldest_pending_seconds']:.0f}s ago")
+    return 0
+
+
+def recurring_run(args):
+    db = SessionLocal()
+    try:
+        stats = materialize_due(db, args.date, user_id=args.user_id)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"[INFO] Materialized {stats['expenses']} expenses and {stats['incomes']} incomes "
+          f"from {stats['rules']} due rules in {stats['batches']} batches")
+    if stats["skipped"]:
+        print(f"[ERROR] Skipped {stats['skipped']} rules whose occurrences were already written")
+    return 0
+
+
+def fx_load(args):
+    rates, errors = read_rates_file(args.file)
+    for error in errors:
+        print(f"[ERROR] {args.file} {error}")
+    if errors:
+        print("[ERROR] No rates loaded")
+        return 1
+    db = SessionLocal()
+    try:
+        loaded = load_rates(db, rates)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"[INFO] Loaded {loaded} exchange rates to {BASE_CURRENCY}")
+    if CACHE_BACKEND == "memory":
+        print("[INFO] The API caches totals in memory; restart it to use the new rates straight away")
+    return 0
+
+
+def fx_list(args):
+    db = SessionLocal()
+    try:
+        rates = get_rates(db)
+    finally:
+        db.close()
+    print(f"[INFO] Base currency {BASE_CURRENCY}, {len(rates)} exchange rates")
+    for currency, rate, updated_at in rates:
+        print(f"{currency} {rate:.8g} (updated {updated_at:%Y-%m-%d %H:%M})")
+    return 0
+
+
+def serve(args):
+    # Imported here so the other commands do not pay for loading the whole API.
+    from core.server import PreforkServer
+    from main import app
+    server = PreforkServer(app, host=args.host, port=args.port, workers=args.workers, backlog=args.backlog,
+                           keep_alive=args.keep_alive, graceful_timeout=args.graceful_timeout)
+    print(f"[INFO] Serving on {args.host}:{args.port} with {server.workers} workers (master pid {os.getpid()})")
+    status = server.run()
+    print(f"[INFO] Server stopped; {server.replaced} workers were replaced while it ran")
+    return status
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Expense Tracker maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rollups", help="monthly rollup tables used by the dashboard")
+    rollup_commands = rollups.add_subparsers(dest="action", required=True)
+    for name, handler, help_text in (
+        ("rebuild", rollups_rebuild, "recompute rollups from expense and income rows"),
+        ("check", rollups_check, "report rollup rows that disagree with the source rows"),
+    ):
+        command = rollup_commands.add_parser(name, help=help_text)
+        command.add_argument("--user-id", type=int, default=None, help="limit to one user")
+        command.set_defaults(handler=handler)
+
+    email = commands.add_parser("email", help="outbound email queue")
+    email_commands = email.add_subparsers(dest="action", required=True)
+    worker = email_commands.add_parser("worker", help="send queued emails until stopped")
+    worker.add_argument("--once", action="store_true", help="exit once nothing is due instead of polling")
+    worker.set_defaults(handler=email_worker)
+    email_commands.add_parser("stats", help="count queued, sent and failed emails").set_defaults(handler=email_stats)
+
+    recurring = commands.add_parser("recurring", help="recurring expense and income rules")
+    recurring_commands = recurring.add_subparsers(dest="action", required=True)
+    run = recurring_commands.add_parser("run", help="write every occurrence due up to today; safe to re-run, e.g. from cron")
+    run.add_argument("--date", type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(), default=None,
+                     help="materialize up to this date instead of today (UTC)")
+    run.add_argument("--user-id", type=int, default=None, help="limit to one user")
+    run.set_defaults(handler=recurring_run)
+
+    fx = commands.add_parser("fx", help=f"exchange rates to the base currency ({BASE_CURRENCY})")
+    fx_commands = fx.add_subparsers(dest="action", required=True)
+    load = fx_commands.add_parser("load", help="insert or update rates from a currency,rate CSV")
+    load.add_argument("--file", default=FX_RATES_FILE, help=f"CSV file to read (default {FX_RATES_FILE})")
+    load.set_defaults(handler=fx_load)
+    fx_commands.add_parser("list", help="show the loaded rates").set_defaults(handler=fx_list)
+
+    server = commands.add_parser("serve", help="run the API in forked uvicorn workers (production)")
+    server.add_argument("--host", default=SERVER_HOST)
+    server.add_argument("--port", type=int, default=SERVER_PORT)
+    server.add_argument("--workers", type=int, default=SERVER_WORKERS, help="0 for one per CPU core")
+    server.add_argument("--backlog", type=int, default=SERVER_BACKLOG, help="pending connections the socket queues")
+    server.add_argument("--keep-alive", type=int, default=SERVER_KEEP_ALIVE_SECONDS, help="seconds an idle connection stays open")
+    server.add_argument("--graceful-timeout", type=int, default=SERVER_GRACEFUL_TIMEOUT_SECONDS,
+                        help="seconds in-flight requests get to finish after SIGTERM")
+    server.set_defaults(handler=serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import time
+from core.metrics import RequestStats, current_request, metrics
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency, SQL statements, rows and response size per route template ("unmatched" for none).
+
+    Plain ASGI, so streaming responses pass straight through and the engine
+    listeners see this request's RequestStats.
+    """
+
+    def __init__(self, app, registry=None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.registry.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.registry.record_request(scope["method"], getattr(route, "path_format", UNMATCHED_ROUTE), status,
+                                         time.perf_counter() - start, stats, size)
+            current_request.reset(token)
+
+
+def add_metrics_middleware(app):
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,68 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Databases created by the old Base.metadata.create_all() call at startup
+already have these tables; they are left untouched so that such databases
+can simply be upgraded to head.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("fullname", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(100), nullable=False),
+            sa.Column("gender", sa.String(20), nullable=False),
+            sa.Column("mobilenumber", sa.String(15), nullable=False),
+            sa.Column("password", sa.String(200), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("reset_token", sa.String(200), nullable=True),
+            sa.Column("reset_token_expires", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_mobilenumber", "users", ["mobilenumber"], unique=True)
+
+    if "expenses" not in existing:
+        op.create_table(
+            "expenses",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("category", sa.String(50), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("date", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+    if "incomes" not in existing:
+        op.create_table(
+            "incomes",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("source", sa.String(100), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("income_date", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+
+def downgrade():
+    op.drop_table("incomes")
+    op.drop_table("expenses")
+    op.drop_table("users")
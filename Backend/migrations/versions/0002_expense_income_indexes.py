@@ -0,0 +1,31 @@
+"""composite indexes for per-user expense and income queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+Every list, filter and dashboard query is scoped to one user and ordered or
+range-filtered by date, so the indexes lead with user_id and end with the
+date column.
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_expenses_user_date", "expenses", ["user_id", "date"])
+    op.create_index("ix_expenses_user_category_date", "expenses", ["user_id", "category", "date"])
+    op.create_index("ix_incomes_user_income_date", "incomes", ["user_id", "income_date"])
+    op.create_index("ix_incomes_user_source_income_date", "incomes", ["user_id", "source", "income_date"])
+
+
+def downgrade():
+    op.drop_index("ix_incomes_user_source_income_date", table_name="incomes")
+    op.drop_index("ix_incomes_user_income_date", table_name="incomes")
+    op.drop_index("ix_expenses_user_category_date", table_name="expenses")
+    op.drop_index("ix_expenses_user_date", table_name="expenses")
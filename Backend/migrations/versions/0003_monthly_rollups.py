@@ -0,0 +1,59 @@
+"""monthly expense/income rollup tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+The tables are backfilled from the existing rows in the same migration.
+`python manage.py rollups rebuild` does the same thing from application code.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _month_expression(column):
+    if op.get_bind().dialect.name == "sqlite":
+        return f"strftime('%Y-%m', {column})"
+    return f"DATE_FORMAT({column}, '%Y-%m')"
+
+
+def upgrade():
+    op.create_table(
+        "expense_monthly_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("month", sa.String(7), primary_key=True),
+        sa.Column("category", sa.String(50), primary_key=True),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "income_monthly_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("month", sa.String(7), primary_key=True),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+    expense_month = _month_expression("date")
+    op.execute(
+        "INSERT INTO expense_monthly_rollups (user_id, month, category, total, count) "
+        f"SELECT user_id, {expense_month}, category, SUM(amount), COUNT(*) FROM expenses "
+        f"WHERE date IS NOT NULL GROUP BY user_id, {expense_month}, category"
+    )
+    income_month = _month_expression("income_date")
+    op.execute(
+        "INSERT INTO income_monthly_rollups (user_id, month, total, count) "
+        f"SELECT user_id, {income_month}, SUM(amount), COUNT(*) FROM incomes "
+        f"GROUP BY user_id, {income_month}"
+    )
+
+
+def downgrade():
+    op.drop_table("income_monthly_rollups")
+    op.drop_table("expense_monthly_rollups")
@@ -0,0 +1,63 @@
+"""recurring expense/income rules
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+Materialized rows point back at their rule, and a unique
+(recurring_rule_id, date) constraint makes each occurrence insert at most once.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "recurring_rules",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("kind", sa.String(10), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("category", sa.String(50), nullable=True),
+        sa.Column("source", sa.String(100), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("frequency", sa.String(10), nullable=False),
+        sa.Column("interval", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("occurrence_count", sa.Integer(), nullable=False),
+        sa.Column("next_run_date", sa.Date(), nullable=True),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_recurring_rules_due", "recurring_rules", ["active", "next_run_date"])
+    op.create_index("ix_recurring_rules_user", "recurring_rules", ["user_id"])
+
+    with op.batch_alter_table("expenses") as batch:
+        batch.add_column(sa.Column("recurring_rule_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_expenses_recurring_rule_id", "recurring_rules", ["recurring_rule_id"], ["id"], ondelete="SET NULL")
+        batch.create_unique_constraint("uq_expenses_recurring_rule_date", ["recurring_rule_id", "date"])
+    with op.batch_alter_table("incomes") as batch:
+        batch.add_column(sa.Column("recurring_rule_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_incomes_recurring_rule_id", "recurring_rules", ["recurring_rule_id"], ["id"], ondelete="SET NULL")
+        batch.create_unique_constraint("uq_incomes_recurring_rule_income_date", ["recurring_rule_id", "income_date"])
+
+
+def downgrade():
+    with op.batch_alter_table("incomes") as batch:
+        batch.drop_constraint("uq_incomes_recurring_rule_income_date", type_="unique")
+        batch.drop_constraint("fk_incomes_recurring_rule_id", type_="foreignkey")
+        batch.drop_column("recurring_rule_id")
+    with op.batch_alter_table("expenses") as batch:
+        batch.drop_constraint("uq_expenses_recurring_rule_date", type_="unique")
+        batch.drop_constraint("fk_expenses_recurring_rule_id", type_="foreignkey")
+        batch.drop_column("recurring_rule_id")
+    op.drop_index("ix_recurring_rules_user", table_name="recurring_rules")
+    op.drop_index("ix_recurring_rules_due", table_name="recurring_rules")
+    op.drop_table("recurring_rules")
@@ -0,0 +1,43 @@
+"""monthly category budgets and budget alerts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "budgets",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "category", name="uq_budgets_user_category"),
+    )
+    op.create_table(
+        "budget_alerts",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("month", sa.String(7), nullable=False),
+        sa.Column("threshold", sa.Integer(), nullable=False),
+        sa.Column("budget_amount", sa.Float(), nullable=False),
+        sa.Column("spent", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "category", "month", "threshold", name="uq_budget_alerts_user_category_month_threshold"),
+    )
+
+
+def downgrade():
+    op.drop_table("budget_alerts")
+    op.drop_table("budgets")
@@ -0,0 +1,64 @@
+"""full-text search index over expense and income text
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+MySQL gets FULLTEXT indexes on the text columns. SQLite gets FTS5
+external-content tables kept in sync by triggers, rebuilt from the existing
+rows here. The statements match models/search.py as of this revision.
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+FTS_COLUMNS = {
+    "expenses": ("category", "description"),
+    "incomes": ("source", "description"),
+}
+
+
+def _sqlite_statements(table, columns):
+    fts = f"{table}_fts"
+    indexed = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({indexed}, user_id, content='{table}', content_rowid='id', "
+        f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {indexed}, user_id ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table, columns in FTS_COLUMNS.items():
+            for statement in _sqlite_statements(table, columns):
+                op.execute(statement)
+    elif dialect == "mysql":
+        op.execute("ALTER TABLE expenses ADD FULLTEXT INDEX ft_expenses_category_description (category, description)")
+        op.execute("ALTER TABLE incomes ADD FULLTEXT INDEX ft_incomes_source_description (source, description)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table in FTS_COLUMNS:
+            for trigger in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+    elif dialect == "mysql":
+        op.execute("ALTER TABLE incomes DROP INDEX ft_incomes_source_description")
+        op.execute("ALTER TABLE expenses DROP INDEX ft_expenses_category_description")
@@ -0,0 +1,175 @@
+"""exact amounts with a currency code, and exchange rates
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+Every FLOAT amount becomes a BIGINT count of hundredths, rounded in Python
+exactly as models.types.Money rounds new values (the float's shortest repr,
+half-up to the cent: 0.29 stored as 0.28999999999999998 becomes 29, 1.005
+becomes 101). Expenses, incomes and
+recurring rules get a currency column; existing rows are taken to be in
+INR, the BASE_CURRENCY when this was written. A deployment that already
+ran with another base currency passes it explicitly:
+`alembic -x existing_currency=USD upgrade head`.
+The rollup tables gain currency in their primary key and are rebuilt from
+the converted rows. On SQLite the table rebuilds drop the full-text search
+triggers from 0007, so they are recreated (the index itself is untouched:
+row ids do not change).
+
+Downgrading keeps each amount's number but forgets its currency.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = {
+    "expenses": ("amount",),
+    "incomes": ("amount",),
+    "recurring_rules": ("amount",),
+    "budgets": ("amount",),
+    "budget_alerts": ("budget_amount", "spent"),
+}
+CURRENCY_TABLES = ("expenses", "incomes", "recurring_rules")
+EXISTING_CURRENCY = "INR"
+
+FTS_COLUMNS = {
+    "expenses": ("category", "description"),
+    "incomes": ("source", "description"),
+}
+
+
+def _fts_triggers(table, columns):
+    fts = f"{table}_fts"
+    indexed = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {indexed}, user_id ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+    ]
+
+
+def _restore_fts_triggers():
+    if op.get_bind().dialect.name == "sqlite":
+        for table, columns in FTS_COLUMNS.items():
+            for statement in _fts_triggers(table, columns):
+                op.execute(statement)
+
+
+def _existing_currency():
+    return context.get_x_argument(as_dictionary=True).get("existing_currency", EXISTING_CURRENCY)
+
+
+def _month_expression(column):
+    if op.get_bind().dialect.name == "sqlite":
+        return f"strftime('%Y-%m', {column})"
+    return f"DATE_FORMAT({column}, '%Y-%m')"
+
+
+def to_hundredths(value):
+    # Must match Money.process_bind_param.
+    return int(Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_hundredths(value):
+    return value / 100
+
+
+def _convert_columns(table, columns, new_type, convert, currency=None):
+    """Replace each column with a `new_type` copy holding convert(old value), row by row."""
+    with op.batch_alter_table(table) as batch_op:
+        for column in columns:
+            batch_op.add_column(sa.Column(f"{column}_new", new_type, nullable=True))
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f"SELECT id, {', '.join(columns)} FROM {table}")).all()
+    if rows:
+        bind.execute(
+            sa.text(f"UPDATE {table} SET " + ", ".join(f"{column}_new = :{column}" for column in columns) + " WHERE id = :id"),
+            [{"id": row[0], **{column: convert(value) for column, value in zip(columns, row[1:])}} for row in rows],
+        )
+    with op.batch_alter_table(table) as batch_op:
+        for column in columns:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f"{column}_new", new_column_name=column, existing_type=new_type, nullable=False)
+        if currency == "add":
+            batch_op.add_column(sa.Column("currency", sa.String(3), nullable=False, server_default=_existing_currency()))
+        elif currency == "drop":
+            batch_op.drop_column("currency")
+
+
+def _create_rollups(total_type, with_currency):
+    currency = [sa.Column("currency", sa.String(3), primary_key=True)] if with_currency else []
+    op.create_table(
+        "expense_monthly_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("month", sa.String(7), primary_key=True),
+        sa.Column("category", sa.String(50), primary_key=True),
+        *currency,
+        sa.Column("total", total_type, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    currency = [sa.Column("currency", sa.String(3), primary_key=True)] if with_currency else []
+    op.create_table(
+        "income_monthly_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("month", sa.String(7), primary_key=True),
+        *currency,
+        sa.Column("total", total_type, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+    currency = ", currency" if with_currency else ""
+    expense_month = _month_expression("date")
+    op.execute(
+        f"INSERT INTO expense_monthly_rollups (user_id, month, category{currency}, total, count) "
+        f"SELECT user_id, {expense_month}, category{currency}, SUM(amount), COUNT(*) FROM expenses "
+        f"WHERE date IS NOT NULL GROUP BY user_id, {expense_month}, category{currency}"
+    )
+    income_month = _month_expression("income_date")
+    op.execute(
+        f"INSERT INTO income_monthly_rollups (user_id, month{currency}, total, count) "
+        f"SELECT user_id, {income_month}{currency}, SUM(amount), COUNT(*) FROM incomes "
+        f"GROUP BY user_id, {income_month}{currency}"
+    )
+
+
+def upgrade():
+    op.create_table(
+        "fx_rates",
+        sa.Column("currency", sa.String(3), primary_key=True),
+        sa.Column("rate", sa.Numeric(18, 8), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    for table, columns in MONEY_COLUMNS.items():
+        _convert_columns(table, columns, sa.BigInteger(), to_hundredths,
+                         currency="add" if table in CURRENCY_TABLES else None)
+    _restore_fts_triggers()
+
+    op.drop_table("income_monthly_rollups")
+    op.drop_table("expense_monthly_rollups")
+    _create_rollups(sa.BigInteger(), with_currency=True)
+
+
+def downgrade():
+    op.drop_table("income_monthly_rollups")
+    op.drop_table("expense_monthly_rollups")
+
+    for table, columns in MONEY_COLUMNS.items():
+        _convert_columns(table, columns, sa.Float(), from_hundredths,
+                         currency="drop" if table in CURRENCY_TABLES else None)
+    _restore_fts_triggers()
+
+    _create_rollups(sa.Float(), with_currency=False)
+    op.drop_table("fx_rates")
@@ -0,0 +1,30 @@
+"""indexes for the amount and category/source list sorts
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+Paginated lists sorted by amount or by category/source order by (key, id);
+without an index in that order every page sorted the user's whole history.
+"""
+from alembic import op
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_expenses_user_amount_id", "expenses", ["user_id", "amount", "id"])
+    op.create_index("ix_expenses_user_category_id", "expenses", ["user_id", "category", "id"])
+    op.create_index("ix_incomes_user_amount_id", "incomes", ["user_id", "amount", "id"])
+    op.create_index("ix_incomes_user_source_id", "incomes", ["user_id", "source", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_incomes_user_source_id", table_name="incomes")
+    op.drop_index("ix_incomes_user_amount_id", table_name="incomes")
+    op.drop_index("ix_expenses_user_category_id", table_name="expenses")
+    op.drop_index("ix_expenses_user_amount_id", table_name="expenses")
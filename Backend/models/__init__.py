@@ -3,3 +3,9 @@ from database import Base
 from .user import User
 from .expense import Expense
 from .income import Income
+from .rollup import ExpenseMonthlyRollup, IncomeMonthlyRollup
+from .email_outbox import EmailOutbox
+from .recurring import RecurringRule
+from .budget import Budget, BudgetAlert
+from .fx import FxRate
+from .search import FTS_COLUMNS
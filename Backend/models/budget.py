@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+from database import Base
+from .types import Money
+
+
+class Budget(Base):
+    """A monthly spending limit for one of the user's expense categories.
+
+    Spending is read from ExpenseMonthlyRollup, which every expense write
+    already keeps current, so checking a budget never rescans expenses.
+    Amounts are in BASE_CURRENCY; spending in other currencies is converted.
+    """
+    __tablename__ = "budgets"
+    __table_args__ = (
+        UniqueConstraint("user_id", "category", name="uq_budgets_user_category"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category = Column(String(50), nullable=False)
+    amount = Column(Money, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Budget(id={self.id}, category={self.category}, amount={self.amount})>"
+
+
+class BudgetAlert(Base):
+    """Recorded the first time a month's spending in a category reaches a threshold (percent of the budget)."""
+    __tablename__ = "budget_alerts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "category", "month", "threshold", name="uq_budget_alerts_user_category_month_threshold"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category = Column(String(50), nullable=False)
+    month = Column(String(7), nullable=False)
+    threshold = Column(Integer, nullable=False)
+    budget_amount = Column(Money, nullable=False)
+    spent = Column(Money, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BudgetAlert(user_id={self.user_id}, category={self.category}, month={self.month}, threshold={self.threshold})>"
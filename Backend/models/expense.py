@@ -1,19 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
+from core.config import BASE_CURRENCY
+from .types import Money
 
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_date", "user_id", "date"),
+        Index("ix_expenses_user_category_date", "user_id", "category", "date"),
+        # Keyset pages sorted by amount or category read (sort key, id) in index order.
+        Index("ix_expenses_user_amount_id", "user_id", "amount", "id"),
+        Index("ix_expenses_user_category_id", "user_id", "category", "id"),
+        # At most one row per occurrence, so re-running the scheduler is harmless.
+        UniqueConstraint("recurring_rule_id", "date", name="uq_expenses_recurring_rule_date"),
+        # SQLite gets an FTS5 table instead; see models/search.py.
+        Index("ft_expenses_category_description", "category", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY)
     category = Column(String(50), nullable=False)
     description = Column(Text)
     date = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
+    recurring_rule_id = Column(Integer, ForeignKey("recurring_rules.id", ondelete="SET NULL"), nullable=True)
 
     user = relationship("User", back_populates="expenses")
 
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Numeric, DateTime
+from datetime import datetime
+from database import Base
+
+
+class FxRate(Base):
+    """How many units of BASE_CURRENCY one unit of `currency` is worth.
+
+    Loaded from a CSV file with `python manage.py fx load`. Rows are only ever
+    added or updated, so every stored amount keeps a rate to convert with.
+    BASE_CURRENCY itself needs no row.
+    """
+    __tablename__ = "fx_rates"
+
+    currency = Column(String(3), primary_key=True)
+    rate = Column(Numeric(18, 8, asdecimal=False), nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<FxRate(currency={self.currency}, rate={self.rate})>"
@@ -1,19 +1,32 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
+from core.config import BASE_CURRENCY
+from .types import Money
 
 
 class Income(Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        Index("ix_incomes_user_income_date", "user_id", "income_date"),
+        Index("ix_incomes_user_source_income_date", "user_id", "source", "income_date"),
+        # Keyset pages sorted by amount or source read (sort key, id) in index order.
+        Index("ix_incomes_user_amount_id", "user_id", "amount", "id"),
+        Index("ix_incomes_user_source_id", "user_id", "source", "id"),
+        UniqueConstraint("recurring_rule_id", "income_date", name="uq_incomes_recurring_rule_income_date"),
+        Index("ft_incomes_source_description", "source", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     source = Column(String(100), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY)
     description = Column(Text)
     income_date = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    recurring_rule_id = Column(Integer, ForeignKey("recurring_rules.id", ondelete="SET NULL"), nullable=True)
 
     user = relationship("User", back_populates="incomes")
 
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Boolean, ForeignKey, Index
+from datetime import datetime
+from database import Base
+from core.config import BASE_CURRENCY
+from .types import Money
+
+
+class RecurringRule(Base):
+    """A repeating expense or income; occurrence n falls n intervals after start_date, month ends clamped.
+
+    next_run_date is NULL once end_date has passed.
+    """
+    __tablename__ = "recurring_rules"
+    __table_args__ = (
+        Index("ix_recurring_rules_due", "active", "next_run_date"),
+        Index("ix_recurring_rules_user", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(10), nullable=False)  # "expense" or "income"
+    amount = Column(Money, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY)
+    category = Column(String(50), nullable=True)  # expense rules
+    source = Column(String(100), nullable=True)  # income rules
+    description = Column(Text)
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    occurrence_count = Column(Integer, nullable=False, default=0)
+    next_run_date = Column(Date, nullable=True)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RecurringRule(id={self.id}, kind={self.kind}, frequency={self.frequency}, next_run_date={self.next_run_date})>"
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from database import Base
+from .types import Money
+
+
+class ExpenseMonthlyRollup(Base):
+    """Running per-user totals of expenses by calendar month and category.
+
+    Maintained by crud/expense_crud.py in the same transaction as the expense
+    write, and rebuilt from scratch with `python manage.py rollups rebuild`.
+    Totals stay in each expense's own currency and are converted when read.
+    """
+    __tablename__ = "expense_monthly_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(String(7), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    total = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ExpenseMonthlyRollup(user_id={self.user_id}, month={self.month}, category={self.category}, currency={self.currency}, total={self.total})>"
+
+
+class IncomeMonthlyRollup(Base):
+    __tablename__ = "income_monthly_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(String(7), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    total = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<IncomeMonthlyRollup(user_id={self.user_id}, month={self.month}, currency={self.currency}, total={self.total})>"
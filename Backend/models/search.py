@@ -0,0 +1,43 @@
+"""Full-text indexes over expense and income text, used by crud/search_crud.py.
+
+On SQLite each table gets an FTS5 external-content table (<table>_fts) that
+triggers keep in sync with every INSERT, UPDATE and DELETE, including the
+Core bulk inserts used by imports and recurring rules. user_id is indexed
+as a token so a search never leaves the user's own documents. On MySQL the
+models declare FULLTEXT indexes instead. Both are created with the tables
+by metadata.create_all; migration 0007 adds them to existing databases.
+"""
+from sqlalchemy import event, DDL
+from .expense import Expense
+from .income import Income
+
+# Searchable text columns per table, in bm25 weight order.
+FTS_COLUMNS = {
+    "expenses": ("category", "description"),
+    "incomes": ("source", "description"),
+}
+
+
+def sqlite_fts_statements(table: str, columns) -> list:
+    fts = f"{table}_fts"
+    indexed = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({indexed}, user_id, content='{table}', content_rowid='id', "
+        f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {indexed}, user_id ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {indexed}, user_id) VALUES ('delete', old.id, {old_values}, old.user_id); "
+        f"INSERT INTO {fts}(rowid, {indexed}, user_id) VALUES (new.id, {new_values}, new.user_id); END",
+    ]
+
+
+for model in (Expense, Income):
+    table = model.__table__
+    for statement in sqlite_fts_statements(table.name, FTS_COLUMNS[table.name]):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {table.name}_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,3 @@
+from .expense import ExpenseOut, ExpenseListResponse
+from .income import IncomeOut, IncomeListResponse
+from .dashboard import RecentExpense, MonthlyTrend, DashboardData, DashboardResponse
@@ -0,0 +1,32 @@
+from datetime import date as Date
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class RecentExpense(BaseModel):
+    date: Date
+    category: str
+    amount: float
+    currency: str
+    description: str = ""
+
+
+class MonthlyTrend(BaseModel):
+    month: str
+    income: float
+    expense: float
+
+
+class DashboardData(BaseModel):
+    currency: str
+    total_spent: float
+    total_income: float
+    recent_expenses: List[RecentExpense]
+    category_breakdown: Dict[str, float]
+    monthly_trend: List[MonthlyTrend]
+    monthly_average: float
+
+
+class DashboardResponse(BaseModel):
+    status: str = "success"
+    data: DashboardData
@@ -0,0 +1,19 @@
+from datetime import date as Date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ExpenseOut(BaseModel):
+    id: int
+    amount: float
+    currency: str
+    category: str
+    description: str = ""
+    date: Optional[Date] = None
+
+
+class ExpenseListResponse(BaseModel):
+    status: str = "success"
+    data: List[ExpenseOut]
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
@@ -0,0 +1,19 @@
+from datetime import date as Date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class IncomeOut(BaseModel):
+    id: int
+    source: str
+    amount: float
+    currency: str
+    description: str = ""
+    income_date: Optional[Date] = None
+
+
+class IncomeListResponse(BaseModel):
+    status: str = "success"
+    data: List[IncomeOut]
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
@@ -0,0 +1,86 @@
+"""Shared setup for the test suite.
+
+    pip install -r requirements-dev.txt
+    python -m pytest            # from Backend/
+
+Tests run in-process against a throwaway SQLite file, rebuilt for each test;
+DATABASE_URL from the environment or .env is never used.
+"""
+import os
+import tempfile
+
+import pytest
+
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="expense-tracker-tests-"), "test.db")
+
+# Must be set before anything imports core.config.
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DB_PATH}",
+    "ASYNC_DATABASE_URL": "",
+    "DATABASE_REPLICA_URLS": "",
+    "SECRET_KEY": "test-secret",
+    "CACHE_BACKEND": "memory",
+    "RATE_LIMIT_BACKEND": "memory",
+    "RATE_LIMIT_ENABLED": "False",
+    "BCRYPT_ROUNDS": "4",
+    "BASE_CURRENCY": "INR",
+    "METRICS_ENABLED": "True",
+})
+
+from fastapi.testclient import TestClient
+
+from core.cache import cache, token_cache, user_cache
+from core.security import create_access_token
+from database import Base, SessionLocal, engine
+from models import User
+
+
+@pytest.fixture
+def db():
+    """A session on an empty schema (tables and SQLite FTS5 index), with empty caches."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    for store in (cache, token_cache, user_cache):
+        store.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def make_user(db, email: str = "user@example.com") -> int:
+    user = User(fullname="Test User", email=email, gender="other", mobilenumber=str(abs(hash(email)) % 10**10).zfill(10), password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def auth_headers(user_id: int, email: str = "user@example.com") -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': email, 'uid': user_id})}"}
+
+
+def metric_samples(client) -> dict:
+    """{series: value} of every sample GET /metrics exposes."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in response.text.splitlines() if line and not line.startswith("#")}
+
+
+@pytest.fixture
+def user_id(db):
+    return make_user(db)
+
+
+@pytest.fixture
+def headers(user_id):
+    return auth_headers(user_id)
+
+
+@pytest.fixture
+def client(db):
+    """A client for a fresh app, with its lifespan running; one event loop serves every request of the test."""
+    from main import create_app
+    with TestClient(create_app()) as test_client:
+        yield test_client
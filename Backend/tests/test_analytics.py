@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from core.cache import cache
+from crud.analytics_crud import get_trend_history
+from models import Expense, Income
+
+START, END, NOW = datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 6, 15)
+
+
+@pytest.fixture
+def history_rows(db, user_id):
+    db.add_all([
+        Expense(user_id=user_id, amount=100.0, category="a,b", date=datetime(2024, 1, 10)),
+        Expense(user_id=user_id, amount=10.0, category="a", date=datetime(2024, 1, 11)),
+        Expense(user_id=user_id, amount=1.0, category="b", date=datetime(2024, 1, 12)),
+        Income(user_id=user_id, amount=1000.0, source="a", income_date=datetime(2024, 1, 13)),
+    ])
+    db.commit()
+
+
+def uncached(db, user_id, categories, sources):
+    cache.clear()
+    result = get_trend_history(db, user_id, START, END, categories, sources, now=NOW)
+    cache.clear()
+    return result
+
+
+@pytest.mark.parametrize("first, second", [
+    ((["a,b"], None), (["a", "b"], None)),
+    ((["a"], None), (None, ["a"])),
+    ((None, ["a,b"]), (None, ["a", "b"])),
+])
+def test_history_cache_keeps_filters_apart(db, user_id, history_rows, first, second):
+    expected = [uncached(db, user_id, *filters) for filters in (first, second)]
+    assert expected[0] != expected[1]
+    for _ in range(2):
+        assert [get_trend_history(db, user_id, START, END, *filters, now=NOW) for filters in (first, second)] == expected
+    history_keys = [key for key in cache._entries if key.startswith("analytics:history:")]
+    assert len(history_keys) == 2
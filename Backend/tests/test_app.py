@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from conftest import auth_headers, make_user
+from core.config import Settings
+from database import SessionLocal
+from main import create_app
+from models import Expense
+
+
+def test_settings_are_kept_on_the_app():
+    settings = Settings(replica_urls=[], metrics_enabled=False)
+    app = create_app(settings)
+    assert app.state.settings is settings
+    assert create_app().state.settings == Settings()
+
+
+def test_app_with_its_own_database_leaves_the_default_one_alone(db, tmp_path):
+    app = create_app(Settings(database_url=f"sqlite:///{tmp_path / 'own.db'}", create_schema=True))
+    with TestClient(app) as client:
+        with SessionLocal() as own_db:
+            user_id = make_user(own_db)
+        response = client.post("/expense", headers=auth_headers(user_id),
+                               json={"amount": "9.99", "category": "Food", "date": "2024-01-01"})
+        assert response.status_code == 201
+        with SessionLocal() as own_db:
+            assert own_db.scalar(select(func.count()).select_from(Expense)) == 1
+    # Shutdown points the session factories back at the process-wide engines.
+    with SessionLocal() as default_db:
+        assert default_db.scalar(select(func.count()).select_from(Expense)) == 0
@@ -0,0 +1,58 @@
+from conftest import auth_headers, make_user
+
+
+def add(client, headers, amount, category="Food"):
+    response = client.post("/expense", headers=headers, json={"amount": str(amount), "category": category, "date": "2024-01-10"})
+    return response.json()["data"]["id"]
+
+
+def listed(client, headers):
+    return sorted((row["amount"], row["category"]) for row in client.get("/expense", headers=headers).json()["data"])
+
+
+def dashboard_total(client, headers):
+    return client.get("/dashboard", headers=headers).json()["data"]["total_spent"]
+
+
+def test_batch_applies_every_operation(client, headers):
+    add(client, headers, 1)
+    change, drop = add(client, headers, 2), add(client, headers, 3)
+    response = client.post("/expense/batch", headers=headers, json={"operations": [
+        {"op": "create", "data": {"amount": "40", "category": "Rent", "date": "2024-01-11"}},
+        {"op": "update", "id": change, "data": {"amount": "20"}},
+        {"op": "delete", "id": drop},
+    ]})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["data"]] == ["created", "updated", "deleted"]
+    assert listed(client, headers) == [(1.0, "Food"), (20.0, "Food"), (40.0, "Rent")]
+    assert dashboard_total(client, headers) == 61.0
+
+
+def test_one_invalid_operation_rejects_the_whole_batch(client, headers):
+    existing = add(client, headers, 5)
+    before = dashboard_total(client, headers)
+    response = client.post("/expense/batch", headers=headers, json={"operations": [
+        {"op": "create", "data": {"amount": "10", "category": "Food", "date": "2024-01-11"}},
+        {"op": "delete", "id": existing},
+        {"op": "create", "data": {"amount": "-1", "category": "Food", "date": "2024-01-11"}},
+    ]})
+    assert response.status_code == 400
+    assert [result["status"] for result in response.json()["data"]] == ["valid", "valid", "error"]
+    assert listed(client, headers) == [(5.0, "Food")]
+    assert dashboard_total(client, headers) == before
+
+
+def test_missing_record_rolls_back_operations_already_written(client, headers, db):
+    existing = add(client, headers, 5)
+    other_headers = auth_headers(make_user(db, "other@example.com"), "other@example.com")
+    foreign = add(client, other_headers, 7)
+    response = client.post("/expense/batch", headers=headers, json={"operations": [
+        {"op": "create", "data": {"amount": "10", "category": "Food", "date": "2024-01-11"}},
+        {"op": "update", "id": existing, "data": {"amount": "50"}},
+        {"op": "delete", "id": foreign},
+    ]})
+    assert response.status_code == 404
+    assert response.json()["data"][2]["errors"] == {"id": "Expense not found"}
+    assert listed(client, headers) == [(5.0, "Food")]
+    assert dashboard_total(client, headers) == 5.0
+    assert listed(client, other_headers) == [(7.0, "Food")]
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from crud.budget_crud import current_month
+from models import EmailOutbox
+
+
+def spend(client, headers, amount, day=None, category="Food"):
+    day = day or datetime.utcnow().strftime("%Y-%m-%d")
+    response = client.post("/expense", headers=headers, json={"amount": str(amount), "category": category, "date": day})
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["id"]
+
+
+def alerts(client, headers):
+    return [(alert["threshold"], alert["spent"]) for alert in client.get("/budgets/alerts", headers=headers).json()["data"]]
+
+
+def emails(db):
+    return db.scalar(select(func.count()).select_from(EmailOutbox))
+
+
+@pytest.fixture
+def budget(client, headers):
+    response = client.post("/budgets", headers=headers, json={"category": "Food", "amount": "100"})
+    assert response.status_code == 201, response.text
+
+
+def test_thresholds_fire_as_spending_crosses_them(client, headers, db, budget):
+    spend(client, headers, 79.99)
+    assert alerts(client, headers) == []
+    spend(client, headers, 0.01)
+    assert alerts(client, headers) == [(80, 80.0)]
+    spend(client, headers, 30)
+    assert sorted(alerts(client, headers)) == [(80, 80.0), (100, 110.0)]
+    assert emails(db) == 2
+
+
+def test_recrossing_a_threshold_does_not_alert_again(client, headers, db, budget):
+    expense_id = spend(client, headers, 85)
+    assert client.delete(f"/expense/{expense_id}", headers=headers).status_code == 200
+    spend(client, headers, 85)
+    assert alerts(client, headers) == [(80, 85.0)]
+    assert emails(db) == 1
+
+
+def test_one_write_across_both_thresholds_records_both(client, headers, db, budget):
+    spend(client, headers, 150)
+    assert sorted(alerts(client, headers)) == [(80, 150.0), (100, 150.0)]
+    assert emails(db) == 2
+
+
+def test_backdated_spending_never_alerts(client, headers, db, budget):
+    spend(client, headers, 500, day="2020-01-15")
+    assert alerts(client, headers) == []
+    assert emails(db) == 0
+    # It does not count towards this month either.
+    spend(client, headers, 50)
+    assert alerts(client, headers) == []
+
+
+def test_budget_created_over_a_threshold_alerts_at_once(client, headers, db):
+    spend(client, headers, 90)
+    client.post("/budgets", headers=headers, json={"category": "Food", "amount": "100"})
+    assert alerts(client, headers) == [(80, 90.0)]
+    assert client.get(f"/budgets/alerts?month={current_month()}", headers=headers).json()["data"][0]["month"] == current_month()
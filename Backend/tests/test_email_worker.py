@@ -0,0 +1,96 @@
+import smtplib
+from datetime import datetime, timedelta
+
+from crud.outbox_crud import add_email, claim_emails
+from core.email_worker import EmailWorker
+from models import EmailOutbox
+
+
+class StubMailer:
+    """Records sends; `failures` maps a recipient to the exception its send raises."""
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.sent = []
+        self.closed = 0
+
+    def send(self, to_email, subject, body):
+        if to_email in self.failures:
+            raise self.failures[to_email]
+        self.sent.append(to_email)
+
+    def close(self):
+        self.closed += 1
+
+    def close_if_idle(self):
+        pass
+
+
+def queue(db, *recipients):
+    for to_email in recipients:
+        add_email(db, to_email, "Subject", "Body")
+    db.commit()
+
+
+def outbox(db):
+    db.expire_all()
+    return {email.to_email: email for email in db.query(EmailOutbox)}
+
+
+def worker(mailer, **options):
+    options = {"batch_size": 10, "lease_seconds": 300, "max_attempts": 3, "retry_base_seconds": 60, **options}
+    return EmailWorker(mailer=mailer, **options)
+
+
+def test_connection_failure_releases_the_rest_of_the_batch(db):
+    queue(db, "a@example.com", "b@example.com", "c@example.com", "d@example.com")
+    mailer = StubMailer({"b@example.com": smtplib.SMTPServerDisconnected("gone")})
+    before = datetime.utcnow()
+    assert worker(mailer).run_once() == 4
+
+    emails = outbox(db)
+    assert mailer.sent == ["a@example.com"] and mailer.closed == 1
+    assert emails["a@example.com"].status == "sent"
+    failed = emails["b@example.com"]
+    assert (failed.status, failed.attempts, failed.last_error) == ("pending", 1, "gone")
+    for untried in (emails["c@example.com"], emails["d@example.com"]):
+        # Handed back: the claim's attempt is undone and they are due after retry_base_seconds.
+        assert (untried.status, untried.attempts, untried.last_error) == ("pending", 0, None)
+        assert before + timedelta(seconds=60) <= untried.next_attempt_at <= datetime.utcnow() + timedelta(seconds=60)
+    assert claim_emails(db, 10, 300) == []
+
+
+def test_released_emails_are_sent_on_a_later_pass(db):
+    queue(db, "a@example.com", "b@example.com")
+    worker(StubMailer({"a@example.com": ConnectionRefusedError()})).run_once()
+    for email in db.query(EmailOutbox):
+        email.next_attempt_at = datetime.utcnow()
+    db.commit()
+    mailer = StubMailer()
+    assert worker(mailer).run_once() == 2
+    assert mailer.sent == ["a@example.com", "b@example.com"]
+    assert {to_email: (email.status, email.attempts) for to_email, email in outbox(db).items()} == {
+        "a@example.com": ("sent", 2), "b@example.com": ("sent", 1)}
+
+
+def test_permanent_and_exhausted_failures_are_given_up(db):
+    queue(db, "bounce@example.com", "busy@example.com")
+    mailer = StubMailer({"bounce@example.com": smtplib.SMTPRecipientsRefused({"bounce@example.com": (550, b"no such user")}),
+                         "busy@example.com": smtplib.SMTPResponseException(451, b"try later")})
+    email_worker = worker(mailer, max_attempts=2, retry_base_seconds=0)
+    email_worker.run_once()
+    emails = outbox(db)
+    assert emails["bounce@example.com"].status == "failed"
+    assert (emails["busy@example.com"].status, emails["busy@example.com"].attempts) == ("pending", 1)
+
+    email_worker.run_once()
+    assert outbox(db)["busy@example.com"].status == "failed"
+    assert (email_worker.failed, email_worker.retried) == (2, 1)
+
+
+def test_expired_lease_is_claimed_again(db):
+    queue(db, "a@example.com")
+    assert len(claim_emails(db, 10, 300)) == 1
+    # The worker died before reporting back: nothing is due until the lease runs out.
+    assert claim_emails(db, 10, 300) == []
+    assert len(claim_emails(db, 10, 300, now=datetime.utcnow() + timedelta(seconds=301))) == 1
@@ -0,0 +1,10 @@
+import asyncio
+
+from benchmarks.check_export_memory import measure_all, find_failures
+
+
+def test_export_memory_stays_flat(db):
+    """The streamed export's peak stays under 20 MB and flat as history grows 5x."""
+    results = asyncio.run(measure_all([10_000, 50_000]))
+    failures = find_failures(results, ceiling_mb=20.0, growth_limit=1.5)
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,48 @@
+import json
+
+from conftest import auth_headers, make_user
+
+CSV = """Amount,Category,Date,Description
+12.50,Food,2024-01-05,lunch
+abc,Food,2024-01-06,bad amount
+30,Rent,,no date
+7,Travel,2024-01-07,
+"""
+
+
+def upload(client, headers, path, name, content, fmt=None):
+    params = {"format": fmt} if fmt else {}
+    return client.post(path, headers=headers, params=params, files={"file": (name, content.encode())})
+
+
+def test_csv_import_writes_valid_rows_and_reports_the_others(client, headers):
+    response = upload(client, headers, "/expense/import", "expenses.csv", CSV)
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["imported"], report["failed"], report["errors_truncated"]) == (2, 2, False)
+    assert [(error["row"], sorted(error["errors"])) for error in report["errors"]] == [(3, ["amount"]), (4, ["date"])]
+    rows = client.get("/expense", headers=headers).json()["data"]
+    assert sorted((row["amount"], row["category"]) for row in rows) == [(7.0, "Travel"), (12.5, "Food")]
+
+
+def test_ndjson_import_reports_lines_that_are_not_objects(client, headers):
+    lines = [json.dumps({"amount": 100, "source": "Salary", "income_date": "2024-01-01"}), "[1, 2]", "not json",
+             json.dumps({"amount": 5, "source": "", "income_date": "2024-01-02"})]
+    response = upload(client, headers, "/income/import", "incomes.ndjson", "\n".join(lines))
+    report = response.json()["data"]
+    assert (report["imported"], report["failed"]) == (1, 3)
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][0]["errors"] == {"record": "Each line must be a JSON object"}
+    assert [row["amount"] for row in client.get("/income", headers=headers).json()["data"]] == [100.0]
+
+
+def test_imported_rows_belong_to_the_uploader_only(client, headers, db):
+    upload(client, headers, "/expense/import", "expenses.csv", CSV)
+    other = auth_headers(make_user(db, "other@example.com"), "other@example.com")
+    assert client.get("/expense", headers=other).json()["data"] == []
+
+
+def test_unknown_format_is_rejected(client, headers):
+    response = upload(client, headers, "/expense/import", "expenses.txt", CSV, fmt="xml")
+    assert response.status_code == 400
+    assert "format" in response.json()["errors"]
@@ -0,0 +1,68 @@
+import pytest
+
+
+def add_expenses(client, headers, rows):
+    for amount, category, day, description in rows:
+        response = client.post("/expense", headers=headers, json={"amount": amount, "category": category,
+                                                                  "date": f"2024-01-{day:02d}", "description": description})
+        assert response.status_code == 201, response.text
+
+
+@pytest.fixture
+def expenses(client, headers):
+    add_expenses(client, headers, [(str(10 + day), "Food" if day % 2 else "Rent", day, f"row {day}") for day in range(1, 8)])
+
+
+def test_cursor_pages_through_every_row(client, headers, expenses):
+    seen, cursor = [], None
+    while True:
+        url = "/expense?limit=3&sort=amount&order=asc" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=headers).json()
+        seen += [row["amount"] for row in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0]
+
+
+@pytest.mark.parametrize("reuse", ["sort=amount&order=desc", "sort=date&order=asc", "sort=category&order=desc"])
+def test_cursor_from_another_ordering_is_rejected(client, headers, expenses, reuse):
+    cursor = client.get("/expense?limit=3&sort=date&order=desc", headers=headers).json()["next_cursor"]
+    response = client.get(f"/expense?limit=3&{reuse}&cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["errors"] == {"cursor": "Invalid cursor"}
+
+
+def test_expense_cursor_is_rejected_by_income_list(client, headers, expenses):
+    cursor = client.get("/expense?limit=3&sort=amount", headers=headers).json()["next_cursor"]
+    assert client.get(f"/income?limit=3&sort=amount&cursor={cursor}", headers=headers).status_code == 400
+
+
+def test_garbage_cursor_is_rejected(client, headers, expenses):
+    assert client.get("/expense?limit=3&cursor=not-a-cursor", headers=headers).status_code == 400
+
+
+@pytest.mark.parametrize("q, expected", [("%", ["100% sure"]), ("_", ["snake_case"]), ("0%", ["100% sure"]),
+                                         ("\\", ["back\\slash"]), ("e_c", ["snake_case"])])
+def test_search_wildcards_are_literal(client, headers, q, expected):
+    add_expenses(client, headers, [("1", "Misc", 1, "plain"), ("2", "Misc", 2, "100% sure"), ("3", "Misc", 3, "snake_case"),
+                                   ("4", "Misc", 4, "back\\slash"), ("5", "Misc", 5, "secret")])
+    for path in ("/expense", "/expense?limit=10"):
+        body = client.get(path, params={"q": q}, headers=headers).json()
+        assert [row["description"] for row in body["data"]] == expected
+
+
+@pytest.mark.parametrize("path, payload, changes", [
+    ("/expense", {"amount": "12.345", "category": "Food", "date": "2024-02-29"}, {"amount": "7", "category": "Rent", "date": "2024-03-01", "description": "x"}),
+    ("/income", {"amount": "1000", "source": "Salary", "income_date": "2024-02-29"}, {"amount": "5.5", "source": "Gift", "income_date": "2024-03-01"}),
+])
+def test_create_and_update_return_the_row_as_listed(client, headers, path, payload, changes):
+    created = client.post(path, headers=headers, json=payload)
+    assert created.status_code == 201
+    assert created.headers["content-type"] == "application/json"
+    assert [created.json()["data"]] == client.get(path, headers=headers).json()["data"]
+    assert created.json()["data"]["amount"] == (12.35 if path == "/expense" else 1000.0)
+
+    updated = client.put(f"{path}/{created.json()['data']['id']}", headers=headers, json=changes)
+    assert updated.status_code == 200
+    assert [updated.json()["data"]] == client.get(path, headers=headers).json()["data"]
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.config import Settings
+
+from conftest import TEST_DB_PATH, metric_samples
+
+
+def test_cache_counters_are_exposed(client, headers):
+    client.get("/dashboard", headers=headers)
+    client.get("/dashboard", headers=headers)
+    exposed = metric_samples(client)
+    assert exposed['cache_hits_total{backend="memory"}'] >= 1
+    assert exposed['cache_misses_total{backend="memory"}'] >= 1
+    assert 'cache_max_entries{backend="memory"}' in exposed
+
+
+def test_password_hash_pool_is_exposed(client):
+    before = metric_samples(client)
+    response = client.post("/auth/signup", json={"fullname": "New User", "email": "new@example.com", "gender": "other",
+                                                 "mobilenumber": "9876543210", "password": "secret123"})
+    assert response.status_code == 201
+    after = metric_samples(client)
+    completed = next(key for key in after if key.startswith("password_hash_completed_total{"))
+    assert after[completed] == before[completed] + 1
+
+
+def test_pools_are_exposed(client, headers):
+    client.get("/expense", headers=headers)
+    exposed = metric_samples(client)
+    assert exposed['db_pool_checkouts_total{engine="async"}'] >= 1
+    assert 'db_pool_wait_seconds_total{engine="async"}' in exposed
+    assert 'db_pool_max_overflow{engine="sync"}' in exposed
+
+
+def test_replicas_are_exposed(db, headers):
+    from main import create_app
+    good, down = f"sqlite:///{TEST_DB_PATH}", "sqlite:////nonexistent-directory/replica.db"
+    app = create_app(Settings(replica_urls=[good, down]))
+    with TestClient(app) as client:
+        client.portal.call(app.state.replicas.check)
+        assert client.get("/expense", headers=headers).status_code == 200
+        exposed = metric_samples(client)
+    assert exposed[f'db_replica_healthy{{replica="{good}"}}'] == 1
+    assert exposed[f'db_replica_healthy{{replica="{down}"}}'] == 0
+    assert exposed[f'db_replica_reads_total{{replica="{good}"}}'] == 1
+    assert f'db_replica_check_seconds{{replica="{down}"}}' in exposed
+    assert exposed['db_replica_primary_reads_total{reason="pinned"}'] == 0
+    assert f'db_pool_checkouts_total{{engine="replica:{good}"}}' in exposed
+
+
+def test_every_family_is_declared_once(client):
+    text = client.get("/metrics").text
+    declared = re.findall(r"^# TYPE (\S+) ", text, re.MULTILINE)
+    assert len(declared) == len(set(declared))
+
+
+@pytest.mark.parametrize("path", ["/api/cache-stats", "/api/password-hash-stats", "/api/db-pool", "/api/rate-limit-stats", "/api/db-replicas"])
+def test_stats_routes_are_gone(client, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,40 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+
+from benchmarks.check_query_plans import ALEMBIC_INI
+from models.types import Money
+
+# Floats whose stored binary value sits just below (1.005, 2.675) or above the half cent.
+LEGACY_AMOUNTS = [1.005, 2.675, 0.285, 0.29, 0.1 + 0.2, 1234567.895, 12.5]
+
+
+def upgrade(conn, revision):
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = conn
+    command.upgrade(config, revision)
+
+
+def test_migrated_amounts_match_runtime_rounding(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        with engine.begin() as conn:
+            upgrade(conn, "0007")
+            for amount in LEGACY_AMOUNTS:
+                conn.exec_driver_sql("INSERT INTO expenses (user_id, amount, category, date, description) "
+                                     "VALUES (1, ?, 'Food', '2024-01-01 00:00:00', NULL)", (amount,))
+            upgrade(conn, "0008")
+            migrated = [row[0] for row in conn.exec_driver_sql("SELECT amount FROM expenses ORDER BY id")]
+    finally:
+        engine.dispose()
+    assert migrated == [Money().process_bind_param(amount, None) for amount in LEGACY_AMOUNTS]
+    assert migrated[:2] == [101, 268]
+
+
+@pytest.mark.parametrize("currency", ["JPY", "KWD", "ABC"])
+def test_currencies_without_cents_are_rejected(client, headers, currency):
+    response = client.post("/expense", headers=headers,
+                           json={"amount": "100", "category": "Food", "date": "2024-01-01", "currency": currency})
+    assert response.status_code == 400
+    assert "currency" in response.json()["errors"]
@@ -0,0 +1,12 @@
+from benchmarks.check_query_plans import seed, run_checks
+
+
+def test_list_queries_use_their_indexes_without_sorting():
+    """Every sort key, both directions, first and later pages: SEARCH ... USING INDEX, no temp B-tree."""
+    db, user_id = seed()
+    try:
+        results = run_checks(db, user_id)
+    finally:
+        db.close()
+    failures = [f"{name}: expected {index}; plan: {plan}" for name, index, ok, plan in results if not ok]
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,44 @@
+import pytest
+
+from core.config import RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_SIGNIN_PER_MINUTE
+from core.rate_limit import rate_limiter
+from conftest import metric_samples
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    rate_limiter.store.clear()
+    yield rate_limiter
+    rate_limiter.store.clear()
+
+
+def signin(client, email):
+    return client.post("/auth/signin", json={"email": email, "password": "wrong-password1"})
+
+
+def test_account_burst_then_429_with_retry_after(client, limiter):
+    for _ in range(RATE_LIMIT_SIGNIN_PER_MINUTE):
+        assert signin(client, "target@example.com").status_code == 401
+    response = signin(client, "target@example.com")
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+    # Other accounts from the same client are still let through.
+    assert signin(client, "other@example.com").status_code == 401
+
+
+def test_ip_burst_then_429_with_retry_after(client, limiter):
+    for attempt in range(RATE_LIMIT_IP_PER_MINUTE):
+        assert signin(client, f"user{attempt}@example.com").status_code == 401
+    response = signin(client, "one-more@example.com")
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+
+
+def test_refusals_are_counted_on_metrics(client, limiter):
+    before = metric_samples(client)['rate_limit_limited_total{backend="memory"}']
+    for _ in range(RATE_LIMIT_SIGNIN_PER_MINUTE + 2):
+        signin(client, "target@example.com")
+    exposed = metric_samples(client)
+    assert exposed['rate_limit_limited_total{backend="memory"}'] == before + 2
+    assert exposed['rate_limit_enabled{backend="memory"}'] == 1
@@ -0,0 +1,81 @@
+from datetime import date, datetime
+from functools import partial
+
+import pytest
+from sqlalchemy import event, func, select
+
+from crud import recurring_crud
+from crud.recurring_crud import create_recurring_rule, materialize_due
+from database import engine
+from models import Expense, Income, RecurringRule
+
+TODAY = date(2024, 3, 31)
+
+
+def add_rule(db, user_id, kind="expense", start_date=date(2024, 1, 1)):
+    label = {"category": "Rent"} if kind == "expense" else {"source": "Salary"}
+    rule = RecurringRule(user_id=user_id, kind=kind, amount=10.0, frequency="daily", interval=1, start_date=start_date,
+                         occurrence_count=0, next_run_date=start_date, active=True, **label)
+    db.add(rule)
+    db.commit()
+    return rule.id
+
+
+def count_rows(db, model, rule_id):
+    return db.scalar(select(func.count()).select_from(model).where(model.recurring_rule_id == rule_id))
+
+
+@pytest.fixture
+def inserted_batches():
+    """Row counts of each executemany INSERT into expenses/incomes."""
+    sizes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if executemany and statement.startswith(("INSERT INTO expenses", "INSERT INTO incomes")):
+            sizes.append(len(parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield sizes
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_catch_up_is_split_into_bounded_transactions(db, user_id, inserted_batches):
+    expense_rule, income_rule = add_rule(db, user_id), add_rule(db, user_id, "income")
+    stats = materialize_due(db, TODAY, max_occurrences=25)
+    due = (TODAY - date(2024, 1, 1)).days + 1
+    assert stats["expenses"] == stats["incomes"] == due
+    assert stats["batches"] == -(-2 * due // 25)
+    assert max(inserted_batches) <= 25
+    assert count_rows(db, Expense, expense_rule) == count_rows(db, Income, income_rule) == due
+    db.expire_all()
+    assert db.get(RecurringRule, expense_rule).next_run_date == date(2024, 4, 1)
+    assert materialize_due(db, TODAY)["expenses"] == 0
+
+
+def test_created_rule_catches_up_in_bounded_transactions(db, user_id, monkeypatch, inserted_batches):
+    monkeypatch.setattr(recurring_crud, "_materialize", partial(recurring_crud._materialize, max_occurrences=7))
+    rule = create_recurring_rule(db, user_id, {"kind": "expense", "amount": 5.0, "category": "Gym", "frequency": "daily",
+                                               "interval": 1, "start_date": date(2024, 3, 1)}, today=TODAY)
+    assert rule.occurrence_count == 31
+    assert inserted_batches == [7, 7, 7, 7, 3]
+    assert count_rows(db, Expense, rule.id) == 31
+
+
+@pytest.mark.parametrize("max_occurrences", [0, -1])
+def test_non_positive_limit_is_rejected(db, user_id, max_occurrences):
+    add_rule(db, user_id)
+    with pytest.raises(ValueError):
+        materialize_due(db, TODAY, max_occurrences=max_occurrences)
+
+
+def test_rule_with_an_already_written_occurrence_is_skipped(db, user_id):
+    conflicting, other = add_rule(db, user_id), add_rule(db, user_id)
+    db.add(Expense(user_id=user_id, amount=10.0, category="Rent", date=datetime(2024, 1, 1), recurring_rule_id=conflicting))
+    db.commit()
+    stats = materialize_due(db, TODAY)
+    assert stats["skipped"] == 1
+    assert stats["rules"] == 1
+    assert count_rows(db, Expense, other) == 91
+    assert count_rows(db, Expense, conflicting) == 1
+    db.expire_all()
+    assert db.get(RecurringRule, conflicting).occurrence_count == 0
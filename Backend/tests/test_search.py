@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from conftest import auth_headers, make_user
+from models import Expense, Income
+
+
+def add_rows(db, user_id, expenses=(), incomes=()):
+    db.add_all([Expense(user_id=user_id, amount=1.0, category=category, description=description, date=datetime(2024, 1, 1))
+                for category, description in expenses])
+    db.add_all([Income(user_id=user_id, amount=1.0, source=source, description=description, income_date=datetime(2024, 1, 1))
+                for source, description in incomes])
+    db.commit()
+
+
+def search(client, headers, q, **params):
+    response = client.get("/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_search_only_sees_the_callers_rows(client, headers, user_id, db):
+    other_id = make_user(db, "other@example.com")
+    add_rows(db, user_id, expenses=[("Coffee", "mine")])
+    add_rows(db, other_id, expenses=[("Coffee", "theirs"), ("Coffee", "theirs too")], incomes=[("Coffee shop", "theirs")])
+    assert [row["description"] for row in search(client, headers, "coffee")["data"]] == ["mine"]
+    other = auth_headers(other_id, "other@example.com")
+    assert sorted(row["description"] for row in search(client, other, "coffee")["data"]) == ["theirs", "theirs", "theirs too"]
+    assert search(client, headers, "theirs")["data"] == []
+
+
+def test_expenses_and_incomes_alternate_by_rank_within_their_table(client, headers, user_id, db):
+    # Any income scores lower than these expenses under bm25 (a tiny table with
+    # a rare term), yet the best income still comes second.
+    add_rows(db, user_id, expenses=[("Coffee", f"coffee beans {n}") for n in range(4)] + [("Rent", "flat")] * 20,
+             incomes=[("Refund", "coffee machine refund"), ("Salary", "coffee allowance")])
+    kinds = [row["type"] for row in search(client, headers, "coffee")["data"]]
+    assert kinds == ["expense", "income", "expense", "income", "expense", "expense"]
+
+
+def test_cursor_pages_through_the_interleaved_ranking(client, headers, user_id, db):
+    add_rows(db, user_id, expenses=[("Coffee", f"cup {n}") for n in range(5)], incomes=[("Coffee", f"sale {n}") for n in range(4)])
+    everything = [(row["type"], row["id"]) for row in search(client, headers, "coffee", limit=50)["data"]]
+    paged, cursor = [], None
+    while True:
+        body = search(client, headers, "coffee", limit=2, **({"cursor": cursor} if cursor else {}))
+        paged += [(row["type"], row["id"]) for row in body["data"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert paged == everything and len(everything) == 9